@@ -37,6 +37,18 @@ target_metadata = Base.metadata
 def get_url():
     return settings.DATABASE_URL
 
+
+def include_name(name, type_, parent_names):
+    """Leave the full-text search objects created in raw DDL (app.db.full_text) out of autogenerate and check"""
+    if type_ == "table":
+        # The FTS5 virtual table and the shadow tables SQLite keeps for it
+        return not name.startswith("job_listings_fts")
+    if type_ == "column":
+        return not (parent_names.get("table_name") == "job_listings" and name == "search_vector")
+    if type_ == "index":
+        return name != "ix_job_listings_search_vector"
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -53,6 +65,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -87,7 +100,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
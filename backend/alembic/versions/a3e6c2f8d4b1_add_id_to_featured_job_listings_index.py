@@ -0,0 +1,40 @@
+"""Break posted_at ties by id in the featured job listings index, as the homepage feed orders them
+
+Revision ID: a3e6c2f8d4b1
+Revises: f7d1b4c9e2a6
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e6c2f8d4b1'
+down_revision: Union[str, Sequence[str], None] = 'f7d1b4c9e2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum columns store member names, hence 'PUBLISHED'
+PUBLISHED_AND_FEATURED = sa.text("status = 'PUBLISHED' AND is_featured")
+
+
+def _recreate_featured_index(columns) -> None:
+    # CONCURRENTLY keeps job_listings writable on PostgreSQL while the index builds; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_job_listings_featured_posted_at', table_name='job_listings', postgresql_concurrently=True)
+        op.create_index('ix_job_listings_featured_posted_at', 'job_listings', columns, unique=False,
+                        postgresql_concurrently=True, postgresql_where=PUBLISHED_AND_FEATURED,
+                        sqlite_where=PUBLISHED_AND_FEATURED)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_featured_index([sa.text('posted_at DESC'), sa.text('id DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_featured_index([sa.text('posted_at DESC')])
@@ -0,0 +1,31 @@
+"""Index job listings by updated_at for the in-memory keyword index refresh
+
+Revision ID: a8c4e1f6b3d9
+Revises: f3b9d6a2c8e4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e1f6b3d9'
+down_revision: Union[str, Sequence[str], None] = 'f3b9d6a2c8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps job_listings writable on PostgreSQL while the index builds; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_job_listings_updated_at', 'job_listings', ['updated_at'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_job_listings_updated_at', table_name='job_listings', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""Add gazetteer coordinates to job listings for radius search
+
+Revision ID: b6d2f8a4c1e7
+Revises: a8c4e1f6b3d9
+Create Date: 2026-10-18 16:00:00.000000
+
+Existing listings are left without coordinates: locate them with scripts/locate_job_listings.py after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f8a4c1e7'
+down_revision: Union[str, Sequence[str], None] = 'a8c4e1f6b3d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum columns store member names, hence 'PUBLISHED'
+PUBLISHED = sa.text("status = 'PUBLISHED'")
+
+# Columns search filters on besides the location, checked inside the index
+SEARCH_FILTER_COLUMNS = ['experience_level', 'type', 'location_requirement', 'wage_interval', 'wage']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_listings', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('job_listings', sa.Column('longitude', sa.Float(), nullable=True))
+
+    # CONCURRENTLY keeps job_listings writable on PostgreSQL while the index builds; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_job_listings_published_location', 'job_listings',
+                        ['latitude', 'longitude', sa.text('id DESC'), *SEARCH_FILTER_COLUMNS], unique=False,
+                        postgresql_concurrently=True, postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_job_listings_published_location', table_name='job_listings',
+                      postgresql_concurrently=True)
+    op.drop_column('job_listings', 'longitude')
+    op.drop_column('job_listings', 'latitude')
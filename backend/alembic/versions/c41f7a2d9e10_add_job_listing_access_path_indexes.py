@@ -0,0 +1,51 @@
+"""Add composite and partial indexes for job listing and application access paths
+
+Revision ID: c41f7a2d9e10
+Revises: 9b935c0d910e
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a2d9e10'
+down_revision: Union[str, Sequence[str], None] = '9b935c0d910e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum columns store member names, hence 'PUBLISHED'
+PUBLISHED = sa.text("status = 'PUBLISHED'")
+PUBLISHED_AND_FEATURED = sa.text("status = 'PUBLISHED' AND is_featured")
+
+INDEXES = [
+    ('ix_job_listings_published_posted_at', 'job_listings',
+     [sa.text('posted_at DESC'), sa.text('id DESC')], PUBLISHED),
+    ('ix_job_listings_organization_id_status', 'job_listings',
+     ['organization_id', 'status', sa.text('posted_at DESC')], None),
+    ('ix_job_listings_featured_posted_at', 'job_listings',
+     [sa.text('posted_at DESC')], PUBLISHED_AND_FEATURED),
+    ('ix_job_listing_applications_user_id_created_at', 'job_listing_applications',
+     ['user_id', sa.text('created_at DESC')], None),
+    ('ix_job_listing_applications_job_listing_id_stage', 'job_listing_applications',
+     ['job_listing_id', 'stage'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable on PostgreSQL while the indexes build; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True,
+                            postgresql_where=where, sqlite_where=where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,101 @@
+"""Store job listing ids as 16-byte UUIDs
+
+Revision ID: d7e2b5a8f3c1
+Revises: c41f7a2d9e10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e2b5a8f3c1'
+down_revision: Union[str, Sequence[str], None] = 'c41f7a2d9e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs holding job listing ids
+UUID_COLUMNS = [
+    ('job_listings', 'id'),
+    ('job_listing_applications', 'job_listing_id'),
+]
+
+# Indexes with DESC columns; SQLite table rebuilds reflect them without the ordering, so they are recreated
+PUBLISHED = sa.text("status = 'PUBLISHED'")
+PUBLISHED_AND_FEATURED = sa.text("status = 'PUBLISHED' AND is_featured")
+DESCENDING_INDEXES = [
+    ('ix_job_listings_published_posted_at', 'job_listings',
+     [sa.text('posted_at DESC'), sa.text('id DESC')], PUBLISHED),
+    ('ix_job_listings_organization_id_status', 'job_listings',
+     ['organization_id', 'status', sa.text('posted_at DESC')], None),
+    ('ix_job_listings_featured_posted_at', 'job_listings',
+     [sa.text('posted_at DESC')], PUBLISHED_AND_FEATURED),
+    ('ix_job_listing_applications_user_id_created_at', 'job_listing_applications',
+     ['user_id', sa.text('created_at DESC')], None),
+]
+
+
+def _rebuild_sqlite_tables(column_type, convert) -> None:
+    for name, table, _, _ in DESCENDING_INDEXES:
+        op.drop_index(name, table_name=table)
+    for table, column in UUID_COLUMNS:
+        _convert_values(table, column, convert)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, type_=column_type, existing_nullable=False)
+    for name, table, columns, where in DESCENDING_INDEXES:
+        op.create_index(name, table, columns, unique=False, sqlite_where=where)
+
+
+def _convert_values(table: str, column: str, convert) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f'SELECT DISTINCT {column} FROM {table}')).scalars().all()
+    updates = [{'old': value, 'new': convert(value)} for value in rows]
+    updates = [update for update in updates if update['new'] != update['old']]
+    if updates:
+        connection.execute(sa.text(f'UPDATE {table} SET {column} = :new WHERE {column} = :old'), updates)
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, bytes) and len(value) == 16:
+        return value
+    if isinstance(value, bytes):
+        value = value.decode()
+    return uuid.UUID(value).bytes
+
+
+def _to_string(value) -> str:
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # The initial migration created native uuid columns; databases built from the old models hold varchar ids
+        if op.get_context().as_sql:
+            return
+        columns = {column['name']: column for column in sa.inspect(op.get_bind()).get_columns('job_listings')}
+        if isinstance(columns['id']['type'], sa.Uuid):
+            return
+        op.drop_constraint('job_listing_applications_job_listing_id_fkey', 'job_listing_applications',
+                           type_='foreignkey')
+        for table, column in UUID_COLUMNS:
+            op.alter_column(table, column, type_=sa.Uuid(), postgresql_using=f'{column}::uuid')
+        op.create_foreign_key('job_listing_applications_job_listing_id_fkey', 'job_listing_applications',
+                              'job_listings', ['job_listing_id'], ['id'], ondelete='cascade')
+        return
+
+    # SQLite: 36-character text ids become 16 raw bytes. Existing ids keep their values, so links stay valid;
+    # only new rows get time-ordered (v7) ids.
+    _rebuild_sqlite_tables(sa.LargeBinary(16), _to_bytes)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Native uuid is the original PostgreSQL schema
+        return
+    _rebuild_sqlite_tables(sa.String(), _to_string)
@@ -0,0 +1,47 @@
+"""Add partial indexes for structured job listing search
+
+Revision ID: e5a1c8d4b7f2
+Revises: d7e2b5a8f3c1
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8d4b7f2'
+down_revision: Union[str, Sequence[str], None] = 'd7e2b5a8f3c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum columns store member names, hence 'PUBLISHED'
+PUBLISHED = sa.text("status = 'PUBLISHED'")
+
+# Columns search filters on besides the leading one, checked inside the index
+SEARCH_FILTER_COLUMNS = ['experience_level', 'type', 'location_requirement', 'wage_interval', 'wage']
+
+INDEXES = [
+    ('ix_job_listings_published_city', 'job_listings',
+     [sa.text('lower(city)'), sa.text('id DESC'), *SEARCH_FILTER_COLUMNS]),
+    ('ix_job_listings_published_state', 'job_listings',
+     ['state_abbreviation', sa.text('id DESC'), *SEARCH_FILTER_COLUMNS]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps job_listings writable on PostgreSQL while the indexes build; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True,
+                            postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""Add job listing and resume embeddings for AI job matching
+
+Revision ID: e8c3a7f1d5b2
+Revises: b6d2f8a4c1e7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3a7f1d5b2'
+down_revision: Union[str, Sequence[str], None] = 'b6d2f8a4c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Job listing ids are native uuids on PostgreSQL and 16 raw bytes on SQLite (see UUIDType)
+JOB_LISTING_ID = sa.Uuid().with_variant(sa.LargeBinary(16), 'sqlite')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_listing_embeddings',
+    sa.Column('job_listing_id', JOB_LISTING_ID, nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('vector', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['job_listing_id'], ['job_listings.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('job_listing_id')
+    )
+    op.create_table('user_resume_embeddings',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('vector', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user_resumes.user_id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_resume_embeddings')
+    op.drop_table('job_listing_embeddings')
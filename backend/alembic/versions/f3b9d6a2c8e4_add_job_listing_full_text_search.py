@@ -0,0 +1,73 @@
+"""Add full-text search over job listing titles and descriptions
+
+Revision ID: f3b9d6a2c8e4
+Revises: e5a1c8d4b7f2
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d6a2c8e4'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c8d4b7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Title terms weigh 'A', description terms 'B'
+SEARCH_VECTOR = ("setweight(to_tsvector('english', title), 'A') || "
+                 "setweight(to_tsvector('english', description), 'B')")
+
+# FTS5 index kept in sync with job_listings by triggers; see app.db.full_text
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE job_listings_fts USING fts5("
+    "title, description, content='job_listings', tokenize='porter unicode61')",
+    "INSERT INTO job_listings_fts (job_listings_fts, rank) VALUES ('rank', 'bm25(2.5, 1.0)')",
+    "CREATE TRIGGER job_listings_fts_insert AFTER INSERT ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER job_listings_fts_delete AFTER DELETE ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (job_listings_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER job_listings_fts_update AFTER UPDATE OF title, description ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (job_listings_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO job_listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+    "END",
+    # Index the rows that already exist
+    "INSERT INTO job_listings_fts (job_listings_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER job_listings_fts_update",
+    "DROP TRIGGER job_listings_fts_delete",
+    "DROP TRIGGER job_listings_fts_insert",
+    "DROP TABLE job_listings_fts",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+    # Adding a stored generated column rewrites job_listings once; the GIN index then builds without blocking writes
+    op.execute(f"ALTER TABLE job_listings ADD COLUMN search_vector tsvector "
+               f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY ix_job_listings_search_vector ON job_listings USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY ix_job_listings_search_vector")
+    op.execute("ALTER TABLE job_listings DROP COLUMN search_vector")
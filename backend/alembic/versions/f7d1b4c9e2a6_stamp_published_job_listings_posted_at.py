@@ -0,0 +1,30 @@
+"""Stamp posted_at on published job listings without one, for the homepage feed order
+
+Revision ID: f7d1b4c9e2a6
+Revises: e8c3a7f1d5b2
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d1b4c9e2a6'
+down_revision: Union[str, Sequence[str], None] = 'e8c3a7f1d5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The service stamps posted_at when a listing is published from now on; older ones count as posted when created.
+    # Enum columns store member names, hence 'PUBLISHED'
+    op.execute("UPDATE job_listings SET posted_at = created_at WHERE status = 'PUBLISHED' AND posted_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Which posted_at values were stamped is not recorded, and they are valid either way
+    pass
@@ -2,14 +2,16 @@ import hmac
 import hashlib
 import json
 import time
+from functools import cached_property, lru_cache
 from typing import Dict, Any, Callable, Awaitable
 from fastapi import APIRouter, Request, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.db.unit_of_work import unit_of_work
 from app.services.user_service import UserService
 from app.schemas.user import UserCreate, UserUpdate
-from app.config.settings import settings
+from app.config.settings import get_settings
 from svix.webhooks import Webhook, WebhookVerificationError
 from app.exceptions.auth_exceptions import (
     WebhookSignatureError,
@@ -40,6 +42,11 @@ class ClerkWebhookHandler:
             "user.deleted": self.handle_user_deleted,
         }
 
+    @cached_property
+    def webhook(self) -> Webhook:
+        """Svix verifier, built once; decoding the secret is not repeated per request"""
+        return Webhook(self.webhook_secret)
+
     def verify_webhook_signature(self, payload: bytes, headers: Dict[str, str]) -> None:
         """Verify webhook signature from Clerk/Svix with comprehensive error handling"""
         import os
@@ -160,7 +167,7 @@ class ClerkWebhookHandler:
                 )
 
             # Use Svix library for signature verification
-            webhook = Webhook(self.webhook_secret)
+            webhook = self.webhook
             
             # Prepare headers dict for Svix verification
             svix_headers = {
@@ -250,7 +257,9 @@ class ClerkWebhookHandler:
         handler = self.event_handlers.get(event_type)
         if handler:
             try:
-                await handler(event_data, db)
+                # One transaction per event: lookups and writes from the handler commit together
+                with unit_of_work(db):
+                    await handler(event_data, db)
                 log_auth_event(
                     logger,
                     "webhook_event_handled_success",
@@ -500,13 +509,17 @@ class ClerkWebhookHandler:
             )
 
 
-webhook_handler = ClerkWebhookHandler(settings.CLERK_WEBHOOK_SECRET)
+@lru_cache
+def get_webhook_handler() -> ClerkWebhookHandler:
+    """Webhook handler for the configured secret, created on the first webhook"""
+    return ClerkWebhookHandler(get_settings().CLERK_WEBHOOK_SECRET)
 
 
 @router.post("/clerk")
 async def clerk_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    webhook_handler: ClerkWebhookHandler = Depends(get_webhook_handler)
 ):
     """Handle Clerk webhook events with comprehensive error handling and proper HTTP status codes"""
     request_id = id(request)  # Simple request ID for tracking
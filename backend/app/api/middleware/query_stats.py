@@ -0,0 +1,58 @@
+import logging
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.types import ASGIApp
+
+from app.config.logging import log_event
+from app.db.instrumentation import begin_query_stats, end_query_stats, get_query_stats
+
+logger = logging.getLogger("db.queries")
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Reports the SQL statements each request executed: count and DB time in response headers and a
+    structured log line, plus a warning when one statement shape repeats often enough to look like N+1.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10):
+        super().__init__(app)
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def dispatch(self, request: Request, call_next):
+        token = begin_query_stats()
+        try:
+            response = await call_next(request)
+            stats = get_query_stats()
+        finally:
+            end_query_stats(token)
+
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time_ms:.3f}"
+
+        repeated = stats.repeated_shapes(self.n_plus_one_threshold)
+        if repeated:
+            response.headers["X-DB-N-Plus-One"] = str(len(repeated))
+            log_event(
+                logger,
+                "n_plus_one_suspected",
+                f"{request.method} {request.url.path} repeated {len(repeated)} statement shape(s)",
+                level="WARNING",
+                path=request.url.path,
+                method=request.method,
+                threshold=self.n_plus_one_threshold,
+                repeated_statements=[{"statement": shape[:500], "count": count} for shape, count in repeated],
+            )
+
+        log_event(
+            logger,
+            "request_query_stats",
+            f"{request.method} {request.url.path} ran {stats.count} SQL statement(s) in {stats.total_time_ms}ms",
+            path=request.url.path,
+            method=request.method,
+            status_code=response.status_code,
+            query_count=stats.count,
+            db_time_ms=stats.total_time_ms,
+        )
+        return response
@@ -0,0 +1,46 @@
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.types import ASGIApp
+
+from app.db.routing import begin_routing_state, end_routing_state, get_routing_state
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Pins clients that just wrote to the primary database so they never read stale replica data.
+
+    A request that flushed any change sets a short-lived cookie; requests carrying an unexpired cookie
+    route all of their reads to the primary.
+    """
+
+    cookie_name = "db_primary_until"
+
+    def __init__(self, app: ASGIApp, window_seconds: int = 5):
+        super().__init__(app)
+        self.window_seconds = window_seconds
+
+    async def dispatch(self, request: Request, call_next):
+        token = begin_routing_state(pinned_to_primary=self._pinned_until(request) > time.time())
+        try:
+            response = await call_next(request)
+            state = get_routing_state()
+        finally:
+            end_routing_state(token)
+
+        if state.wrote and self.window_seconds > 0:
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time()) + self.window_seconds),
+                max_age=self.window_seconds,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+    def _pinned_until(self, request: Request) -> float:
+        try:
+            return float(request.cookies.get(self.cookie_name, 0))
+        except ValueError:
+            return 0
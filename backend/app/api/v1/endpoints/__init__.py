@@ -1,3 +1,4 @@
+from .internal import router as internal_router
 from .job_listing import router as job_listing_router
 from .job_listing_application import router as job_listing_application_router
 from .organization import router as organization_router
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.core.bootstrap import get_startup_timings
+from app.core.dependencies.internal import require_internal_token
+from app.db.session import get_pool_statistics
+
+# Diagnostics for operators, not clients: every route needs INTERNAL_API_TOKEN
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/internal/db/pool", include_in_schema=False)
+def get_db_pool_stats():
+    # Per-worker numbers: each process owns its own pools
+    return {"pools": get_pool_statistics()}
+
+
+@router.get("/internal/startup", include_in_schema=False)
+def get_startup_stats():
+    # Milliseconds per startup phase of this worker
+    return {"phases_ms": get_startup_timings()}
@@ -1,45 +1,204 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, Optional
+from uuid import UUID
 
-from app.db.session import get_db
-from app.schemas.job_listing import JobListingCreate, JobListingUpdate, JobListingResponse as JobListing
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.core.dependencies.pagination import get_page_params
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement, WageInterval
+from app.db.session import get_async_db
+from app.exceptions.import_exceptions import ImportFileError
+from app.repositories.pagination import PageParams
+from app.schemas.batch import Batch
+from app.schemas.job_listing import AutocompleteSuggestions, JobListingBatchUpdate, JobListingCreate, \
+    JobListingFacets, JobListingHomepageFeed, JobListingImportReport, JobListingUpdate, \
+    JobListingResponse as JobListing
+from app.schemas.pagination import Page
 from app.services.job_listing_service import JobListingService
+from app.utils.record_streams import iter_csv_records, iter_ndjson_records
 
 router = APIRouter()
 
+IMPORT_PARSERS = {
+    "text/csv": iter_csv_records,
+    "application/x-ndjson": iter_ndjson_records,
+    "application/jsonl": iter_ndjson_records,
+}
+
+KEYWORD_SYNTAX = 'Matched against title and description in web search syntax: words, "a phrase", or, -excluded'
+
 
 @router.post("/job_listings", response_model=JobListing)
-def create_job_listing(job_listing_in: JobListingCreate, db: Session = Depends(get_db)):
+async def create_job_listing(job_listing_in: JobListingCreate, db: AsyncSession = Depends(get_async_db)):
+    service = JobListingService(db)
+    return await service.create_job_listing(job_listing_in)
+
+
+@router.post("/job_listings/batch", response_model=list[JobListing])
+async def create_job_listings(job_listings_in: Batch[JobListingCreate], db: AsyncSession = Depends(get_async_db)):
+    service = JobListingService(db)
+    return await service.create_job_listings(job_listings_in)
+
+
+@router.patch("/job_listings/batch", response_model=list[JobListing])
+async def update_job_listings(job_listings_in: Batch[JobListingBatchUpdate],
+                              db: AsyncSession = Depends(get_async_db)):
+    service = JobListingService(db)
+    job_listings = await service.update_job_listings(job_listings_in)
+    if job_listings is None:
+        raise HTTPException(status_code=404, detail="Job Listing not found")
+    return job_listings
+
+
+@router.post("/job_listings/import", response_model=JobListingImportReport, openapi_extra={"requestBody": {
+    "required": True,
+    "content": {content_type: {"schema": {"type": "string"}} for content_type in IMPORT_PARSERS},
+}})
+async def import_job_listings(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Import job listings from a streamed CSV (with a header row) or NDJSON upload of JobListingCreate rows"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in IMPORT_PARSERS:
+        raise HTTPException(status_code=415, detail=f"Upload one of: {', '.join(IMPORT_PARSERS)}")
+    service = JobListingService(db)
+    try:
+        return await service.import_job_listings(IMPORT_PARSERS[content_type](request.stream()))
+    except ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def get_search_criteria(keyword: Optional[str] = Query(None, description=KEYWORD_SYNTAX),
+                        city: Optional[str] = None, state_abbreviation: Optional[str] = None,
+                        experience_level: Optional[ExperienceLevel] = None, type: Optional[JobListingType] = None,
+                        location_requirement: Optional[LocationRequirement] = None,
+                        wage_interval: Optional[WageInterval] = None, min_wage: Optional[int] = Query(None, ge=0),
+                        max_wage: Optional[int] = Query(None, ge=0)) -> dict[str, Any]:
+    """Dependency reading the search criteria of /job_listings/search and /job_listings/facets"""
+    if (min_wage is not None or max_wage is not None) and wage_interval is None:
+        raise HTTPException(status_code=400, detail="wage_interval is required with min_wage or max_wage")
+    return {
+        "keyword": keyword, "city": city, "state_abbreviation": state_abbreviation,
+        "experience_level": experience_level, "type": type, "location_requirement": location_requirement,
+        "wage_interval": wage_interval, "min_wage": min_wage, "max_wage": max_wage,
+    }
+
+
+@router.get("/job_listings/search", response_model=Page[JobListing])
+async def search_job_listings(criteria: dict[str, Any] = Depends(get_search_criteria),
+                              page: PageParams = Depends(get_page_params), db: AsyncSession = Depends(get_async_db)):
+    """Published job listings matching every given criterion; most relevant first with a keyword, else newest first"""
+    service = JobListingService(db)
+    return await service.search_job_listings(page, **criteria)
+
+
+@router.get("/job_listings/facets", response_model=JobListingFacets)
+async def get_job_listing_facets(criteria: dict[str, Any] = Depends(get_search_criteria),
+                                 db: AsyncSession = Depends(get_async_db)):
+    """Counts per facet value of the published job listings a search with the same criteria matches"""
+    service = JobListingService(db)
+    return await service.get_job_listing_facets(**criteria)
+
+
+@router.get("/job_listings/search/nearby", response_model=Page[JobListing])
+async def search_nearby_job_listings(latitude: Optional[float] = Query(None, ge=-90, le=90),
+                                     longitude: Optional[float] = Query(None, ge=-180, le=180),
+                                     near_city: Optional[str] = None, near_state_abbreviation: Optional[str] = None,
+                                     radius_miles: float = Query(50, gt=0),
+                                     criteria: dict[str, Any] = Depends(get_search_criteria),
+                                     page: PageParams = Depends(get_page_params),
+                                     db: AsyncSession = Depends(get_async_db)):
+    """
+    Published job listings within radius_miles of a point (latitude and longitude, or a city given as near_city
+    and near_state_abbreviation) matching every other criterion; nearest first, then newest
+    """
+    radius_miles_max = get_settings().NEARBY_RADIUS_MILES_MAX
+    if radius_miles > radius_miles_max:
+        raise HTTPException(status_code=400, detail=f"radius_miles cannot exceed {radius_miles_max}")
+    service = JobListingService(db)
+    if latitude is not None and longitude is not None:
+        center = latitude, longitude
+    elif near_city and near_state_abbreviation:
+        center = service.locate(near_city, near_state_abbreviation)
+        if center is None:
+            raise HTTPException(status_code=400, detail=f"Unknown place: {near_city}, {near_state_abbreviation}")
+    else:
+        raise HTTPException(status_code=400,
+                            detail="Give latitude and longitude, or near_city and near_state_abbreviation")
+    return await service.search_nearby_job_listings(page, *center, radius_miles, **criteria)
+
+
+@router.get("/job_listings/search/instant", response_model=list[JobListing])
+async def instant_search_job_listings(keyword: str = Query(..., min_length=1, description=KEYWORD_SYNTAX),
+                                      limit: Optional[int] = Query(None, ge=1),
+                                      db: AsyncSession = Depends(get_async_db)):
+    """Published job listings best matching keyword, ranked in memory by this worker's keyword index"""
+    settings = get_settings()
+    service = JobListingService(db)
+    return await service.instant_search_job_listings(
+        keyword, min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX))
+
+
+@router.get("/job_listings/search/autocomplete", response_model=AutocompleteSuggestions)
+async def autocomplete_job_listings(q: str = Query(..., min_length=1), limit: int = Query(5, ge=1),
+                                    db: AsyncSession = Depends(get_async_db)):
+    """
+    Typeahead for the search box: job titles, cities and organizations with a word starting with q, most published
+    listings first; at most AUTOCOMPLETE_TOP_K of each
+    """
+    service = JobListingService(db)
+    return service.autocomplete(q, min(limit, get_settings().AUTOCOMPLETE_TOP_K))
+
+
+@router.get("/job_listings/homepage", response_model=JobListingHomepageFeed)
+async def get_homepage_feed(db: AsyncSession = Depends(get_async_db)):
+    """Featured published listings and the newest published ones, precomputed in memory by each worker"""
     service = JobListingService(db)
-    return service.create_job_listing(job_listing_in)
+    # Already serialized, so it is returned as is rather than validated against the response model again
+    return Response(content=await service.get_homepage_feed(), media_type="application/json")
 
 
 @router.get("/job_listings/{job_listing_id}", response_model=JobListing)
-def get_job_listing(job_listing_id: str, db: Session = Depends(get_db)):
+async def get_job_listing(job_listing_id: UUID, db: AsyncSession = Depends(get_async_db)):
     service = JobListingService(db)
-    job_listing = service.get_job_listing_by_id(job_listing_id)
+    job_listing = await service.get_job_listing_by_id(job_listing_id)
     if not job_listing:
         raise HTTPException(status_code=404, detail="Job Listing not found")
     return job_listing
 
 
-@router.get("/job_listings", response_model=list[JobListing])
-def get_all_job_listings(db: Session = Depends(get_db)):
+@router.get("/job_listings", response_model=Page[JobListing])
+async def get_all_job_listings(organization_id: Optional[str] = None, status: Optional[JobListingStatus] = None,
+                               experience_level: Optional[ExperienceLevel] = None,
+                               type: Optional[JobListingType] = None,
+                               location_requirement: Optional[LocationRequirement] = None,
+                               is_featured: Optional[bool] = None, state_abbreviation: Optional[str] = None,
+                               city: Optional[str] = None, page: PageParams = Depends(get_page_params),
+                               db: AsyncSession = Depends(get_async_db)):
     service = JobListingService(db)
-    return service.get_all_job_listings()
+    return await service.get_job_listings_page(page, {
+        "organization_id": organization_id,
+        "status": status,
+        "experience_level": experience_level,
+        "type": type,
+        "location_requirement": location_requirement,
+        "is_featured": is_featured,
+        "state_abbreviation": state_abbreviation,
+        "city": city,
+    })
 
 
 @router.put("/job_listings/{job_listing_id}", response_model=JobListing)
-def update_job_listing(job_listing_id: str, job_listing_in: JobListingUpdate, db: Session = Depends(get_db)):
+async def update_job_listing(job_listing_id: UUID, job_listing_in: JobListingUpdate,
+                             db: AsyncSession = Depends(get_async_db)):
     service = JobListingService(db)
-    job_listing = service.update_job_listing(job_listing_id, job_listing_in)
+    job_listing = await service.update_job_listing(job_listing_id, job_listing_in)
     if not job_listing:
         raise HTTPException(status_code=404, detail="Job Listing not found")
     return job_listing
 
 
 @router.delete("/job_listings/{job_listing_id}", status_code=204)
-def delete_job_listing(job_listing_id: str, db: Session = Depends(get_db)):
+async def delete_job_listing(job_listing_id: UUID, db: AsyncSession = Depends(get_async_db)):
     service = JobListingService(db)
-    service.delete_job_listing(job_listing_id)
+    await service.delete_job_listing(job_listing_id)
     return {"ok": True}
@@ -1,50 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from uuid import UUID
 
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import get_settings
+from app.core.dependencies.pagination import get_page_params
+from app.db.enums import ApplicationStage
+from app.db.session import get_async_db, get_database
+from app.repositories.pagination import PageParams
 from app.schemas.job_listing_application import JobListingApplicationCreate, JobListingApplicationUpdate, \
-    JobListingApplicationResponse as JobListingApplication
+    JobListingApplicationResponse as JobListingApplication, RankedJobListingApplication
+from app.schemas.pagination import Page
 from app.services.job_listing_application_service import JobListingApplicationService
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
 
 @router.post("/job_listing_applications", response_model=JobListingApplication)
-def create_job_listing_application(job_listing_application_in: JobListingApplicationCreate,
-                                   db: Session = Depends(get_db)):
+async def create_job_listing_application(job_listing_application_in: JobListingApplicationCreate,
+                                         db: AsyncSession = Depends(get_async_db)):
+    service = JobListingApplicationService(db)
+    return await service.create_job_listing_application(job_listing_application_in)
+
+
+@router.get("/job_listing_applications/export", response_class=StreamingResponse)
+async def export_job_listing_applications(format: Literal["csv", "ndjson"] = "csv",
+                                          job_listing_id: Optional[UUID] = None,
+                                          organization_id: Optional[str] = None):
+    if job_listing_id is None and organization_id is None:
+        raise HTTPException(status_code=400, detail="Export needs a job_listing_id or an organization_id")
+
+    async def export_chunks():
+        # The session lives as long as the response body; a request-scoped dependency may be closed before
+        # streaming starts
+        async with get_database().AsyncSessionLocal() as db:
+            service = JobListingApplicationService(db)
+            async for chunk in service.export_job_listing_applications(format, job_listing_id, organization_id):
+                yield chunk
+
+    filename = f"job_listing_applications_{job_listing_id or organization_id}.{format}"
+    return StreamingResponse(export_chunks(), media_type=EXPORT_MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/job_listing_applications/ranked", response_model=list[RankedJobListingApplication])
+async def get_ranked_job_listing_applications(job_listing_id: UUID, limit: Optional[int] = Query(None, ge=1),
+                                              db: AsyncSession = Depends(get_async_db)):
+    """A listing's applications that fit it best, by resume summary similarity, rating and stage"""
+    settings = get_settings()
     service = JobListingApplicationService(db)
-    return service.create_job_listing_application(job_listing_application_in)
+    ranked = await service.rank_job_listing_applications(
+        job_listing_id, min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX))
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Job Listing not found")
+    return ranked
 
 
-@router.get("/job_listing_applications/{job_listing_application_id}", response_model=JobListingApplication)
-def get_job_listing_application(job_listing_application_id: str, db: Session = Depends(get_db)):
+@router.get("/job_listing_applications/{job_listing_id}/{user_id}", response_model=JobListingApplication)
+async def get_job_listing_application(job_listing_id: UUID, user_id: str, db: AsyncSession = Depends(get_async_db)):
     service = JobListingApplicationService(db)
-    job_listing_application = service.get_job_listing_application_by_id(job_listing_application_id)
+    job_listing_application = await service.get_job_listing_application_by_id(job_listing_id, user_id)
     if not job_listing_application:
         raise HTTPException(status_code=404, detail="Job Listing Application not found")
     return job_listing_application
 
 
-@router.get("/job_listing_applications", response_model=list[JobListingApplication])
-def get_all_job_listing_applications(db: Session = Depends(get_db)):
+@router.get("/job_listing_applications", response_model=Page[JobListingApplication])
+async def get_all_job_listing_applications(job_listing_id: Optional[UUID] = None, user_id: Optional[str] = None,
+                                           stage: Optional[ApplicationStage] = None,
+                                           page: PageParams = Depends(get_page_params),
+                                           db: AsyncSession = Depends(get_async_db)):
     service = JobListingApplicationService(db)
-    return service.get_all_job_listing_applications()
+    return await service.get_job_listing_applications_page(
+        page, {"job_listing_id": job_listing_id, "user_id": user_id, "stage": stage})
 
 
-@router.put("/job_listing_applications/{job_listing_application_id}", response_model=JobListingApplication)
-def update_job_listing_application(job_listing_application_id: str,
-                                   job_listing_application_in: JobListingApplicationUpdate,
-                                   db: Session = Depends(get_db)):
+@router.put("/job_listing_applications/{job_listing_id}/{user_id}", response_model=JobListingApplication)
+async def update_job_listing_application(job_listing_id: UUID, user_id: str,
+                                         job_listing_application_in: JobListingApplicationUpdate,
+                                         db: AsyncSession = Depends(get_async_db)):
     service = JobListingApplicationService(db)
-    job_listing_application = service.update_job_listing_application(job_listing_application_id,
-                                                                     job_listing_application_in)
+    job_listing_application = await service.update_job_listing_application(job_listing_id, user_id,
+                                                                           job_listing_application_in)
     if not job_listing_application:
         raise HTTPException(status_code=404, detail="Job Listing Application not found")
     return job_listing_application
 
 
-@router.delete("/job_listing_applications/{job_listing_application_id}", status_code=204)
-def delete_job_listing_application(job_listing_application_id: str, db: Session = Depends(get_db)):
+@router.delete("/job_listing_applications/{job_listing_id}/{user_id}", status_code=204)
+async def delete_job_listing_application(job_listing_id: UUID, user_id: str,
+                                         db: AsyncSession = Depends(get_async_db)):
     service = JobListingApplicationService(db)
-    service.delete_job_listing_application(job_listing_application_id)
+    await service.delete_job_listing_application(job_listing_id, user_id)
     return {"ok": True}
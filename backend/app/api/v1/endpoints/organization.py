@@ -1,8 +1,14 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.dependencies.pagination import get_page_params
 from app.db.session import get_db
+from app.repositories.pagination import PageParams
+from app.schemas.batch import Batch
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate, OrganizationResponse as Organization
+from app.schemas.pagination import Page
 from app.services.organization_service import OrganizationService
 
 router = APIRouter()
@@ -14,6 +20,12 @@ def create_organization(organization_in: OrganizationCreate, db: Session = Depen
     return service.create_organization(organization_in)
 
 
+@router.post("/organizations/batch", response_model=list[Organization])
+def upsert_organizations(organizations_in: Batch[OrganizationCreate], db: Session = Depends(get_db)):
+    service = OrganizationService(db)
+    return service.upsert_organizations(organizations_in)
+
+
 @router.get("/organizations/{organization_id}", response_model=Organization)
 def get_organization(organization_id: str, db: Session = Depends(get_db)):
     service = OrganizationService(db)
@@ -23,10 +35,11 @@ def get_organization(organization_id: str, db: Session = Depends(get_db)):
     return organization
 
 
-@router.get("/organizations", response_model=list[Organization])
-def get_all_organizations(db: Session = Depends(get_db)):
+@router.get("/organizations", response_model=Page[Organization])
+def get_all_organizations(name: Optional[str] = None, page: PageParams = Depends(get_page_params),
+                          db: Session = Depends(get_db)):
     service = OrganizationService(db)
-    return service.get_all_organizations()
+    return service.get_organizations_page(page, {"name": name})
 
 
 @router.put("/organizations/{organization_id}", response_model=Organization)
@@ -1,9 +1,14 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.dependencies.pagination import get_page_params
 from app.db.session import get_db
+from app.repositories.pagination import PageParams
 from app.schemas.organization_user_settings import OrganizationUserSettingsCreate, OrganizationUserSettingsUpdate, \
     OrganizationUserSettingsResponse as OrganizationUserSettings
+from app.schemas.pagination import Page
 from app.services.organization_user_settings_service import OrganizationUserSettingsService
 
 router = APIRouter()
@@ -25,10 +30,11 @@ def get_organization_user_settings(organization_user_settings_id: str, db: Sessi
     return organization_user_settings
 
 
-@router.get("/organization_user_settings", response_model=list[OrganizationUserSettings])
-def get_all_organization_user_settings(db: Session = Depends(get_db)):
+@router.get("/organization_user_settings", response_model=Page[OrganizationUserSettings])
+def get_all_organization_user_settings(user_id: Optional[str] = None, organization_id: Optional[str] = None,
+                                       page: PageParams = Depends(get_page_params), db: Session = Depends(get_db)):
     service = OrganizationUserSettingsService(db)
-    return service.get_all_organization_user_settings()
+    return service.get_organization_user_settings_page(page, {"user_id": user_id, "organization_id": organization_id})
 
 
 @router.put("/organization_user_settings/{organization_user_settings_id}", response_model=OrganizationUserSettings)
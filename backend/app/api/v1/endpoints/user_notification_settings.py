@@ -1,9 +1,14 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.dependencies.pagination import get_page_params
 from app.db.session import get_db
+from app.repositories.pagination import PageParams
 from app.schemas.user_notification_settings import UserNotificationSettingsCreate, UserNotificationSettingsUpdate, \
     UserNotificationSettingsResponse as UserNotificationSettings
+from app.schemas.pagination import Page
 from app.services.user_notification_settings_service import UserNotificationSettingsService
 
 router = APIRouter()
@@ -25,10 +30,11 @@ def get_user_notification_settings(user_notification_settings_id: str, db: Sessi
     return user_notification_settings
 
 
-@router.get("/user_notification_settings", response_model=list[UserNotificationSettings])
-def get_all_user_notification_settings(db: Session = Depends(get_db)):
+@router.get("/user_notification_settings", response_model=Page[UserNotificationSettings])
+def get_all_user_notification_settings(user_id: Optional[str] = None, page: PageParams = Depends(get_page_params),
+                                       db: Session = Depends(get_db)):
     service = UserNotificationSettingsService(db)
-    return service.get_all_user_notification_settings()
+    return service.get_user_notification_settings_page(page, {"user_id": user_id})
 
 
 @router.put("/user_notification_settings/{user_notification_settings_id}", response_model=UserNotificationSettings)
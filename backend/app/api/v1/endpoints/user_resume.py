@@ -1,8 +1,13 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.dependencies.pagination import get_page_params
 from app.db.session import get_db
+from app.repositories.pagination import PageParams
 from app.schemas.user_resume import UserResumeCreate, UserResumeUpdate, UserResumeResponse as UserResume
+from app.schemas.pagination import Page
 from app.services.user_resume_service import UserResumeService
 
 router = APIRouter()
@@ -23,10 +28,11 @@ def get_user_resume(user_resume_id: str, db: Session = Depends(get_db)):
     return user_resume
 
 
-@router.get("/user_resumes", response_model=list[UserResume])
-def get_all_user_resumes(db: Session = Depends(get_db)):
+@router.get("/user_resumes", response_model=Page[UserResume])
+def get_all_user_resumes(user_id: Optional[str] = None, page: PageParams = Depends(get_page_params),
+                         db: Session = Depends(get_db)):
     service = UserResumeService(db)
-    return service.get_all_user_resumes()
+    return service.get_user_resumes_page(page, {"user_id": user_id})
 
 
 @router.put("/user_resumes/{user_resume_id}", response_model=UserResume)
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config.settings import get_settings
+
 from app.core.dependencies.clerk.clerk_dependencies import (
     require_clerk_auth,
     get_current_user_id,
 )
-from app.db.session import get_db
+from app.core.dependencies.pagination import get_page_params
+from app.db.session import get_async_db, get_db
+from app.repositories.pagination import PageParams
+from app.schemas.batch import Batch
+from app.schemas.job_listing import JobListingResponse
+from app.schemas.pagination import Page
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
+from app.services.job_listing_service import JobListingService
 from app.services.user_service import UserService
 
 router = APIRouter()
@@ -22,12 +33,21 @@ def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
     return user
 
 
-@router.get("/", response_model=list[UserResponse], dependencies=[Depends(require_clerk_auth)])
-def get_all_users(db: Session = Depends(get_db)):
+@router.post("/batch", response_model=list[UserResponse], dependencies=[Depends(require_clerk_auth)])
+def upsert_users(users_in: Batch[UserCreate], db: Session = Depends(get_db)):
+    # Creates or updates users by Clerk ID, e.g. for a backfill from Clerk.
+    # Like create_user, this should ideally be restricted to admins.
+    user_service = UserService(db)
+    return user_service.upsert_users(users_in)
+
+
+@router.get("/", response_model=Page[UserResponse], dependencies=[Depends(require_clerk_auth)])
+def get_all_users(email: Optional[str] = None, page: PageParams = Depends(get_page_params),
+                  db: Session = Depends(get_db)):
     # This endpoint should ideally be restricted to admins.
-    # For now, any authenticated user can get all users.
+    # For now, any authenticated user can list users.
     user_service = UserService(db)
-    users = user_service.get_all_users()
+    users = user_service.get_users_page(page, {"email": email})
     return users
 
 
@@ -59,6 +79,19 @@ def delete_me(db: Session = Depends(get_db), user_id: str = Depends(get_current_
     return
 
 
+@router.get("/me/recommendations", response_model=list[JobListingResponse], dependencies=[Depends(require_clerk_auth)])
+async def get_my_recommendations(limit: Optional[int] = Query(None, ge=1), db: AsyncSession = Depends(get_async_db),
+                                 user_id: str = Depends(get_current_user_id)):
+    """Published job listings closest to the user's resume summary, found in this worker's recommendation index"""
+    settings = get_settings()
+    service = JobListingService(db)
+    job_listings = await service.recommend_job_listings(
+        user_id, min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX))
+    if job_listings is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume summary not found")
+    return job_listings
+
+
 @router.get("/{user_id}", response_model=UserResponse, dependencies=[Depends(require_clerk_auth)])
 def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
     # This endpoint should ideally be restricted to admins.
@@ -1,10 +1,10 @@
 from fastapi import APIRouter
 
 from app.api.v1.endpoints import users, job_listing, job_listing_application, organization, organization_user_settings, \
-    user_notification_settings, user_resume
+    user_notification_settings, user_resume, internal
 
 api_router = APIRouter()
-api_router.include_router(users.router, tags=["users"])
+api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(job_listing.router, tags=["job_listings"])
 api_router.include_router(job_listing_application.router,
                           tags=["job_listing_applications"])
@@ -14,3 +14,4 @@ api_router.include_router(organization_user_settings.router,
 api_router.include_router(user_notification_settings.router,
                           tags=["user_notification_settings"])
 api_router.include_router(user_resume.router, tags=["user_resumes"])
+api_router.include_router(internal.router, tags=["internal"])
@@ -32,7 +32,12 @@ class StructuredFormatter(logging.Formatter):
 
 
 def setup_logging(level: str = "INFO") -> None:
-    """Setup structured logging configuration"""
+    """Setup structured logging configuration (idempotent: repeated calls only update the level)"""
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, level.upper()))
+    if any(isinstance(handler.formatter, StructuredFormatter) for handler in root_logger.handlers):
+        return
     
     # Create formatter
     formatter = StructuredFormatter()
@@ -42,8 +47,6 @@ def setup_logging(level: str = "INFO") -> None:
     console_handler.setFormatter(formatter)
     
     # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, level.upper()))
     root_logger.addHandler(console_handler)
     
     # Prevent duplicate logs
@@ -89,6 +92,14 @@ def log_auth_event(
     logger.log(log_level, message, extra=extra_data)
 
 
-# Initialize logging
-setup_logging()
-logger = logging.getLogger(__name__)
+def log_event(
+    logger: logging.Logger,
+    event_type: str,
+    message: str,
+    level: str = "INFO",
+    **fields: Any
+) -> None:
+    """Log a non-auth event; fields are emitted as top-level keys by StructuredFormatter"""
+    log_level = getattr(logging, level.upper())
+    logger.log(log_level, message, extra={"extra": {"event_type": event_type, **fields}})
+
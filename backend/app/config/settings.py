@@ -1,9 +1,13 @@
+import logging
 import os
+from functools import lru_cache
 from typing import List, Optional
-from pydantic import field_validator, ValidationInfo
+from pydantic import Field, field_validator, ValidationInfo
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 
 def load_environment_file():
     """Load the appropriate environment file based on the ENVIRONMENT variable."""
@@ -35,23 +39,19 @@ def load_environment_file():
             loaded_files.append(env_file)
     
     if loaded_files:
-        print(f"Loaded environment files: {', '.join(loaded_files)} for environment: {environment}")
+        logger.info(f"Loaded environment files: {', '.join(loaded_files)} for environment: {environment}")
     else:
-        print(f"No environment files found for environment: {environment}, using system environment variables")
+        logger.info(f"No environment files found for environment: {environment}, using system environment variables")
     
     return environment, loaded_files
 
 
-# Load environment files before class definition
-current_environment, loaded_env_files = load_environment_file()
-
-
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Job Board AI"
     API_V1_STR: str = "/api/v1"
     
     # Environment detection
-    ENVIRONMENT: str = current_environment
+    ENVIRONMENT: str = Field(default_factory=lambda: os.getenv('ENVIRONMENT', 'development').lower())
     
     # Dynamic environment file selection based on environment
     model_config = SettingsConfigDict(
@@ -61,6 +61,73 @@ class Settings(BaseSettings):
 
     # Database settings
     DATABASE_URL: Optional[str] = None
+    # Optional explicit async URL; derived from DATABASE_URL (aiosqlite/asyncpg) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool settings (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+
+    # Read replicas (sync URLs); read-only queries are spread across them
+    DATABASE_REPLICA_URLS: List[str] = []
+    # Seconds a client that just wrote keeps reading from the primary
+    READ_YOUR_WRITES_WINDOW_SECONDS: int = 5
+
+    # SQL instrumentation: per-request query counts/time, N+1 detection and slow-query log
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # same statement shape run more often than this in one request
+    SQL_SLOW_QUERY_MS: int = 200
+
+    # Pagination for list endpoints
+    PAGE_SIZE_DEFAULT: int = 20
+    PAGE_SIZE_MAX: int = 100
+    PAGE_OFFSET_MAX: int = 10000  # deeper pages must use the cursor
+    PAGE_COUNT_MAX: int = 10000  # ?include_total= counts stop here and report an estimate
+
+    # Rows per statement for repository bulk_create/bulk_upsert/bulk_update
+    BULK_WRITE_CHUNK_SIZE: int = 500
+    IMPORT_ERRORS_MAX: int = 1000  # failed rows listed in an import report
+    IMPORT_ROW_MAX_BYTES: int = 1_048_576  # longer import lines, or CSV quoted fields, are reported, not buffered
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched from the server-side cursor per export chunk
+    SEARCH_CANDIDATES_MAX: int = 1000  # newest keyword matches a search ranks and pages through
+
+    # In-memory keyword index of published job listings (GET /job_listings/search/instant), one per worker
+    SEARCH_INDEX_ENABLED: bool = True
+    SEARCH_INDEX_REFRESH_SECONDS: int = 30  # how often listings written by other workers are picked up
+    # Refreshes re-read rows updated up to this long before the newest they read: updated_at is stamped when the
+    # writing transaction starts, so it should exceed the longest write transaction (the largest import)
+    REFRESH_OVERLAP_SECONDS: int = 600
+    # Facet counts (GET /job_listings/facets) cached per worker by filter set
+    FACET_CACHE_MAX_ENTRIES: int = 1024
+    FACET_CACHE_TTL_SECONDS: int = 60  # bounds how long other workers' writes take to show
+    # Suggestions kept per prefix by the autocomplete tries (GET /job_listings/search/autocomplete); the most a request
+    # can ask for
+    AUTOCOMPLETE_TOP_K: int = 10
+    # Homepage feed (GET /job_listings/homepage) precomputed per worker: listings shown in each list
+    HOMEPAGE_FEATURED_LIMIT: int = 6
+    HOMEPAGE_RECENT_LIMIT: int = 20
+    HOMEPAGE_FEED_TTL_SECONDS: int = 60  # bounds how long other workers' writes take to show
+    # Embeddings of published job listings and resume summaries for AI job matching, kept current in the background
+    EMBEDDINGS_ENABLED: bool = True
+    EMBEDDING_REFRESH_SECONDS: int = 60  # how often changed listings and resumes are embedded
+    EMBEDDER: str = "hashed_terms"  # a built-in embedder, or the dotted path of an embedder class
+    EMBEDDING_DIMENSIONS: int = 256
+    EMBEDDING_BATCH_SIZE: int = 256  # texts read, embedded and stored per batch
+    # Job recommendations (GET /users/me/recommendations): approximate nearest neighbour index of published listing
+    # embeddings per worker, rebuilt from the database at startup unless RECOMMENDATION_INDEX_PATH names a file in a
+    # data directory to save it to and reload it from
+    RECOMMENDATIONS_ENABLED: bool = True
+    RECOMMENDATION_INDEX_PATH: Optional[str] = None
+    RECOMMENDATION_INDEX_REFRESH_SECONDS: int = 30
+    RECOMMENDATION_INDEX_PROBES: int = 32  # lists searched per query; more is slower and closer to exact search
+    # Applications of a listing ranked by fit (GET /job_listing_applications/ranked), cached per worker by listing
+    APPLICATION_RANKING_CACHE_MAX_ENTRIES: int = 256
+    APPLICATION_RANKING_CACHE_TTL_SECONDS: int = 300  # bounds how long resume and listing edits take to show
+    # Radius search (GET /job_listings/search/nearby) seeks the location index once per gazetteer place in range
+    NEARBY_RADIUS_MILES_MAX: int = 250
 
     # JWT settings
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -68,6 +135,9 @@ class Settings(BaseSettings):
     # CORS settings
     CORS_ORIGINS: List[str] = ["*"]
 
+    # Bearer token of the /internal diagnostics endpoints (connection pools, startup timings); 404 when unset
+    INTERNAL_API_TOKEN: Optional[str] = None
+
     # Clerk settings
     CLERK_SECRET_KEY: Optional[str] = None
     CLERK_PUBLISHABLE_KEY: Optional[str] = None
@@ -132,28 +202,34 @@ class Settings(BaseSettings):
             )
         return v
 
-    def model_post_init(self, __context) -> None:
-        """Post-initialization hook to log configuration loading."""
-        # Log which environment files were loaded
-        if loaded_env_files:
-            print(f"Configuration loaded from environment files: {', '.join(loaded_env_files)}")
-        else:
-            print("No environment files found, using environment variables and defaults")
-        
-        print(f"Environment: {self.ENVIRONMENT}")
-        print(f"Configuration validation completed successfully")
 
+@lru_cache
 def get_settings() -> Settings:
-    """Factory function to create settings instance with proper error handling."""
+    """Load environment files and build the validated settings once, on first use."""
+    _, loaded_env_files = load_environment_file()
     try:
-        return Settings()
+        settings = Settings()
     except Exception as e:
-        print(f"Configuration Error: {str(e)}")
-        print("\nConfiguration Help:")
-        print("1. Ensure you have a .env file with required variables")
-        print("2. Check that all Clerk keys are properly formatted")
-        print("3. Verify DATABASE_URL is set correctly")
-        print("4. See .env.example for reference configuration")
+        logger.error(
+            f"Configuration Error: {str(e)}\n"
+            "\nConfiguration Help:\n"
+            "1. Ensure you have a .env file with required variables\n"
+            "2. Check that all Clerk keys are properly formatted\n"
+            "3. Verify DATABASE_URL is set correctly\n"
+            "4. See .env.example for reference configuration"
+        )
         raise
 
-settings = get_settings()
\ No newline at end of file
+    if loaded_env_files:
+        logger.info(f"Configuration loaded from environment files: {', '.join(loaded_env_files)}")
+    else:
+        logger.info("No environment files found, using environment variables and defaults")
+    logger.info(f"Environment: {settings.ENVIRONMENT}, configuration validation completed successfully")
+    return settings
+
+
+def __getattr__(name: str):
+    # `from app.config.settings import settings` keeps working, but nothing is loaded until it is accessed
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager, suppress
+from typing import AsyncIterator, Dict, Iterator
+
+from fastapi import FastAPI
+
+from app.config.logging import log_event
+from app.config.settings import get_settings
+
+logger = logging.getLogger("app.startup")
+
+# Milliseconds spent in each startup phase of this worker, in the order they ran
+startup_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Time one startup phase; the duration is recorded even when the phase fails"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def get_startup_timings() -> Dict[str, float]:
+    return dict(startup_timings)
+
+
+def log_startup_timings() -> None:
+    log_event(
+        logger,
+        "startup_complete",
+        f"Startup completed in {sum(startup_timings.values()):.1f}ms",
+        phases_ms=get_startup_timings(),
+        total_ms=round(sum(startup_timings.values()), 3),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Build the process-wide resources once, before the first request, and release them on shutdown.
+    Engine creation opens no connections; pools fill on demand. The in-memory keyword and recommendation indexes
+    build, and embeddings are computed, in the background, so none of them delays startup.
+    """
+    # Imported here rather than at the top, so that importing this module stays cheap and the application's own
+    # modules load within main's timed "imports" phase (they are loaded by then, and these are lookups)
+    from app.db.session import dispose_database, get_database
+    from app.search.job_listing_index import get_job_listing_index, maintain_job_listing_index
+    from app.search.recommendation_index import get_job_recommendation_index, maintain_job_recommendation_index
+    from app.services.embedding_service import maintain_embeddings
+
+    with startup_phase("database"):
+        database = get_database()
+    settings = get_settings()
+    background_tasks = []
+    if settings.SEARCH_INDEX_ENABLED:
+        background_tasks.append(asyncio.create_task(maintain_job_listing_index(
+            get_job_listing_index(), database.AsyncSessionLocal, settings.SEARCH_INDEX_REFRESH_SECONDS)))
+    if settings.EMBEDDINGS_ENABLED:
+        background_tasks.append(asyncio.create_task(maintain_embeddings(
+            database.AsyncSessionLocal, settings.EMBEDDING_REFRESH_SECONDS)))
+    if settings.RECOMMENDATIONS_ENABLED:
+        background_tasks.append(asyncio.create_task(maintain_job_recommendation_index(
+            get_job_recommendation_index(), database.AsyncSessionLocal, settings.RECOMMENDATION_INDEX_REFRESH_SECONDS)))
+    log_startup_timings()
+    yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await dispose_database()
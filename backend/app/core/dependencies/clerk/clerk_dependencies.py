@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional, Annotated
 from fastapi import Depends, HTTPException, status, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -7,13 +8,11 @@ from app.services.auth.clerk_auth_service import ClerkAuthService
 # Initialize security scheme
 security = HTTPBearer()
 
-# Initialize Clerk service
-clerk_service = ClerkAuthService()
-
 
+@lru_cache
 def get_clerk_service() -> ClerkAuthService:
-    """Dependency to get Clerk service instance"""
-    return clerk_service
+    """Dependency to get Clerk service instance, created on first use"""
+    return ClerkAuthService()
 
 
 def get_token_from_header(
@@ -0,0 +1,18 @@
+import hmac
+from typing import Annotated, Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.config.settings import get_settings
+
+
+def require_internal_token(authorization: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Dependency admitting requests that carry INTERNAL_API_TOKEN as a bearer token. Without the setting the internal
+    endpoints answer 404, as if they were not served.
+    """
+    token = get_settings().INTERNAL_API_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if authorization is None or not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid internal token")
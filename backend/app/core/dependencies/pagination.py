@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import Query
+
+from app.config.settings import get_settings
+from app.repositories.pagination import PageParams
+
+
+def get_page_params(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    offset: Optional[int] = Query(None, ge=0, description="Rows to skip; shallow pages only, use cursor beyond"),
+    limit: Optional[int] = Query(None, ge=1),
+    sort: Optional[str] = Query(None, description="Sort field, prefixed with '-' for descending"),
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,organization.name"),
+) -> PageParams:
+    """Dependency reading the shared list query parameters, with the page size capped at PAGE_SIZE_MAX"""
+    settings = get_settings()
+    field_names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip())) if fields else None
+    return PageParams(limit=min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX), cursor=cursor,
+                      offset=offset, sort=sort, include_total=include_total, fields=field_names or None)
@@ -1,18 +1,26 @@
-import uuid
-
-from sqlalchemy import Column, DateTime, func, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declarative_base
 
+from app.db.types import UUIDType, uuid7
+
 Base = declarative_base()
 
+# SQLite's CURRENT_TIMESTAMP has no fractional seconds. Binding parameters in the same format keeps keyset
+# comparisons on server-stamped timestamps exact (SQLite compares them as text).
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"), "sqlite")
+
 
 class TimestampMixin:
     """Mixin for created_at and updated_at timestamps"""
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(Timestamp, server_default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Fetch server-generated timestamps with INSERT/UPDATE ... RETURNING instead of a refresh round trip
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class UUIDMixin:
-    """Mixin for UUID primary key"""
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), nullable=False)
+    """Mixin for a 16-byte, time-ordered (UUID v7) primary key"""
+    id = Column(UUIDType, primary_key=True, default=uuid7, nullable=False)
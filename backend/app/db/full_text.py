@@ -0,0 +1,100 @@
+"""
+Full-text search over job listing titles and descriptions.
+
+PostgreSQL keeps a generated, weighted tsvector column (title 'A' above description 'B') behind a GIN index.
+SQLite, used locally and in tests, keeps an FTS5 index over the same two columns in sync with triggers and ranks
+with bm25 weighted the same way. Both stem English words, so the same keywords match on either database.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import DDL, Float, Table, column, event, table
+
+POSTGRES_DDL = [
+    "ALTER TABLE job_listings ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', description), 'B')) STORED",
+    "CREATE INDEX ix_job_listings_search_vector ON job_listings USING gin (search_vector)",
+]
+
+# External content table: the index reads title and description back from job_listings by rowid instead of
+# storing a second copy. Rowids of a table without an INTEGER PRIMARY KEY can change on VACUUM; run
+# INSERT INTO job_listings_fts(job_listings_fts) VALUES ('rebuild') afterwards.
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE job_listings_fts USING fts5("
+    "title, description, content='job_listings', tokenize='porter unicode61')",
+    # rank orders by bm25 with title matches weighing 2.5 times description matches
+    "INSERT INTO job_listings_fts (job_listings_fts, rank) VALUES ('rank', 'bm25(2.5, 1.0)')",
+    "CREATE TRIGGER job_listings_fts_insert AFTER INSERT ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER job_listings_fts_delete AFTER DELETE ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (job_listings_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER job_listings_fts_update AFTER UPDATE OF title, description ON job_listings BEGIN "
+    "INSERT INTO job_listings_fts (job_listings_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO job_listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+    "END",
+]
+
+# The FTS5 table as seen by queries: job_listings_fts MATCH for filtering, rank (lower is better) for ordering
+JOB_LISTINGS_FTS = table("job_listings_fts", column("rowid"), column("job_listings_fts"), column("rank", Float))
+
+WEBSEARCH_TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+WORD = re.compile(r"\w+")
+
+
+def register_full_text_ddl(job_listings: Table):
+    """Create the full-text column or index along with job_listings (create_all) and drop it before the table"""
+    for statement in POSTGRES_DDL:
+        event.listen(job_listings, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_DDL:
+        event.listen(job_listings, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(job_listings, "before_drop",
+                 DDL("DROP TABLE IF EXISTS job_listings_fts").execute_if(dialect="sqlite"))
+
+
+def parse_websearch(query: str) -> tuple[list[list[list[str]]], list[list[str]]]:
+    """
+    (groups, excluded) of a query in PostgreSQL's websearch_to_tsquery syntax: every group must match, a group
+    matches when any of its alternatives does and an alternative is the words of one term ("quoted words" are one
+    term). Words must all match, "or" between two terms makes them alternatives and a leading "-" excludes a term.
+    """
+    groups: list[list[list[str]]] = []
+    excluded: list[list[str]] = []
+    pending_or = False
+    for negated, phrase, word in WEBSEARCH_TOKEN.findall(query):
+        if word:
+            if word.lower() == "or":
+                pending_or = bool(groups)
+                continue
+            negated, phrase = ("-", word[1:]) if word.startswith("-") else ("", word)
+        words = WORD.findall(phrase)
+        if not words:
+            continue
+        if negated:
+            excluded.append(words)
+        elif pending_or:
+            groups[-1].append(words)
+        else:
+            groups.append([words])
+        pending_or = False
+    return groups, excluded
+
+
+def websearch_to_fts5(query: str) -> Optional[str]:
+    """
+    FTS5 query matching what PostgreSQL's websearch_to_tsquery does with the same text (see parse_websearch);
+    None when the query has no term to match.
+    """
+    groups, excluded = parse_websearch(query)
+    if not groups:
+        return None
+
+    # Quoting every term keeps FTS5 operators and column filters typed by users from being interpreted
+    def quoted(words: list[str]) -> str:
+        return '"' + " ".join(words) + '"'
+
+    matched = " AND ".join(f"({' OR '.join(map(quoted, group))})" for group in groups)
+    return f"({matched}) NOT ({' OR '.join(map(quoted, excluded))})" if excluded else matched
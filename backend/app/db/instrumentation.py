@@ -0,0 +1,85 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.logging import log_event
+
+logger = logging.getLogger("db.queries")
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists differ per call ("IN (?, ?)" vs "IN (?, ?, ?)") but are the same query shape
+_IN_LIST = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeated executions of the same query compare equal"""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while handling one request"""
+    count: int = 0
+    total_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def total_time_ms(self) -> float:
+        return round(self.total_time * 1000, 3)
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed more than threshold times: likely N+1 lazy loading"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def begin_query_stats() -> Token:
+    return _query_stats.set(QueryStats())
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+def end_query_stats(token: Token) -> None:
+    _query_stats.reset(token)
+
+
+def install_query_instrumentation(db_engine: Engine, name: str, slow_query_ms: int) -> None:
+    """Count and time every statement on the engine; slow statements are logged as they complete"""
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_start_time
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration * 1000 >= slow_query_ms:
+            log_event(
+                logger,
+                "slow_query",
+                f"Slow SQL statement took {duration * 1000:.1f}ms",
+                level="WARNING",
+                duration_ms=round(duration * 1000, 3),
+                statement=statement_shape(statement)[:1000],
+                executemany=executemany,
+                engine=name,
+            )
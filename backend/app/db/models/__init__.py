@@ -1,3 +1,4 @@
+from .embedding import JobListingEmbedding, UserResumeEmbedding
 from .job_listing import JobListing
 from .job_listing_application import JobListingApplication
 from .organization import Organization
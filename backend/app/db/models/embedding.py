@@ -0,0 +1,32 @@
+from sqlalchemy import Column, ForeignKey, LargeBinary, String
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base, TimestampMixin
+from app.db.types import UUIDType
+
+
+class JobListingEmbedding(Base, TimestampMixin):
+    """A job listing's title and description embedded for AI job matching (app.search.embeddings)"""
+    __tablename__ = "job_listing_embeddings"
+
+    job_listing_id = Column(UUIDType, ForeignKey("job_listings.id", ondelete="cascade"), primary_key=True,
+                            nullable=False)
+    # Of the text and the embedder the vector was computed with; the vector is recomputed when it changes
+    content_hash = Column(String, nullable=False)
+    # float16 values, EMBEDDING_DIMENSIONS of them
+    vector = Column(LargeBinary, nullable=False)
+
+    # Relationships
+    job_listing = relationship("JobListing", back_populates="embedding")
+
+
+class UserResumeEmbedding(Base, TimestampMixin):
+    """A resume's AI summary embedded for AI job matching (app.search.embeddings)"""
+    __tablename__ = "user_resume_embeddings"
+
+    user_id = Column(String, ForeignKey("user_resumes.user_id", ondelete="cascade"), primary_key=True, nullable=False)
+    content_hash = Column(String, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+
+    # Relationships
+    user_resume = relationship("UserResume", back_populates="embedding")
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Float, ForeignKey, Index, Text, func, text
+from sqlalchemy.orm import query_expression, relationship
 
 from app.db.base import Base, TimestampMixin, UUIDMixin
 from app.db.enums import WageIntervalEnum, LocationRequirementEnum, JobListingStatus, ExperienceLevelEnum, \
     JobListingStatusEnum, JobListingTypeEnum
+from app.db.full_text import register_full_text_ddl
 
 wage_intervals = ["hourly", "yearly"]
 location_requirements = ["in-office", "hybrid", "remote"]
@@ -11,6 +12,10 @@ experience_levels = ["junior", "mid-level", "senior"]
 job_listing_statuses = ["draft", "published", "delisted"]
 job_listing_types = ["internship", "part-time", "full-time"]
 
+# Enum columns store member names, so partial index predicates compare against 'PUBLISHED'
+PUBLISHED = text("status = 'PUBLISHED'")
+PUBLISHED_AND_FEATURED = text("status = 'PUBLISHED' AND is_featured")
+
 
 class JobListing(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "job_listings"
@@ -22,18 +27,60 @@ class JobListing(Base, UUIDMixin, TimestampMixin):
     wage_interval = Column(WageIntervalEnum)
     state_abbreviation = Column(String)
     city = Column(String)
+    # Located from city and state by the gazetteer (app.search.gazetteer) when written; NULL when not found
+    latitude = Column(Float)
+    longitude = Column(Float)
     is_featured = Column(Boolean, nullable=False, default=False)
     location_requirement = Column(LocationRequirementEnum, nullable=False)
     experience_level = Column(ExperienceLevelEnum, nullable=False)
     status = Column(JobListingStatusEnum, nullable=False, default=JobListingStatus.DRAFT)
     type = Column(JobListingTypeEnum, nullable=False)
     posted_at = Column(DateTime(timezone=True))
+    # Keyword search relevance, higher is better; loaded only by searches that rank by it
+    relevance = query_expression()
+    # Radius search closeness, the negated distance in miles so that higher is better like relevance
+    proximity = query_expression()
 
     # Relationships
     organization = relationship("Organization", back_populates="job_listings")
     applications = relationship("JobListingApplication", back_populates="job_listing", cascade="all, delete-orphan")
+    embedding = relationship("JobListingEmbedding", back_populates="job_listing", uselist=False,
+                             cascade="all, delete-orphan")
 
     # Indexes
     __table_args__ = (
         Index("ix_job_listings_state_abbreviation", "state_abbreviation"),
+        # Employer dashboard: an organization's listings by status
+        Index("ix_job_listings_organization_id_status", "organization_id", "status", posted_at.desc()),
+        # Listings changed since a point in time, read by the in-memory keyword index refresh
+        Index("ix_job_listings_updated_at", "updated_at"),
     )
+
+
+# Homepage feed (JobListingRepository.get_newest_published): the most recently posted published listings, and
+# featured ones, id breaking ties (declared here because id comes from the mixin)
+Index("ix_job_listings_published_posted_at", JobListing.posted_at.desc(), JobListing.id.desc(),
+      postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+Index("ix_job_listings_featured_posted_at", JobListing.posted_at.desc(), JobListing.id.desc(),
+      postgresql_where=PUBLISHED_AND_FEATURED, sqlite_where=PUBLISHED_AND_FEATURED)
+
+# Structured search (GET /job_listings/search): city and state are the selective filters, so each seeks its own
+# partial index (city case-insensitively) and reads newest first. The enum facets and wage bounds match a large share
+# of the rows; they trail the index so non-matching entries are skipped without reading the table, and without city
+# or state they are checked on the newest published rows until a page fills. An index leading with wage would return
+# rows in wage order and force a sort of the whole range.
+Index("ix_job_listings_published_city", func.lower(JobListing.city), JobListing.id.desc(),
+      JobListing.experience_level, JobListing.type, JobListing.location_requirement, JobListing.wage_interval,
+      JobListing.wage, postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+Index("ix_job_listings_published_state", JobListing.state_abbreviation, JobListing.id.desc(),
+      JobListing.experience_level, JobListing.type, JobListing.location_requirement, JobListing.wage_interval,
+      JobListing.wage, postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+
+# Radius search (GET /job_listings/search/nearby): listings sit on gazetteer points, so each point within the radius
+# seeks its (latitude, longitude) entries and reads them newest first, checking the other filters inside the index
+Index("ix_job_listings_published_location", JobListing.latitude, JobListing.longitude, JobListing.id.desc(),
+      JobListing.experience_level, JobListing.type, JobListing.location_requirement, JobListing.wage_interval,
+      JobListing.wage, postgresql_where=PUBLISHED, sqlite_where=PUBLISHED)
+
+# Full-text search over title and description; see app.db.full_text
+register_full_text_ddl(JobListing.__table__)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, PrimaryKeyConstraint, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, PrimaryKeyConstraint, Text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base, TimestampMixin
 from app.db.enums import ApplicationStage, ApplicationStageEnum
+from app.db.types import UUIDType
 
 application_stages = ["denied", "applied", "interested", "interviewed", "hired"]
 
@@ -10,17 +11,24 @@ application_stages = ["denied", "applied", "interested", "interviewed", "hired"]
 class JobListingApplication(Base, TimestampMixin):
     __tablename__ = "job_listing_applications"
 
-    job_listing_id = Column(String, ForeignKey("job_listings.id", ondelete="cascade"), nullable=False)
+    job_listing_id = Column(UUIDType, ForeignKey("job_listings.id", ondelete="cascade"), nullable=False)
     user_id = Column(String, ForeignKey("users.id", ondelete="cascade"), nullable=False)
     cover_letter = Column(Text)
     rating = Column(Integer)
     stage = Column(ApplicationStageEnum, nullable=False, default=ApplicationStage.APPLIED)
 
-    # Composite primary key
+    # Composite primary key; it already serves lookups by job_listing_id
     __table_args__ = (
         PrimaryKeyConstraint("job_listing_id", "user_id"),
+        # A listing's pipeline filtered by stage
+        Index("ix_job_listing_applications_job_listing_id_stage", "job_listing_id", "stage"),
     )
 
     # Relationships
     job_listing = relationship("JobListing", back_populates="applications")
     user = relationship("User", back_populates="applications")
+
+
+# A candidate's applications, newest first (declared here because created_at comes from the mixin)
+Index("ix_job_listing_applications_user_id_created_at",
+      JobListingApplication.user_id, JobListingApplication.created_at.desc())
@@ -14,3 +14,5 @@ class UserResume(Base, TimestampMixin):
 
     # Relationships
     user = relationship("User", back_populates="resume")
+    embedding = relationship("UserResumeEmbedding", back_populates="user_resume", uselist=False,
+                             cascade="all, delete-orphan")
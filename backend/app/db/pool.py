@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolStats:
+    """Thread-safe counters for connection checkouts from a single pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_checkout(self, wait_time: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """Combine the collected counters with the live state of the pool"""
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            })
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats["saturation"] = round(pool.checkedout() / capacity, 3) if capacity else None
+        return stats
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout so pool exhaustion shows up as wait time before it turns into timeouts"""
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """Build a pool class bound to its stats; Pool.recreate() keeps the class, so dispose() keeps the counters"""
+    return type(f"Instrumented{base.__name__}", (InstrumentedPoolMixin, base), {"stats": stats})
@@ -0,0 +1,66 @@
+import random
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class RoutingState:
+    """Per-request routing flags shared by every session opened while handling the request"""
+    pinned_to_primary: bool = False
+    wrote: bool = False
+
+
+_routing_state: ContextVar[Optional[RoutingState]] = ContextVar("db_routing_state", default=None)
+
+
+def begin_routing_state(pinned_to_primary: bool = False) -> Token:
+    return _routing_state.set(RoutingState(pinned_to_primary=pinned_to_primary))
+
+
+def get_routing_state() -> Optional[RoutingState]:
+    return _routing_state.get()
+
+
+def end_routing_state(token: Token) -> None:
+    _routing_state.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only statements to a replica and everything else to the primary (its bind).
+
+    Once a session flushes or executes DML it stays on the primary, and the current request is flagged so
+    the client can be pinned to the primary for a while (read-your-writes).
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self._mark_write()
+            return self.bind
+        if not self.replicas or not self._is_replica_safe(clause):
+            return self.bind
+        return random.choice(self.replicas)
+
+    def _is_replica_safe(self, clause) -> bool:
+        if clause is None or not getattr(clause, "is_select", False):
+            return False
+        if getattr(clause, "_for_update_arg", None) is not None:
+            return False
+        if self.info.get("wrote"):
+            return False
+        state = get_routing_state()
+        return not (state and state.pinned_to_primary)
+
+    def _mark_write(self) -> None:
+        self.info["wrote"] = True
+        state = get_routing_state()
+        if state:
+            state.wrote = True
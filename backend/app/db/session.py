@@ -1,23 +1,161 @@
-from typing import Generator
+import threading
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Type
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from app.config.settings import settings
+from app.config.settings import Settings, get_settings
+from app.db.instrumentation import install_query_instrumentation
+from app.db.pool import PoolStats, instrumented_pool_class
+from app.db.routing import RoutingSession
 
-DATABASE_URL = settings.DATABASE_URL
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    echo=False  # Set to True for SQL query logging
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_async_database_url(database_url: str) -> str:
+    """Derive the async driver URL from the sync DATABASE_URL"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_engine_options(database_url: str, pool_class: Type[Pool], stats: PoolStats,
+                       settings: Optional[Settings] = None) -> Dict[str, Any]:
+    """Pool configuration for an engine; in-memory SQLite keeps SQLAlchemy's single-connection pool"""
+    settings = settings or get_settings()
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"echo": False}  # Set echo to True for SQL query logging
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        poolclass=instrumented_pool_class(pool_class, stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+class Database:
+    """Engines and session factories of one worker process. Creating engines opens no connections."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.pool_stats: Dict[str, PoolStats] = {}
+        # Sync engines by name (async engines are registered through their sync_engine)
+        self.engines: Dict[str, Engine] = {}
+
+        self.database_url = settings.DATABASE_URL
+        self.async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(self.database_url)
+        self.engine = self._register_engine("primary", self.database_url)
+        self.async_engine = self._register_engine("primary_async", self.async_database_url, is_async=True)
+
+        # Read replicas; reads are routed to them by RoutingSession unless the request is pinned to the primary
+        self.replica_engines = [
+            self._register_engine(f"replica_{index}", url)
+            for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+        ]
+        self.async_replica_engines = [
+            self._register_engine(f"replica_{index}_async", get_async_database_url(url), is_async=True)
+            for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+        ]
+
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine,
+                                         class_=RoutingSession, replicas=self.replica_engines)
+        # expire_on_commit is disabled so committed objects can still be serialized without lazy IO
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replicas=[replica.sync_engine for replica in self.async_replica_engines],
+        )
+
+    def _register_engine(self, name: str, database_url: str, is_async: bool = False):
+        stats = self.pool_stats[name] = PoolStats(name)
+        if is_async:
+            async_db_engine = create_async_engine(
+                database_url, **get_engine_options(database_url, AsyncAdaptedQueuePool, stats, self.settings))
+            db_engine = self.engines[name] = async_db_engine.sync_engine
+        else:
+            db_engine = self.engines[name] = create_engine(
+                database_url, **get_engine_options(database_url, QueuePool, stats, self.settings))
+        if self.settings.SQL_INSTRUMENTATION_ENABLED:
+            install_query_instrumentation(db_engine, name, self.settings.SQL_SLOW_QUERY_MS)
+        return async_db_engine if is_async else db_engine
+
+    async def dispose(self) -> None:
+        for async_db_engine in (self.async_engine, *self.async_replica_engines):
+            await async_db_engine.dispose()
+        for db_engine in (self.engine, *self.replica_engines):
+            db_engine.dispose()
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """Build the engines on first use, exactly once per process"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database(get_settings())
+    return _database
+
+
+async def dispose_database() -> None:
+    """Close every pooled connection; the next get_database() call builds fresh engines"""
+    global _database
+    with _database_lock:
+        database, _database = _database, None
+    if database is not None:
+        await database.dispose()
+
+
+# Kept importable as module attributes (`from app.db.session import engine, SessionLocal`)
+_DATABASE_ATTRIBUTES = {
+    "engine", "async_engine", "replica_engines", "async_replica_engines", "SessionLocal", "AsyncSessionLocal",
+    "engines", "pool_stats",
+}
+
+
+def __getattr__(name: str):
+    if name in _DATABASE_ATTRIBUTES:
+        return getattr(get_database(), name)
+    if name == "DATABASE_URL":
+        return get_database().database_url
+    if name == "ASYNC_DATABASE_URL":
+        return get_database().async_database_url
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_pool_statistics() -> list[Dict[str, Any]]:
+    """Live checkout, overflow and wait-time statistics for every engine in this worker"""
+    database = get_database()
+    return [database.pool_stats[name].snapshot(db_engine.pool) for name, db_engine in database.engines.items()]
 
 
 def get_db() -> Generator:
-    db = SessionLocal()
+    db = get_database().SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_database().AsyncSessionLocal() as db:
+        yield db
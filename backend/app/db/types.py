@@ -0,0 +1,74 @@
+import secrets
+import threading
+import time
+import uuid
+
+from sqlalchemy import LargeBinary, Uuid
+from sqlalchemy.types import TypeDecorator
+
+_uuid7_lock = threading.Lock()
+_last_timestamp_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): a 48-bit Unix millisecond timestamp followed by random bits.
+    Within one millisecond a 12-bit counter keeps ids from this process strictly increasing, so new rows
+    append to the right edge of the primary key index instead of landing on random pages.
+    """
+    global _last_timestamp_ms, _counter
+    with _uuid7_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            _last_timestamp_ms = timestamp_ms
+            # Random start with the top bit clear leaves room for increments in the same millisecond
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond rather than break ordering
+                _last_timestamp_ms += 1
+                _counter = secrets.randbits(11)
+        timestamp_ms, counter = _last_timestamp_ms, _counter
+    value = (timestamp_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+class UUIDType(TypeDecorator):
+    """
+    UUID stored in 16 bytes: the native uuid type on PostgreSQL and a raw 16-byte BLOB elsewhere
+    (SQLAlchemy's generic Uuid would keep 32 hex characters on SQLite). Accepts UUIDs or their string form.
+    """
+    impl = Uuid
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return uuid.UUID
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(Uuid(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def literal_processor(self, dialect):
+        if dialect.name == "postgresql":
+            return super().literal_processor(dialect)
+
+        # SQLite's BLOB literal renderer expects text, so the 16 bytes are rendered as a hex blob literal
+        def process(value):
+            return f"X'{self.process_bind_param(value, dialect).hex().upper()}'"
+        return process
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=value)
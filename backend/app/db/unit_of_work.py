@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Transaction scope for a service operation: repositories only flush, and the outermost block commits
+    once on success or rolls back on error. Nested blocks join the enclosing unit of work.
+    """
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except BaseException:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Async counterpart of unit_of_work for AsyncSession based services"""
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            await db.commit()
+    except BaseException:
+        if depth == 0:
+            await db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
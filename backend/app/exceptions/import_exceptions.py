@@ -0,0 +1,8 @@
+"""
+Custom exceptions for bulk imports
+"""
+
+
+class ImportFileError(ValueError):
+    """Raised when an uploaded import file cannot be read at all, as opposed to errors in individual rows"""
+    pass
@@ -0,0 +1,33 @@
+"""
+Custom exceptions for paginated listings
+"""
+
+
+class PaginationError(ValueError):
+    """Base exception for list requests that cannot be served as asked"""
+    pass
+
+
+class InvalidCursorError(PaginationError):
+    """Raised when a pagination cursor cannot be decoded into sort key values"""
+    pass
+
+
+class InvalidSortError(PaginationError):
+    """Raised when a list is sorted by a field that is not whitelisted"""
+    pass
+
+
+class InvalidFilterError(PaginationError):
+    """Raised when a list is filtered by a field that is not whitelisted"""
+    pass
+
+
+class InvalidFieldError(PaginationError):
+    """Raised when ?fields= names a field the list cannot select"""
+    pass
+
+
+class OffsetTooLargeError(PaginationError):
+    """Raised when an offset page is deeper than PAGE_OFFSET_MAX; cursors serve deep pages"""
+    pass
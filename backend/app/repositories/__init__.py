@@ -1,3 +1,4 @@
+from .embedding_repository import JobListingEmbeddingRepository, UserResumeEmbeddingRepository
 from .job_listing_application_repository import JobListingApplicationRepository
 from .job_listing_repository import JobListingRepository
 from .organization_repository import OrganizationRepository
@@ -0,0 +1,318 @@
+import uuid
+from datetime import datetime
+from typing import Any, Generic, Iterator, Mapping, Optional, Sequence, TypeVar
+
+from sqlalchemy import Insert, Label, Result, Select, Update, func, insert, inspect, literal, select, text, tuple_, \
+    update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, with_expression
+
+from app.config.settings import get_settings
+from app.exceptions.pagination_exceptions import (
+    InvalidCursorError,
+    InvalidFieldError,
+    InvalidFilterError,
+    InvalidSortError,
+    OffsetTooLargeError,
+    PaginationError,
+)
+from app.repositories.pagination import PageParams, PageResult, decode_cursor, encode_cursor
+
+ModelType = TypeVar("ModelType")
+
+# Cursor values travel as strings; these rebuild the Python value of each sort column type
+CURSOR_CONVERTERS = {datetime: datetime.fromisoformat, uuid.UUID: uuid.UUID, int: int, float: float, str: str}
+
+# Row count from planner statistics; exact counts of large tables cost a full scan
+POSTGRES_ROW_ESTIMATE = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)")
+
+
+class PaginatedQueries(Generic[ModelType]):
+    """
+    List statements shared by the sync and async base repositories.
+
+    Subclasses whitelist the fields clients may filter on (equality) and sort by. Sort fields must be NOT NULL
+    columns: the primary key is appended as a tie-breaker, and (sort field, primary key) forms the keyset that
+    cursors seek past, so every cursor page is an index range scan however deep it is.
+
+    A query may add computed sort fields (e.g. search relevance) as labelled expressions. Unless the page is
+    projected, each is loaded into the model's query_expression() attribute of the same name, which the next cursor
+    is read from.
+    """
+    model: type[ModelType]
+    # Loader options for every row a repository returns, e.g. eager loaded relationships
+    load_options: tuple = ()
+    filter_fields: dict[str, Any] = {}
+    sort_fields: dict[str, Any] = {}
+    # Sort field name, "-" prefixed for descending
+    default_sort: str
+    # Relationships whose columns ?fields= may select as "<name>.<column>", e.g. organization.name
+    projection_joins: dict[str, Any] = {}
+
+    def _select(self) -> Select:
+        return select(self.model).options(*self.load_options)
+
+    def _projection_columns(self) -> dict[str, Any]:
+        columns = {attribute.key: getattr(self.model, attribute.key) for attribute in inspect(self.model).column_attrs}
+        for prefix, relationship in self.projection_joins.items():
+            target = relationship.property.mapper
+            columns.update({f"{prefix}.{attribute.key}": getattr(target.class_, attribute.key)
+                            for attribute in target.column_attrs})
+        return columns
+
+    def _projected_select(self, fields: Sequence[str], keyset_columns: list) -> Select:
+        """
+        Only the requested columns, labelled with their field names, plus the keyset columns the next cursor is
+        built from. Relationships are joined only when one of their columns is requested.
+        """
+        available = self._projection_columns()
+        unknown = [field for field in fields if field not in available]
+        if unknown:
+            raise InvalidFieldError(f"Unknown fields: {', '.join(unknown)}")
+        labelled = {field: available[field].label(field) for field in fields}
+        for column in keyset_columns:
+            # A computed sort field replaces the placeholder of its query_expression() attribute
+            if isinstance(column, Label) or column.key not in labelled:
+                labelled[column.key] = column.label(column.key)
+        stmt = select(*labelled.values()).select_from(self.model)
+        for prefix in dict.fromkeys(field.split(".")[0] for field in fields if "." in field):
+            stmt = stmt.outerjoin(self.projection_joins[prefix])
+        return stmt
+
+    @staticmethod
+    def _nested(row: Mapping[str, Any], fields: Sequence[str]) -> dict[str, Any]:
+        item: dict[str, Any] = {}
+        for field in fields:
+            *path, name = field.split(".")
+            target = item
+            for part in path:
+                target = target.setdefault(part, {})
+            target[name] = row[field]
+        return item
+
+    def _primary_key(self) -> list:
+        return [getattr(self.model, column.key) for column in inspect(self.model).primary_key]
+
+    def _filtered(self, stmt: Select, filters: Mapping[str, Any]) -> Select:
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in self.filter_fields:
+                raise InvalidFilterError(f"Cannot filter by '{name}'")
+            stmt = stmt.where(self.filter_fields[name] == value)
+        return stmt
+
+    def _keyset_columns(self, sort: str, sort_fields: Optional[Mapping[str, Any]] = None) -> list:
+        sort_fields = {**self.sort_fields, **(sort_fields or {})}
+        name = sort.removeprefix("-")
+        if name not in sort_fields:
+            raise InvalidSortError(f"Cannot sort by '{name}', allowed: {', '.join(sorted(sort_fields))}")
+        column = sort_fields[name]
+        return [column] + [key for key in self._primary_key() if key.key != column.key]
+
+    def _page_statement(self, params: PageParams, filters: Mapping[str, Any], conditions: Sequence = (),
+                        sort_fields: Optional[Mapping[str, Any]] = None) -> tuple[Select, str, list]:
+        sort = params.sort or self.default_sort
+        descending = sort.startswith("-")
+        columns = self._keyset_columns(sort, sort_fields)
+        if params.fields:
+            stmt = self._projected_select(params.fields, columns)
+        else:
+            stmt = self._select().options(*(with_expression(getattr(self.model, column.key), column.element)
+                                            for column in columns if isinstance(column, Label)))
+        stmt = self._filtered(stmt, filters).where(*conditions)
+        stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+        if params.cursor and params.offset is not None:
+            raise PaginationError("Use either cursor or offset, not both")
+        if params.cursor:
+            converters = [str] + [CURSOR_CONVERTERS[column.type.python_type] for column in columns]
+            cursor_sort, *values = decode_cursor(params.cursor, converters)
+            if cursor_sort != sort:
+                raise InvalidCursorError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+            keyset = tuple_(*columns)
+            last_row = tuple_(*(literal(value, column.type) for column, value in zip(columns, values)))
+            stmt = stmt.where(keyset < last_row if descending else keyset > last_row)
+        elif params.offset:
+            if params.offset > get_settings().PAGE_OFFSET_MAX:
+                raise OffsetTooLargeError(
+                    f"Offset {params.offset} exceeds {get_settings().PAGE_OFFSET_MAX}; page with the cursor instead")
+            stmt = stmt.offset(params.offset)
+        # The extra row only tells whether another page exists
+        return stmt.limit(params.limit + 1), sort, columns
+
+    def _page_result(self, result: Result, params: PageParams, sort: str, columns: list) -> PageResult:
+        # Projected pages are rows of labelled columns, turned into nested dicts of the requested fields
+        rows = list(result.all() if params.fields else result.scalars().all())
+        page = PageResult(items=rows[:params.limit])
+        if len(rows) > params.limit:
+            if params.offset is not None:
+                page.next_offset = params.offset + params.limit
+            else:
+                last = page.items[-1]
+                page.next_cursor = encode_cursor([sort] + [getattr(last, column.key) for column in columns])
+        if params.fields:
+            page.items = [self._nested(row._mapping, params.fields) for row in page.items]
+        return page
+
+    def _count_statement(self, filters: Mapping[str, Any], conditions: Sequence = ()) -> Select:
+        # Counting stops one past the cap, so the cost stays bounded on large tables
+        limited = self._filtered(select(*self._primary_key()), filters).where(*conditions).limit(
+            get_settings().PAGE_COUNT_MAX + 1)
+        return select(func.count()).select_from(limited.subquery())
+
+    def _uses_row_estimate(self, dialect_name: str, filters: Mapping[str, Any], conditions: Sequence = ()) -> bool:
+        return dialect_name == "postgresql" and not conditions and all(value is None for value in filters.values())
+
+    @staticmethod
+    def _capped_total(count: int) -> tuple[int, bool]:
+        cap = get_settings().PAGE_COUNT_MAX
+        return min(count, cap), count > cap
+
+
+class BulkWriteStatements(PaginatedQueries[ModelType]):
+    """
+    Multi-row writes from plain dicts of column values. Each chunk of rows is sent as one statement (SQLAlchemy
+    renders INSERT ... RETURNING with a multi-row VALUES clause), so writing N rows costs N / chunk size round
+    trips instead of an add, commit and refresh per row.
+    """
+
+    @staticmethod
+    def _chunks(rows: Sequence[Mapping[str, Any]]) -> Iterator[Sequence[Mapping[str, Any]]]:
+        size = get_settings().BULK_WRITE_CHUNK_SIZE
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+    def _insert_statement(self) -> Insert:
+        return insert(self.model).returning(self.model).options(*self.load_options)
+
+    def _upsert_statement(self, dialect_name: str, rows: Sequence[Mapping[str, Any]],
+                          conflict_fields: Optional[Sequence[str]], update_fields: Optional[Sequence[str]]) -> Insert:
+        fields = set(rows[0])
+        if any(set(row) != fields for row in rows):
+            raise ValueError("Every row of a bulk upsert must set the same fields")
+        primary_key = [key.key for key in self._primary_key()]
+        conflict_fields = list(conflict_fields or primary_key)
+        if update_fields is None:
+            # The primary key of an existing row is never rewritten, even when the conflict is on another key
+            update_fields = sorted(fields - set(conflict_fields) - set(primary_key))
+
+        if dialect_name == "postgresql":
+            stmt = postgresql.insert(self.model)
+        elif dialect_name == "sqlite":
+            stmt = sqlite.insert(self.model)
+        else:
+            raise NotImplementedError(f"Bulk upsert is not supported on {dialect_name}")
+        values = {name: stmt.excluded[name] for name in update_fields}
+        if "updated_at" in self.model.__table__.c and "updated_at" not in values:
+            values["updated_at"] = func.now()
+        return stmt.on_conflict_do_update(index_elements=conflict_fields, set_=values).returning(
+            self.model).options(*self.load_options)
+
+    def _update_statement(self) -> Update:
+        # ORM bulk UPDATE by primary key: every row carries its primary key and the columns to change
+        return update(self.model)
+
+    def _reload_statement(self, rows: Sequence[Mapping[str, Any]]) -> Select:
+        primary_key = self._primary_key()
+        keys = [tuple(row[key.key] for key in primary_key) for row in rows]
+        return self._select().where(tuple_(*primary_key).in_(keys)).execution_options(populate_existing=True)
+
+
+class BaseRepository(BulkWriteStatements[ModelType]):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_page(self, params: PageParams, filters: Optional[Mapping[str, Any]] = None, conditions: Sequence = (),
+                 sort_fields: Optional[Mapping[str, Any]] = None) -> PageResult[ModelType]:
+        """
+        One page of rows matching the whitelisted equality filters and any extra where clauses (conditions),
+        sorted by a whitelisted field or one of the query's own computed sort_fields
+        """
+        filters = filters or {}
+        stmt, sort, columns = self._page_statement(params, filters, conditions, sort_fields)
+        result = self._page_result(self.db.execute(stmt), params, sort, columns)
+        if params.include_total:
+            result.total, result.total_is_estimate = self._total(filters, conditions)
+        return result
+
+    def _total(self, filters: Mapping[str, Any], conditions: Sequence = ()) -> tuple[int, bool]:
+        if self._uses_row_estimate(self.db.bind.dialect.name, filters, conditions):
+            estimate = self.db.execute(POSTGRES_ROW_ESTIMATE, {"table_name": self.model.__tablename__}).scalar()
+            # Small or never analyzed tables are cheap to count exactly
+            if estimate and estimate > get_settings().PAGE_COUNT_MAX:
+                return estimate, True
+        return self._capped_total(self.db.execute(self._count_statement(filters, conditions)).scalar_one())
+
+    def bulk_create(self, rows: Sequence[Mapping[str, Any]]) -> list[ModelType]:
+        created = []
+        for chunk in self._chunks(rows):
+            created.extend(self.db.execute(self._insert_statement(), chunk).scalars().all())
+        return created
+
+    def bulk_upsert(self, rows: Sequence[Mapping[str, Any]], conflict_fields: Optional[Sequence[str]] = None,
+                    update_fields: Optional[Sequence[str]] = None) -> list[ModelType]:
+        """
+        INSERT ... ON CONFLICT DO UPDATE ... RETURNING. Conflicts are matched on conflict_fields (the primary key
+        by default, otherwise a unique constraint) and update every other field given, unless update_fields is set.
+        """
+        upserted = []
+        for chunk in self._chunks(rows):
+            stmt = self._upsert_statement(self.db.bind.dialect.name, chunk, conflict_fields, update_fields)
+            upserted.extend(self.db.execute(
+                stmt, chunk, execution_options={"populate_existing": True}).scalars().all())
+        return upserted
+
+    def bulk_update(self, rows: Sequence[Mapping[str, Any]]) -> list[ModelType]:
+        """Update rows by primary key; raises StaleDataError when any of them does not exist"""
+        updated = []
+        for chunk in self._chunks(rows):
+            self.db.execute(self._update_statement(), chunk)
+            updated.extend(self.db.execute(self._reload_statement(chunk)).scalars().all())
+        return updated
+
+
+class AsyncBaseRepository(BulkWriteStatements[ModelType]):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_page(self, params: PageParams, filters: Optional[Mapping[str, Any]] = None,
+                       conditions: Sequence = (),
+                       sort_fields: Optional[Mapping[str, Any]] = None) -> PageResult[ModelType]:
+        filters = filters or {}
+        stmt, sort, columns = self._page_statement(params, filters, conditions, sort_fields)
+        result = self._page_result(await self.db.execute(stmt), params, sort, columns)
+        if params.include_total:
+            result.total, result.total_is_estimate = await self._total(filters, conditions)
+        return result
+
+    async def _total(self, filters: Mapping[str, Any], conditions: Sequence = ()) -> tuple[int, bool]:
+        if self._uses_row_estimate(self.db.bind.dialect.name, filters, conditions):
+            estimate = (await self.db.execute(
+                POSTGRES_ROW_ESTIMATE, {"table_name": self.model.__tablename__})).scalar()
+            if estimate and estimate > get_settings().PAGE_COUNT_MAX:
+                return estimate, True
+        return self._capped_total((await self.db.execute(self._count_statement(filters, conditions))).scalar_one())
+
+    async def bulk_create(self, rows: Sequence[Mapping[str, Any]]) -> list[ModelType]:
+        created = []
+        for chunk in self._chunks(rows):
+            created.extend((await self.db.execute(self._insert_statement(), chunk)).scalars().all())
+        return created
+
+    async def bulk_upsert(self, rows: Sequence[Mapping[str, Any]], conflict_fields: Optional[Sequence[str]] = None,
+                          update_fields: Optional[Sequence[str]] = None) -> list[ModelType]:
+        upserted = []
+        for chunk in self._chunks(rows):
+            stmt = self._upsert_statement(self.db.bind.dialect.name, chunk, conflict_fields, update_fields)
+            upserted.extend((await self.db.execute(
+                stmt, chunk, execution_options={"populate_existing": True})).scalars().all())
+        return upserted
+
+    async def bulk_update(self, rows: Sequence[Mapping[str, Any]]) -> list[ModelType]:
+        updated = []
+        for chunk in self._chunks(rows):
+            await self.db.execute(self._update_statement(), chunk)
+            updated.extend((await self.db.execute(self._reload_statement(chunk))).scalars().all())
+        return updated
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, select
+
+from app.db.models.embedding import JobListingEmbedding, UserResumeEmbedding
+from app.db.models.job_listing import PUBLISHED, JobListing
+from app.db.models.user_resume import UserResume
+from app.repositories.base import AsyncBaseRepository
+
+# What the embedding pipeline (app.services.embedding_service) reads of each published listing and resume summary:
+# the text and the content hash of the stored vector, NULL when there is none
+JOB_LISTING_TEXTS = select(JobListing.id, JobListing.title, JobListing.description, JobListing.updated_at,
+                           JobListingEmbedding.content_hash).outerjoin(JobListingEmbedding).where(PUBLISHED)
+# ...and what the job recommendation index (app.search.recommendation_index) reads of each listing
+JOB_LISTING_VECTORS = select(JobListing.id, JobListing.title, JobListing.description, JobListing.status,
+                             JobListing.updated_at, JobListingEmbedding.content_hash,
+                             JobListingEmbedding.vector).outerjoin(JobListingEmbedding)
+USER_RESUME_TEXTS = select(UserResume.user_id, UserResume.ai_summary, UserResume.updated_at,
+                           UserResumeEmbedding.content_hash, UserResumeEmbedding.vector).outerjoin(
+    UserResumeEmbedding).where(UserResume.ai_summary.is_not(None))
+
+
+class JobListingEmbeddingRepository(AsyncBaseRepository[JobListingEmbedding]):
+    model = JobListingEmbedding
+
+    async def get_texts(self, after: Optional[UUID], limit: int,
+                        updated_since: Optional[datetime] = None) -> Sequence[Row]:
+        """
+        JOB_LISTING_TEXTS rows in id order, the first `limit` after the listing id `after`: of every published listing,
+        or of those updated at or after updated_since
+        """
+        stmt = JOB_LISTING_TEXTS
+        if after is not None:
+            stmt = stmt.where(JobListing.id > after)
+        if updated_since is not None:
+            stmt = stmt.where(JobListing.updated_at >= updated_since)
+        return (await self.db.execute(stmt.order_by(JobListing.id).limit(limit))).all()
+
+    async def get_vectors(self, after: Optional[UUID], limit: int,
+                          updated_since: Optional[datetime] = None) -> Sequence[Row]:
+        """
+        JOB_LISTING_VECTORS rows in id order, the first `limit` after the listing id `after`: of every published
+        listing, or of every listing updated at or after updated_since whatever its status
+        """
+        stmt = JOB_LISTING_VECTORS.where(PUBLISHED) if updated_since is None else JOB_LISTING_VECTORS.where(
+            JobListing.updated_at >= updated_since)
+        if after is not None:
+            stmt = stmt.where(JobListing.id > after)
+        return (await self.db.execute(stmt.order_by(JobListing.id).limit(limit))).all()
+
+    async def get_vector(self, job_listing_id: UUID) -> Optional[Row]:
+        """The JOB_LISTING_VECTORS row of a listing whatever its status, None when there is no such listing"""
+        return (await self.db.execute(JOB_LISTING_VECTORS.where(JobListing.id == job_listing_id))).first()
+
+
+class UserResumeEmbeddingRepository(AsyncBaseRepository[UserResumeEmbedding]):
+    model = UserResumeEmbedding
+
+    async def get_texts(self, after: Optional[str], limit: int,
+                        updated_since: Optional[datetime] = None) -> Sequence[Row]:
+        """USER_RESUME_TEXTS rows in user id order, as JobListingEmbeddingRepository.get_texts"""
+        stmt = USER_RESUME_TEXTS
+        if after is not None:
+            stmt = stmt.where(UserResume.user_id > after)
+        if updated_since is not None:
+            stmt = stmt.where(UserResume.updated_at >= updated_since)
+        return (await self.db.execute(stmt.order_by(UserResume.user_id).limit(limit))).all()
+
+    async def get_text(self, user_id: str) -> Optional[Row]:
+        """The USER_RESUME_TEXTS row of a user's resume, None without a resume or summary"""
+        return (await self.db.execute(USER_RESUME_TEXTS.where(UserResume.user_id == user_id))).first()
@@ -1,34 +1,120 @@
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
 
+from sqlalchemy import Row, RowMapping, select
+from sqlalchemy.orm import selectinload
+
+from app.config.settings import get_settings
+from app.db.models.embedding import UserResumeEmbedding
+from app.db.models.job_listing import JobListing
 from app.db.models.job_listing_application import JobListingApplication
+from app.db.models.user import User
+from app.db.models.user_resume import UserResume
+from app.repositories.base import AsyncBaseRepository
+
+# Flat rows for exports: plain columns of the application and its listing and applicant, no ORM objects
+EXPORT_APPLICATIONS = select(
+    JobListingApplication.job_listing_id,
+    JobListing.title.label("job_listing_title"),
+    JobListing.organization_id,
+    JobListingApplication.user_id,
+    User.email.label("user_email"),
+    User.first_name.label("user_first_name"),
+    User.last_name.label("user_last_name"),
+    JobListingApplication.stage,
+    JobListingApplication.rating,
+    JobListingApplication.cover_letter,
+    JobListingApplication.created_at,
+    JobListingApplication.updated_at,
+).join(JobListing, JobListing.id == JobListingApplication.job_listing_id).join(
+    User, User.id == JobListingApplication.user_id).order_by(
+    JobListingApplication.created_at, JobListingApplication.job_listing_id, JobListingApplication.user_id)
+EXPORT_FIELDS = list(EXPORT_APPLICATIONS.selected_columns.keys())
+# What ranking (app.search.application_ranking) reads of each application: its signals and the applicant's resume
+# summary with the content hash and vector stored for it, NULL when there is none
+RANKING_FEATURES = select(
+    JobListingApplication.user_id,
+    JobListingApplication.rating,
+    JobListingApplication.stage,
+    UserResume.ai_summary,
+    UserResumeEmbedding.content_hash,
+    UserResumeEmbedding.vector,
+).outerjoin(UserResume, UserResume.user_id == JobListingApplication.user_id).outerjoin(
+    UserResumeEmbedding, UserResumeEmbedding.user_id == UserResume.user_id).order_by(JobListingApplication.user_id)
+
 
+class JobListingApplicationRepository(AsyncBaseRepository[JobListingApplication]):
+    model = JobListingApplication
+    # Relationships are eager loaded: async sessions cannot lazy load during serialization
+    load_options = (
+        selectinload(JobListingApplication.job_listing).selectinload(JobListing.organization),
+        selectinload(JobListingApplication.user),
+    )
+    filter_fields = {
+        "job_listing_id": JobListingApplication.job_listing_id,
+        "user_id": JobListingApplication.user_id,
+        "stage": JobListingApplication.stage,
+    }
+    sort_fields = {"created_at": JobListingApplication.created_at, "updated_at": JobListingApplication.updated_at}
+    default_sort = "-created_at"
+    projection_joins = {"job_listing": JobListingApplication.job_listing, "user": JobListingApplication.user}
 
-class JobListingApplicationRepository:
-    def __init__(self, db: Session):
-        self.db = db
+    async def _reload(self, job_listing_application: JobListingApplication) -> JobListingApplication:
+        result = await self.db.execute(
+            self._select().where(
+                JobListingApplication.job_listing_id == job_listing_application.job_listing_id,
+                JobListingApplication.user_id == job_listing_application.user_id,
+            ).execution_options(populate_existing=True))
+        return result.scalars().one()
 
-    def create(self, job_listing_application: JobListingApplication) -> JobListingApplication:
+    async def create(self, job_listing_application: JobListingApplication) -> JobListingApplication:
         self.db.add(job_listing_application)
-        self.db.commit()
-        self.db.refresh(job_listing_application)
-        return job_listing_application
-
-    def get_by_id(self, job_listing_application_id: str) -> JobListingApplication:
-        return self.db.query(JobListingApplication).filter(
-            JobListingApplication.id == job_listing_application_id).first()
-
-    def get_all(self) -> list[JobListingApplication]:
-        return self.db.query(JobListingApplication).all()
-
-    def update(self, job_listing_application: JobListingApplication) -> JobListingApplication:
-        self.db.merge(job_listing_application)
-        self.db.commit()
-        self.db.refresh(job_listing_application)
-        return job_listing_application
-
-    def delete(self, job_listing_application_id: str):
-        job_listing_application = self.db.query(JobListingApplication).filter(
-            JobListingApplication.id == job_listing_application_id).first()
-        if job_listing_application:
-            self.db.delete(job_listing_application)
-            self.db.commit()
+        await self.db.flush()
+        return await self._reload(job_listing_application)
+
+    async def get_by_id(self, job_listing_id: UUID, user_id: str) -> Optional[JobListingApplication]:
+        """An application by its key, the listing and the applicant"""
+        result = await self.db.execute(self._select().where(
+            JobListingApplication.job_listing_id == job_listing_id, JobListingApplication.user_id == user_id))
+        return result.scalars().first()
+
+    async def update(self, job_listing_application: JobListingApplication) -> JobListingApplication:
+        await self.db.merge(job_listing_application)
+        await self.db.flush()
+        return await self._reload(job_listing_application)
+
+    async def delete(self, job_listing_id: UUID, user_id: str) -> bool:
+        job_listing_application = await self.get_by_id(job_listing_id, user_id)
+        if not job_listing_application:
+            return False
+        await self.db.delete(job_listing_application)
+        await self.db.flush()
+        return True
+
+    async def get_ranking_features(self, job_listing_id: UUID) -> Sequence[Row]:
+        """The RANKING_FEATURES rows of every application of a listing, in one query"""
+        return (await self.db.execute(
+            RANKING_FEATURES.where(JobListingApplication.job_listing_id == job_listing_id))).all()
+
+    async def get_by_user_ids(self, job_listing_id: UUID, user_ids: Sequence[str]) -> Sequence[JobListingApplication]:
+        """A listing's applications by these applicants, in no particular order"""
+        if not user_ids:
+            return []
+        result = await self.db.execute(self._select().where(
+            JobListingApplication.job_listing_id == job_listing_id, JobListingApplication.user_id.in_(user_ids)))
+        return result.scalars().all()
+
+    async def stream_export(self, job_listing_id: Optional[UUID] = None,
+                            organization_id: Optional[str] = None) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Export rows in batches of EXPORT_BATCH_SIZE from a server-side cursor, so memory stays flat however many
+        applications match.
+        """
+        stmt = EXPORT_APPLICATIONS
+        if job_listing_id is not None:
+            stmt = stmt.where(JobListingApplication.job_listing_id == job_listing_id)
+        if organization_id is not None:
+            stmt = stmt.where(JobListing.organization_id == organization_id)
+        result = await self.db.stream(stmt.execution_options(yield_per=get_settings().EXPORT_BATCH_SIZE))
+        async for rows in result.mappings().partitions():
+            yield rows
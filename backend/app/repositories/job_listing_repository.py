@@ -1,32 +1,311 @@
-from sqlalchemy.orm import Session
+import enum
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
+from uuid import UUID
 
-from app.db.models.job_listing import JobListing
+from sqlalchemy import Column, ColumnElement, Enum, Float, Integer, MetaData, Row, String, Table, and_, \
+    bindparam, case, cast, column, false, func, insert, literal, literal_column, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import selectinload
 
+from app.config.settings import get_settings
+from app.db.enums import ExperienceLevel, JobListingType, LocationRequirement, WageInterval
+from app.db.full_text import JOB_LISTINGS_FTS, websearch_to_fts5
+from app.db.models.job_listing import PUBLISHED, PUBLISHED_AND_FEATURED, JobListing
+from app.db.models.organization import Organization
+from app.exceptions.pagination_exceptions import InvalidSortError
+from app.repositories.base import AsyncBaseRepository
+from app.repositories.pagination import PageParams, PageResult, decode_cursor
 
-class JobListingRepository:
-    def __init__(self, db: Session):
-        self.db = db
+# Pre-built statement for the detail lookup; bound parameters keep it cacheable as compiled SQL
+GET_JOB_LISTING_BY_ID = select(JobListing).options(selectinload(JobListing.organization)).where(
+    JobListing.id == bindparam("job_listing_id"))
 
-    def create(self, job_listing: JobListing) -> JobListing:
-        self.db.add(job_listing)
-        self.db.commit()
-        self.db.refresh(job_listing)
-        return job_listing
+# The homepage feed's lists (app.search.homepage_feed), most recently posted first: each reads its partial index
+# (ix_job_listings_published_posted_at, ix_job_listings_featured_posted_at) in order and stops at the limit. The
+# featured predicate is the one the partial index states, so the few featured listings are read from there.
+NEWEST_PUBLISHED = select(JobListing).where(PUBLISHED).order_by(JobListing.posted_at.desc(), JobListing.id.desc())
+NEWEST_FEATURED = select(JobListing).where(PUBLISHED_AND_FEATURED).order_by(JobListing.posted_at.desc(),
+                                                                             JobListing.id.desc())
+
+# What the worker's in-memory keyword index and autocomplete (app.search.job_listing_index) read of each listing
+SEARCH_DOCUMENTS = select(JobListing.id, JobListing.title, JobListing.description, JobListing.status,
+                          JobListing.city, JobListing.state_abbreviation, JobListing.organization_id,
+                          JobListing.updated_at)
+# ...and of each organization, suggested by name
+ORGANIZATION_NAMES = select(Organization.id, Organization.name, Organization.updated_at)
+
+# Upper bounds (exclusive) of the wage bands counted for each wage interval; the last band is open-ended
+WAGE_BANDS = {
+    WageInterval.YEARLY: [50_000, 100_000, 150_000, 200_000],
+    WageInterval.HOURLY: [25, 50, 75, 100],
+}
+# Index of a listing's band in WAGE_BANDS[wage_interval], NULL without a wage
+WAGE_BAND = case(
+    *((and_(JobListing.wage_interval == wage_interval, JobListing.wage < bound), band)
+      for wage_interval, bounds in WAGE_BANDS.items() for band, bound in enumerate(bounds)),
+    *((and_(JobListing.wage_interval == wage_interval, JobListing.wage.is_not(None)), len(bounds))
+      for wage_interval, bounds in WAGE_BANDS.items()),
+)
+# Counted together, these columns give every facet of GET /job_listings/facets
+FACET_COLUMNS = [JobListing.experience_level, JobListing.type, JobListing.location_requirement,
+                 JobListing.state_abbreviation, JobListing.wage_interval, WAGE_BAND.label("wage_band")]
+
+# Generated by the database on PostgreSQL and not mapped, so it is referenced by name; see app.db.full_text
+SEARCH_VECTOR = literal_column("job_listings.search_vector", TSVECTOR)
+
+JOB_LISTINGS = JobListing.__table__
+# SQLite's implicit rowid, which the FTS5 index is keyed on
+JOB_LISTINGS_ROWID = column("rowid", _selectable=JOB_LISTINGS)
+ORGANIZATIONS = Organization.__table__
+IMPORT_COLUMNS = [
+    "id", "organization_id", "title", "description", "wage", "wage_interval", "state_abbreviation", "city",
+    "is_featured", "location_requirement", "experience_level", "status", "type", "posted_at", "latitude", "longitude",
+]
+
+# Session-local table imports are copied into before one set-based merge. Enum labels are staged as text and
+# cast during the merge, so creating the table never touches the database's enum types.
+IMPORT_STAGING = Table(
+    "job_listing_import_staging", MetaData(),
+    Column("row_number", Integer, nullable=False),
+    *(Column(name, String if isinstance(JOB_LISTINGS.c[name].type, Enum) else JOB_LISTINGS.c[name].type)
+      for name in IMPORT_COLUMNS),
+    prefixes=["TEMPORARY"],
+)
+
+# Rows whose organization exists go into job_listings; the rest stay behind and are reported
+MERGE_IMPORT_STAGING = insert(JOB_LISTINGS).from_select(IMPORT_COLUMNS, select(*(
+    cast(IMPORT_STAGING.c[name], JOB_LISTINGS.c[name].type) if isinstance(JOB_LISTINGS.c[name].type, Enum)
+    else IMPORT_STAGING.c[name]
+    for name in IMPORT_COLUMNS
+)).join(ORGANIZATIONS, ORGANIZATIONS.c.id == IMPORT_STAGING.c.organization_id))
+
+UNMERGED_IMPORT_ROWS = select(IMPORT_STAGING.c.row_number, IMPORT_STAGING.c.organization_id).outerjoin(
+    ORGANIZATIONS, ORGANIZATIONS.c.id == IMPORT_STAGING.c.organization_id).where(ORGANIZATIONS.c.id.is_(None))
 
-    def get_by_id(self, job_listing_id: str) -> JobListing:
-        return self.db.query(JobListing).filter(JobListing.id == job_listing_id).first()
 
-    def get_all(self) -> list[JobListing]:
-        return self.db.query(JobListing).all()
+class JobListingRepository(AsyncBaseRepository[JobListing]):
+    model = JobListing
+    # Relationships are eager loaded: async sessions cannot lazy load during serialization
+    load_options = (selectinload(JobListing.organization),)
+    filter_fields = {
+        "organization_id": JobListing.organization_id,
+        "status": JobListing.status,
+        "experience_level": JobListing.experience_level,
+        "type": JobListing.type,
+        "location_requirement": JobListing.location_requirement,
+        "is_featured": JobListing.is_featured,
+        "state_abbreviation": JobListing.state_abbreviation,
+        "city": JobListing.city,
+        "wage_interval": JobListing.wage_interval,
+    }
+    # Ids are time-ordered (UUID v7), so sorting by id is newest first without touching created_at
+    sort_fields = {"id": JobListing.id, "created_at": JobListing.created_at, "title": JobListing.title}
+    default_sort = "-id"
+    projection_joins = {"organization": JobListing.organization}
 
-    def update(self, job_listing: JobListing) -> JobListing:
-        self.db.merge(job_listing)
-        self.db.commit()
-        self.db.refresh(job_listing)
-        return job_listing
+    async def _reload(self, job_listing: JobListing) -> JobListing:
+        result = await self.db.execute(
+            self._select().where(JobListing.id == job_listing.id).execution_options(populate_existing=True))
+        return result.scalars().one()
 
-    def delete(self, job_listing_id: str):
-        job_listing = self.db.query(JobListing).filter(JobListing.id == job_listing_id).first()
+    async def create(self, job_listing: JobListing) -> JobListing:
+        self.db.add(job_listing)
+        await self.db.flush()
+        return await self._reload(job_listing)
+
+    async def get_by_id(self, job_listing_id: UUID) -> JobListing:
+        result = await self.db.execute(GET_JOB_LISTING_BY_ID, {"job_listing_id": job_listing_id})
+        return result.scalars().first()
+
+    async def update(self, job_listing: JobListing) -> JobListing:
+        await self.db.merge(job_listing)
+        await self.db.flush()
+        return await self._reload(job_listing)
+
+    async def delete(self, job_listing_id: UUID):
+        job_listing = await self.get_by_id(job_listing_id)
         if job_listing:
-            self.db.delete(job_listing)
-            self.db.commit()
+            await self.db.delete(job_listing)
+            await self.db.flush()
+
+    async def get_published_by_ids(self, job_listing_ids: Sequence[UUID]) -> list[JobListing]:
+        """The published listings among job_listing_ids, in no particular order"""
+        result = await self.db.execute(self._select().where(JobListing.id.in_(job_listing_ids), PUBLISHED))
+        return list(result.scalars().all())
+
+    async def get_newest_published(self, limit: int, featured: bool = False) -> list[JobListing]:
+        """The `limit` most recently posted published listings, or featured ones, by posted_at and then id"""
+        stmt = NEWEST_FEATURED if featured else NEWEST_PUBLISHED
+        result = await self.db.execute(stmt.options(*self.load_options).limit(limit))
+        return list(result.scalars().all())
+
+    async def stream_search_documents(self, updated_since: Optional[datetime] = None
+                                      ) -> AsyncIterator[Sequence[Row]]:
+        """
+        SEARCH_DOCUMENTS rows in batches of EXPORT_BATCH_SIZE from a server-side cursor: every published listing,
+        or every listing updated at or after updated_since whatever its status
+        """
+        stmt = SEARCH_DOCUMENTS.where(PUBLISHED) if updated_since is None else SEARCH_DOCUMENTS.where(
+            JobListing.updated_at >= updated_since)
+        result = await self.db.stream(stmt.execution_options(yield_per=get_settings().EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_organization_names(self, updated_since: Optional[datetime] = None) -> Sequence[Row]:
+        """ORGANIZATION_NAMES rows of every organization, or of those updated at or after updated_since"""
+        stmt = ORGANIZATION_NAMES if updated_since is None else ORGANIZATION_NAMES.where(
+            Organization.updated_at >= updated_since)
+        return (await self.db.execute(stmt)).all()
+
+    def search_clauses(self, dialect_name: str, keyword: Optional[str] = None, city: Optional[str] = None,
+                       state_abbreviation: Optional[str] = None, experience_level: Optional[ExperienceLevel] = None,
+                       type: Optional[JobListingType] = None,
+                       location_requirement: Optional[LocationRequirement] = None,
+                       wage_interval: Optional[WageInterval] = None, min_wage: Optional[int] = None,
+                       max_wage: Optional[int] = None) -> tuple[dict[str, Any], list, dict[str, Any]]:
+        """
+        (filters, conditions, sort_fields) for get_page selecting the published listings that match every given
+        criterion. A keyword is full-text matched against title and description in web search syntax; only the
+        newest SEARCH_CANDIDATES_MAX matches are kept, with a "relevance" sort field.
+        """
+        filters = {
+            "state_abbreviation": state_abbreviation.upper() if state_abbreviation else None,
+            "experience_level": experience_level,
+            "type": type,
+            "location_requirement": location_requirement,
+            "wage_interval": wage_interval,
+        }
+        # The literal predicate (not a bound parameter) lets SQLite match the partial search indexes
+        conditions = [PUBLISHED]
+        if city:
+            conditions.append(func.lower(JobListing.city) == city.lower())
+        if min_wage is not None:
+            conditions.append(JobListing.wage >= min_wage)
+        if max_wage is not None:
+            conditions.append(JobListing.wage <= max_wage)
+        if not keyword:
+            return filters, conditions, {}
+
+        # Relevance is computed for the capped candidates only, so a keyword matching half the listings costs
+        # about as much as one matching a few hundred
+        matches, relevance, newest_first = _keyword_clauses(dialect_name, keyword)
+        candidates = self._filtered(select(JobListing.id, relevance.label("relevance")), filters).where(
+            *conditions, *matches).order_by(newest_first).limit(get_settings().SEARCH_CANDIDATES_MAX).subquery()
+        return {}, [JobListing.id == candidates.c.id], {"relevance": candidates.c.relevance.label("relevance")}
+
+    async def search(self, params: PageParams, **criteria) -> PageResult[JobListing]:
+        """One page of published listings matching search_clauses(**criteria); most relevant first for keywords"""
+        if criteria.get("keyword") and not params.sort:
+            params = replace(params, sort="-relevance")
+        return await self.get_page(params, *self.search_clauses(self.db.bind.dialect.name, **criteria))
+
+    async def search_nearby(self, params: PageParams, places: Sequence[tuple[float, float, float]],
+                            **criteria) -> PageResult[JobListing]:
+        """
+        One page of published listings located on places (latitude, longitude, distance in miles, as from
+        Gazetteer.within) and matching search_clauses(**criteria): nearest first, then newest, paged by cursor on
+        the "proximity" sort field. Each place seeks its newest listings past the cursor in the location index and
+        contributes at most a page of them, so a page costs a few rows per place however many listings each holds.
+        """
+        if params.sort not in (None, "-proximity"):
+            raise InvalidSortError("Nearby listings are sorted by '-proximity' only")
+        params = replace(params, sort="-proximity")
+        dialect_name = self.db.bind.dialect.name
+        keyword = criteria.pop("keyword", None)
+        filters, conditions, _ = self.search_clauses(dialect_name, **criteria)
+        if keyword:
+            conditions += _keyword_clauses(dialect_name, keyword)[0]
+
+        after = decode_cursor(params.cursor, [str, float, UUID])[1:] if params.cursor else None
+        per_place = (params.offset or 0) + params.limit + 1
+        nearest = []
+        for latitude, longitude, distance in places:
+            # Rounded so that places at the same distance tie, and cursors stay short
+            proximity = -round(distance, 3)
+            place = [JobListing.latitude == latitude, JobListing.longitude == longitude]
+            if after and proximity > after[0]:
+                continue  # every listing here was on an earlier page
+            if after and proximity == after[0]:
+                place.append(JobListing.id < after[1])
+            stmt = self._filtered(select(JobListing.id, literal(proximity, Float).label("proximity")), filters)
+            nearest.append(select(stmt.where(*conditions, *place).order_by(JobListing.id.desc()).limit(
+                per_place).subquery()))
+        result = PageResult()
+        if nearest:
+            candidates = union_all(*nearest).subquery()
+            result = await self.get_page(replace(params, include_total=False), {}, [JobListing.id == candidates.c.id],
+                                         {"proximity": candidates.c.proximity.label("proximity")})
+        if params.include_total:
+            located = tuple_(JobListing.latitude, JobListing.longitude).in_([place[:2] for place in places])
+            result.total, result.total_is_estimate = await self._total(filters, [*conditions, located])
+        return result
+
+    async def facet_counts(self, **criteria) -> list[Row]:
+        """
+        Published listings matching search_clauses(**criteria), counted by every combination of the facet columns
+        (experience_level, type, location_requirement, state_abbreviation, wage_interval, wage_band, count). One
+        scan yields at most a few thousand combinations, which roll up into each facet's counts.
+        """
+        filters, conditions, _ = self.search_clauses(self.db.bind.dialect.name, **criteria)
+        stmt = self._filtered(select(*FACET_COLUMNS, func.count().label("count")), filters).where(*conditions)
+        # wage_band is grouped by its output name: repeating the CASE would bind its bounds as new parameters,
+        # which PostgreSQL does not recognize as the selected expression
+        result = await self.db.execute(stmt.group_by(*FACET_COLUMNS[:-1], literal_column("wage_band")))
+        return list(result.all())
+
+    async def create_import_staging(self):
+        conn = await self.db.connection()
+        await conn.run_sync(lambda sync_conn: IMPORT_STAGING.drop(sync_conn, checkfirst=True))
+        await conn.run_sync(IMPORT_STAGING.create)
+
+    async def copy_to_import_staging(self, rows: Sequence[Mapping[str, Any]]):
+        """Stage validated rows (row_number plus IMPORT_COLUMNS); PostgreSQL loads them with COPY"""
+        columns = ["row_number", *IMPORT_COLUMNS]
+        records = [tuple(_staging_value(row[name]) for name in columns) for row in rows]
+        conn = await self.db.connection()
+        if conn.dialect.driver == "asyncpg":
+            raw_connection = await conn.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                IMPORT_STAGING.name, records=records, columns=columns)
+        else:
+            await conn.execute(insert(IMPORT_STAGING), [dict(zip(columns, record)) for record in records])
+
+    async def merge_import_staging(self, report_limit: int) -> tuple[int, list[tuple[int, str]]]:
+        """
+        Insert staged rows whose organization exists and drop the staging table. Returns how many staged rows
+        were left out and the first report_limit of them as (row number, organization id).
+        """
+        conn = await self.db.connection()
+        await conn.execute(MERGE_IMPORT_STAGING)
+        unmerged = UNMERGED_IMPORT_ROWS.subquery()
+        unmerged_count = (await conn.execute(select(func.count()).select_from(unmerged))).scalar_one()
+        unmerged_rows = (await conn.execute(
+            UNMERGED_IMPORT_ROWS.order_by(IMPORT_STAGING.c.row_number).limit(report_limit))).all()
+        await conn.run_sync(IMPORT_STAGING.drop)
+        return unmerged_count, [tuple(row) for row in unmerged_rows]
+
+
+def _keyword_clauses(dialect_name: str, keyword: str) -> tuple[list, ColumnElement[float], ColumnElement]:
+    """
+    Conditions matching keyword (web search syntax), the relevance of each match (higher is better) and the
+    newest-first order the full-text index reads matches in
+    """
+    if dialect_name == "postgresql":
+        query = func.websearch_to_tsquery("english", keyword)
+        return ([SEARCH_VECTOR.bool_op("@@")(query)], func.ts_rank(SEARCH_VECTOR, query, type_=Float),
+                JobListing.id.desc())
+    if dialect_name == "sqlite":
+        query = websearch_to_fts5(keyword)
+        if query is None:
+            return [false()], literal(0.0), JobListing.id.desc()
+        # FTS5 returns matches in rowid (insertion) order either way without sorting them
+        return ([JOB_LISTINGS_FTS.c.rowid == JOB_LISTINGS_ROWID, JOB_LISTINGS_FTS.c.job_listings_fts.match(query)],
+                -JOB_LISTINGS_FTS.c.rank, JOB_LISTINGS_FTS.c.rowid.desc())
+    raise NotImplementedError(f"Keyword search is not supported on {dialect_name}")
+
+
+def _staging_value(value: Any) -> Any:
+    # Enums are stored by member name, matching the Enum columns the staged text is cast to
+    return value.name if isinstance(value, enum.Enum) else value
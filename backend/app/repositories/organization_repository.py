@@ -1,32 +1,28 @@
-from sqlalchemy.orm import Session
-
 from app.db.models.organization import Organization
+from app.repositories.base import BaseRepository
 
 
-class OrganizationRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class OrganizationRepository(BaseRepository[Organization]):
+    model = Organization
+    filter_fields = {"name": Organization.name}
+    sort_fields = {"created_at": Organization.created_at, "name": Organization.name}
+    default_sort = "-created_at"
 
     def create(self, organization: Organization) -> Organization:
         self.db.add(organization)
-        self.db.commit()
-        self.db.refresh(organization)
+        self.db.flush()
         return organization
 
     def get_by_id(self, organization_id: str) -> Organization:
         return self.db.query(Organization).filter(Organization.id == organization_id).first()
 
-    def get_all(self) -> list[Organization]:
-        return self.db.query(Organization).all()
-
     def update(self, organization: Organization) -> Organization:
         self.db.merge(organization)
-        self.db.commit()
-        self.db.refresh(organization)
+        self.db.flush()
         return organization
 
     def delete(self, organization_id: str):
         organization = self.db.query(Organization).filter(Organization.id == organization_id).first()
         if organization:
             self.db.delete(organization)
-            self.db.commit()
+            self.db.flush()
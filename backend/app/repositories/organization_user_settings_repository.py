@@ -1,29 +1,28 @@
-from sqlalchemy.orm import Session
-
 from app.db.models.organization_user_settings import OrganizationUserSettings
+from app.repositories.base import BaseRepository
 
 
-class OrganizationUserSettingsRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class OrganizationUserSettingsRepository(BaseRepository[OrganizationUserSettings]):
+    model = OrganizationUserSettings
+    filter_fields = {
+        "user_id": OrganizationUserSettings.user_id,
+        "organization_id": OrganizationUserSettings.organization_id,
+    }
+    sort_fields = {"created_at": OrganizationUserSettings.created_at}
+    default_sort = "-created_at"
 
     def create(self, organization_user_settings: OrganizationUserSettings) -> OrganizationUserSettings:
         self.db.add(organization_user_settings)
-        self.db.commit()
-        self.db.refresh(organization_user_settings)
+        self.db.flush()
         return organization_user_settings
 
     def get_by_id(self, organization_user_settings_id: str) -> OrganizationUserSettings:
         return self.db.query(OrganizationUserSettings).filter(
             OrganizationUserSettings.id == organization_user_settings_id).first()
 
-    def get_all(self) -> list[OrganizationUserSettings]:
-        return self.db.query(OrganizationUserSettings).all()
-
     def update(self, organization_user_settings: OrganizationUserSettings) -> OrganizationUserSettings:
         self.db.merge(organization_user_settings)
-        self.db.commit()
-        self.db.refresh(organization_user_settings)
+        self.db.flush()
         return organization_user_settings
 
     def delete(self, organization_user_settings_id: str):
@@ -31,4 +30,4 @@ class OrganizationUserSettingsRepository:
             OrganizationUserSettings.id == organization_user_settings_id).first()
         if organization_user_settings:
             self.db.delete(organization_user_settings)
-            self.db.commit()
+            self.db.flush()
@@ -0,0 +1,49 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, Optional, Sequence, TypeVar
+
+from app.exceptions.pagination_exceptions import InvalidCursorError
+
+T = TypeVar("T")
+
+
+@dataclass
+class PageParams:
+    """Page requested by a client: a cursor (keyset) or an offset, plus sort, fields and optional total count"""
+    limit: int
+    cursor: Optional[str] = None
+    offset: Optional[int] = None
+    sort: Optional[str] = None
+    include_total: bool = False
+    # Sparse fieldset: items become dicts of just these fields (dotted names for related rows)
+    fields: Optional[list[str]] = None
+
+
+@dataclass
+class PageResult(Generic[T]):
+    """One page of rows and how to fetch the next one (both None on the last page)"""
+    items: list[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    next_offset: Optional[int] = None
+    total: Optional[int] = None
+    # True when total comes from planner statistics or hit the count cap
+    total_is_estimate: bool = False
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort key values of the last row on a page"""
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, converters: Sequence[Callable[[str], Any]]) -> list[Any]:
+    """Decode a cursor back into sort key values, converting each with the matching converter"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list) or len(values) != len(converters):
+            raise ValueError("cursor does not match the sort key")
+        return [convert(value) for convert, value in zip(converters, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
@@ -1,29 +1,25 @@
-from sqlalchemy.orm import Session
-
 from app.db.models.user_notification_settings import UserNotificationSettings
+from app.repositories.base import BaseRepository
 
 
-class UserNotificationSettingsRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class UserNotificationSettingsRepository(BaseRepository[UserNotificationSettings]):
+    model = UserNotificationSettings
+    filter_fields = {"user_id": UserNotificationSettings.user_id}
+    sort_fields = {"created_at": UserNotificationSettings.created_at}
+    default_sort = "-created_at"
 
     def create(self, user_notification_settings: UserNotificationSettings) -> UserNotificationSettings:
         self.db.add(user_notification_settings)
-        self.db.commit()
-        self.db.refresh(user_notification_settings)
+        self.db.flush()
         return user_notification_settings
 
     def get_by_id(self, user_notification_settings_id: str) -> UserNotificationSettings:
         return self.db.query(UserNotificationSettings).filter(
             UserNotificationSettings.id == user_notification_settings_id).first()
 
-    def get_all(self) -> list[UserNotificationSettings]:
-        return self.db.query(UserNotificationSettings).all()
-
     def update(self, user_notification_settings: UserNotificationSettings) -> UserNotificationSettings:
         self.db.merge(user_notification_settings)
-        self.db.commit()
-        self.db.refresh(user_notification_settings)
+        self.db.flush()
         return user_notification_settings
 
     def delete(self, user_notification_settings_id: str):
@@ -31,4 +27,4 @@ class UserNotificationSettingsRepository:
             UserNotificationSettings.id == user_notification_settings_id).first()
         if user_notification_settings:
             self.db.delete(user_notification_settings)
-            self.db.commit()
+            self.db.flush()
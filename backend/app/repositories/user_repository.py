@@ -1,6 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from app.db.models.user import User
 from app.exceptions.auth_exceptions import (
@@ -11,20 +11,28 @@ from app.exceptions.auth_exceptions import (
     UserDeletionError
 )
 from app.config.logging import get_auth_logger, log_auth_event
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import PageParams, PageResult
 
 logger = get_auth_logger("user_repository")
 
+# Pre-built lookups for the auth hot path (scripts/bench_hot_lookups.py). The statements never change and
+# take bound parameters, so SQLAlchemy reuses the cached compiled SQL instead of rebuilding an ORM query.
+GET_USER_BY_ID = select(User).where(User.id == bindparam("user_id")).limit(1)
+GET_USER_BY_CLERK_ID = select(User).where(User.clerk_id == bindparam("clerk_id")).limit(1)
 
-class UserRepository:
-    def __init__(self, db: Session):
-        self.db = db
+
+class UserRepository(BaseRepository[User]):
+    model = User
+    filter_fields = {"email": User.email}
+    sort_fields = {"created_at": User.created_at, "email": User.email}
+    default_sort = "-created_at"
 
     def create(self, user: User) -> User:
         """Create a new user with comprehensive error handling"""
         try:
             self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
+            self.db.flush()
             
             log_auth_event(
                 logger,
@@ -71,7 +79,7 @@ class UserRepository:
     def get_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID with error handling"""
         try:
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = self.db.execute(GET_USER_BY_ID, {"user_id": user_id}).scalars().first()
             
             if user:
                 log_auth_event(
@@ -110,7 +118,7 @@ class UserRepository:
     def get_by_clerk_id(self, clerk_id: str) -> Optional[User]:
         """Get user by Clerk ID for webhook operations with error handling"""
         try:
-            user = self.db.query(User).filter(User.clerk_id == clerk_id).first()
+            user = self.db.execute(GET_USER_BY_CLERK_ID, {"clerk_id": clerk_id}).scalars().first()
             
             if user:
                 log_auth_event(
@@ -146,18 +154,18 @@ class UserRepository:
                 details={"database_error": str(e), "operation": "get_by_clerk_id", "clerk_id": clerk_id}
             )
 
-    def get_all(self) -> list[User]:
-        """Get all users with error handling"""
+    def get_page(self, params: PageParams, filters: Optional[Mapping[str, Any]] = None) -> PageResult[User]:
+        """Get one page of users with error handling"""
         try:
-            users = self.db.query(User).all()
+            page = super().get_page(params, filters)
             
             log_auth_event(
                 logger,
                 "users_list_success",
-                f"Successfully retrieved {len(users)} users"
+                f"Successfully retrieved {len(page.items)} users"
             )
             
-            return users
+            return page
             
         except SQLAlchemyError as e:
             error_msg = f"Database error during user list retrieval"
@@ -170,15 +178,14 @@ class UserRepository:
             )
             raise DatabaseOperationError(
                 error_msg,
-                details={"database_error": str(e), "operation": "get_all"}
+                details={"database_error": str(e), "operation": "get_page"}
             )
 
     def update(self, user: User) -> User:
         """Update user with comprehensive error handling"""
         try:
             self.db.merge(user)
-            self.db.commit()
-            self.db.refresh(user)
+            self.db.flush()
             
             log_auth_event(
                 logger,
@@ -227,7 +234,7 @@ class UserRepository:
     def delete(self, user_id: str) -> bool:
         """Delete user with comprehensive error handling"""
         try:
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = self.db.execute(GET_USER_BY_ID, {"user_id": user_id}).scalars().first()
             
             if not user:
                 log_auth_event(
@@ -244,7 +251,7 @@ class UserRepository:
             
             clerk_id = user.clerk_id
             self.db.delete(user)
-            self.db.commit()
+            self.db.flush()
             
             log_auth_event(
                 logger,
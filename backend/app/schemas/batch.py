@@ -0,0 +1,10 @@
+from typing import Annotated, TypeVar
+
+from pydantic import Field
+
+T = TypeVar("T")
+
+# Items per batch request; larger syncs are split by the client
+BATCH_SIZE_MAX = 1000
+
+Batch = Annotated[list[T], Field(min_length=1, max_length=BATCH_SIZE_MAX)]
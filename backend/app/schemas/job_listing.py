@@ -41,9 +41,84 @@ class JobListingUpdate(BaseSchema):
     posted_at: Optional[datetime] = None
 
 
+class JobListingBatchUpdate(JobListingUpdate):
+    id: UUID
+
+
 class JobListingResponse(JobListingBase):
     id: UUID
     organization_id: str
     created_at: datetime
     updated_at: datetime
+    # Located from city and state when written; None when the gazetteer does not know the place
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     organization: Optional[OrganizationResponse] = None
+
+
+class JobListingHomepageFeed(BaseSchema):
+    """Featured published listings and the newest published ones, each newest first"""
+    featured: list[JobListingResponse] = []
+    recent: list[JobListingResponse] = []
+
+
+class JobListingImportRowError(BaseSchema):
+    row: int
+    errors: list[str]
+
+
+class JobListingImportReport(BaseSchema):
+    imported: int = 0
+    failed: int = 0
+    # The first IMPORT_ERRORS_MAX failed rows; failed counts all of them
+    errors: list[JobListingImportRowError] = []
+    errors_truncated: bool = False
+
+
+class FacetCount(BaseSchema):
+    value: str
+    count: int
+
+
+class WageBandCount(BaseSchema):
+    wage_interval: WageInterval
+    # Inclusive bounds, usable as the min_wage/max_wage search filters; None is unbounded
+    min_wage: Optional[int] = None
+    max_wage: Optional[int] = None
+    count: int
+
+
+class JobListingFacets(BaseSchema):
+    """Published listings matching a filter set, counted per value of each filter (most common first; wage bands
+    in wage order)"""
+    total: int
+    experience_level: list[FacetCount] = []
+    type: list[FacetCount] = []
+    location_requirement: list[FacetCount] = []
+    state_abbreviation: list[FacetCount] = []
+    wage_band: list[WageBandCount] = []
+
+
+class TitleSuggestion(BaseSchema):
+    title: str
+    count: int
+
+
+class LocationSuggestion(BaseSchema):
+    city: str
+    state_abbreviation: str
+    count: int
+
+
+class OrganizationSuggestion(BaseSchema):
+    id: str
+    name: str
+    count: int
+
+
+class AutocompleteSuggestions(BaseSchema):
+    """Completions of what was typed, each with its number of published listings (most first); usable as the
+    keyword, city/state_abbreviation and organization_id filters"""
+    titles: list[TitleSuggestion] = []
+    locations: list[LocationSuggestion] = []
+    organizations: list[OrganizationSuggestion] = []
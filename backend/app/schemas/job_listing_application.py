@@ -32,3 +32,10 @@ class JobListingApplicationResponse(JobListingApplicationBase):
     updated_at: datetime
     job_listing: Optional[JobListingResponse] = None
     user: Optional[UserResponse] = None
+
+
+class RankedJobListingApplication(BaseSchema):
+    application: JobListingApplicationResponse
+    score: float
+    # Cosine similarity of the applicant's resume summary and the listing; 0 without a summary
+    similarity: float
@@ -0,0 +1,19 @@
+from typing import Annotated, Any, Generic, Optional, TypeVar, Union
+
+from pydantic import Field
+
+from app.schemas.base import BaseSchema
+
+T = TypeVar("T")
+
+
+class Page(BaseSchema, Generic[T]):
+    # With ?fields= each item holds only the requested fields, nested for related rows
+    items: list[Annotated[Union[dict[str, Any], T], Field(union_mode="left_to_right")]]
+    # Pass as ?cursor= (or ?offset= when paging by offset) to fetch the next page; null on the last page
+    next_cursor: Optional[str] = None
+    next_offset: Optional[int] = None
+    # Only with ?include_total=true
+    total: Optional[int] = None
+    # True when total comes from planner statistics or stopped at PAGE_COUNT_MAX
+    total_is_estimate: bool = False
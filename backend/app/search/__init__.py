@@ -0,0 +1,13 @@
+from .application_ranking import ApplicationRanking, ApplicationRankingCache, get_application_ranking_cache, \
+    rank_applications
+from .autocomplete import Autocomplete
+from .embeddings import Embedder, HashedTermEmbedder, get_embedder, load_embedder
+from .facet_cache import FacetCache, facet_key, get_facet_cache
+from .gazetteer import Gazetteer, get_gazetteer
+from .homepage_feed import HomepageFeed, get_homepage_feed
+from .inverted_index import InvertedIndex
+from .job_listing_index import JobListingIndex, get_job_listing_index, maintain_job_listing_index
+from .prefix_trie import PrefixTrie
+from .recommendation_index import JobRecommendationIndex, get_job_recommendation_index, \
+    maintain_job_recommendation_index
+from .vector_index import IVFFlatIndex
@@ -0,0 +1,99 @@
+"""
+Ranking of a job listing's applications by fit (GET /job_listing_applications/ranked).
+
+Every application is scored at once: the applicants' resume summary vectors (app.search.embeddings) are stacked into
+one matrix, and a single matrix-vector product with the listing's vector gives every cosine similarity. The rating
+and stage signals are arrays of the same length, so the score is a weighted sum of three arrays rather than a loop
+over applications. An applicant without a summary scores zero similarity, and an unrated application counts as rated
+halfway, so neither is ranked by what is missing.
+
+The scored ranking of a listing is cached per worker, and a request selects its top `limit` from the cached scores.
+JobListingApplicationService drops a listing's entry when one of its applications is created, updated or deleted;
+other changes (a new resume summary, an edited listing, writes made by other workers) show up once entries expire
+after APPLICATION_RANKING_CACHE_TTL_SECONDS.
+"""
+from functools import lru_cache
+from typing import Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.config.settings import get_settings
+from app.db.enums import ApplicationStage
+
+RATING_MAX = 5
+# An unrated application's rating signal: halfway, between the worst and best ratings
+UNRATED = 0.5
+SIMILARITY_WEIGHT = 1.0
+RATING_WEIGHT = 0.3
+# Added to the score by stage: applicants moved forward rank higher, and denied ones below every other
+STAGE_SCORES = {
+    ApplicationStage.DENIED: -2.0,
+    ApplicationStage.APPLIED: 0.0,
+    ApplicationStage.INTERESTED: 0.1,
+    ApplicationStage.INTERVIEWED: 0.2,
+    ApplicationStage.HIRED: 0.3,
+}
+_STAGE_CODES = {stage: code for code, stage in enumerate(STAGE_SCORES)}
+_STAGE_TABLE = np.array(list(STAGE_SCORES.values()), dtype=np.float32)
+
+
+class ApplicationRanking:
+    """A listing's applications scored, in no particular order; top() selects the best"""
+    __slots__ = ("user_ids", "scores", "similarities")
+
+    def __init__(self, user_ids: Sequence[str], scores: np.ndarray, similarities: np.ndarray):
+        self.user_ids = user_ids
+        self.scores = scores
+        self.similarities = similarities
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def top(self, limit: int) -> list[tuple[str, float, float]]:
+        """The `limit` applicants with the highest score, highest first, with their score and similarity"""
+        limit = min(limit, len(self.scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(self.scores, -limit)[-limit:]
+        top = top[np.argsort(-self.scores[top], kind="stable")]
+        return [(self.user_ids[position], float(self.scores[position]), float(self.similarities[position]))
+                for position in top.tolist()]
+
+
+def rank_applications(listing_vector: np.ndarray, user_ids: Sequence[str], resume_vectors: np.ndarray,
+                      ratings: Sequence[Optional[int]], stages: Sequence[ApplicationStage]) -> ApplicationRanking:
+    """
+    Score applications from the (applications, dimensions) matrix of unit resume vectors (zero rows for applicants
+    without one) and each application's rating and stage
+    """
+    similarities = resume_vectors @ listing_vector
+    rating_signals = np.array(ratings, dtype=np.float32) if ratings else np.empty(0, dtype=np.float32)
+    rating_signals = np.where(np.isnan(rating_signals), UNRATED, np.clip(rating_signals / RATING_MAX, 0, 1))
+    stage_codes = np.fromiter((_STAGE_CODES[stage] for stage in stages), dtype=np.intp, count=len(stages))
+    scores = SIMILARITY_WEIGHT * similarities + RATING_WEIGHT * rating_signals + _STAGE_TABLE[stage_codes]
+    return ApplicationRanking(user_ids, scores.astype(np.float32), similarities)
+
+
+class ApplicationRankingCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    def get(self, job_listing_id: UUID) -> Optional[ApplicationRanking]:
+        return self._entries.get(job_listing_id)
+
+    def put(self, job_listing_id: UUID, ranking: ApplicationRanking) -> None:
+        self._entries[job_listing_id] = ranking
+
+    def invalidate(self, job_listing_id: UUID) -> None:
+        """Drop a listing's ranking"""
+        self._entries.pop(job_listing_id, None)
+
+
+@lru_cache
+def get_application_ranking_cache() -> ApplicationRankingCache:
+    """This worker's ranking cache, sized from the settings on first use"""
+    settings = get_settings()
+    return ApplicationRankingCache(settings.APPLICATION_RANKING_CACHE_MAX_ENTRIES,
+                                   settings.APPLICATION_RANKING_CACHE_TTL_SECONDS)
@@ -0,0 +1,144 @@
+"""
+Typeahead suggestions for the job board search box (GET /job_listings/search/autocomplete).
+
+Titles, locations (city and state) and organizations are each kept in a prefix trie, weighted by how many published
+listings have them, so the most listed come first. Every word of a suggestion starts a key ("engineer" suggests
+"Senior Backend Engineer", "tx" suggests Texas cities). Organizations are suggested even before they publish a
+listing, with a count of zero.
+"""
+import re
+from collections import Counter
+from typing import Hashable, NamedTuple, Optional
+
+from app.search.prefix_trie import PrefixTrie
+
+# Keys start at each of a suggestion's first few words; later words rarely start what someone types
+KEY_WORDS_MAX = 6
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces, punctuation dropped"""
+    return " ".join(WORD.findall(text.casefold()))
+
+
+def _keys(normalized: str) -> list[str]:
+    words = normalized.split(" ")
+    return [" ".join(words[start:]) for start in range(min(len(words), KEY_WORDS_MAX))]
+
+
+def _location_keys(location: tuple[str, str]) -> list[str]:
+    city, state_abbreviation = location
+    return _keys(f"{city} {state_abbreviation.lower()}")
+
+
+class _Listing(NamedTuple):
+    """What a published listing adds to the suggestions' counts"""
+    title: Optional[str]
+    location: Optional[tuple[str, str]]
+    organization_id: str
+
+
+class Autocomplete:
+    def __init__(self, top_k: int):
+        self.titles: PrefixTrie[str] = PrefixTrie(top_k)
+        self.locations: PrefixTrie[tuple[str, str]] = PrefixTrie(top_k)
+        self.organizations: PrefixTrie[str] = PrefixTrie(top_k)
+        self._title_counts: Counter = Counter()
+        self._location_counts: Counter = Counter()
+        self._organization_counts: Counter = Counter()
+        # Normalized value -> text as first written, e.g. "backend engineer" -> "Backend Engineer"
+        self._title_texts: dict[str, str] = {}
+        self._location_texts: dict[tuple[str, str], tuple[str, str]] = {}
+        self._organization_names: dict[str, str] = {}
+        self._listings: dict[Hashable, _Listing] = {}
+        # While loading, only the counts are kept; finish_loading builds the tries from them in one pass
+        self.loading = True
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def finish_loading(self) -> None:
+        self.titles.load((title, _keys(title), count) for title, count in self._title_counts.items())
+        self.locations.load((location, _location_keys(location), count)
+                            for location, count in self._location_counts.items())
+        self.organizations.load((organization_id, _keys(normalize(name)), self._organization_counts[organization_id])
+                                for organization_id, name in self._organization_names.items())
+        self.loading = False
+
+    def put_listing(self, listing_id: Hashable, title: str, city: Optional[str], state_abbreviation: Optional[str],
+                    organization_id: str) -> None:
+        """Count a published listing, or recount one that changed"""
+        location = None
+        if city and state_abbreviation and normalize(city):
+            location = normalize(city), state_abbreviation.strip().upper()
+        listing = _Listing(normalize(title) or None, location, organization_id)
+        if self._listings.get(listing_id) == listing:
+            return
+        self.remove_listing(listing_id)
+        self._listings[listing_id] = listing
+        if listing.title:
+            self._title_texts.setdefault(listing.title, title.strip())
+        if location:
+            self._location_texts.setdefault(location, (city.strip(), location[1]))
+        self._count(listing, 1)
+
+    def remove_listing(self, listing_id: Hashable) -> None:
+        listing = self._listings.pop(listing_id, None)
+        if listing is not None:
+            self._count(listing, -1)
+
+    def listings_of(self, organization_id: str) -> list[Hashable]:
+        """Ids of the counted listings of an organization; a scan, for the rare organization deletion"""
+        return [listing_id for listing_id, listing in self._listings.items()
+                if listing.organization_id == organization_id]
+
+    def put_organization(self, organization_id: str, name: str) -> None:
+        self._organization_names[organization_id] = name
+        if not self.loading:
+            self.organizations.put(organization_id, _keys(normalize(name)), self._organization_counts[organization_id])
+
+    def remove_organization(self, organization_id: str) -> None:
+        self._organization_names.pop(organization_id, None)
+        self.organizations.remove(organization_id)
+
+    def suggest(self, prefix: str, limit: int) -> tuple[list[tuple[str, int]], list[tuple[str, str, int]],
+                                                       list[tuple[str, str, int]]]:
+        """
+        The `limit` most listed completions of prefix: (title, count), (city, state abbreviation, count) and
+        (organization id, name, count)
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return [], [], []
+        return ([(self._title_texts[title], count) for title, count in self.titles.top(prefix, limit)],
+                [(*self._location_texts[location], count) for location, count in self.locations.top(prefix, limit)],
+                [(organization_id, self._organization_names[organization_id], count)
+                 for organization_id, count in self.organizations.top(prefix, limit)])
+
+    def _count(self, listing: _Listing, change: int) -> None:
+        if listing.title:
+            count = self._title_counts[listing.title] = self._title_counts[listing.title] + change
+            if count <= 0:
+                del self._title_counts[listing.title], self._title_texts[listing.title]
+            if not self.loading:
+                self._update(self.titles, listing.title, _keys(listing.title), count)
+        if listing.location:
+            count = self._location_counts[listing.location] = self._location_counts[listing.location] + change
+            if count <= 0:
+                del self._location_counts[listing.location], self._location_texts[listing.location]
+            if not self.loading:
+                self._update(self.locations, listing.location, _location_keys(listing.location), count)
+        self._organization_counts[listing.organization_id] += change
+        if not self.loading and listing.organization_id in self._organization_names:
+            self.organizations.put(listing.organization_id,
+                                   _keys(normalize(self._organization_names[listing.organization_id])),
+                                   self._organization_counts[listing.organization_id])
+
+    @staticmethod
+    def _update(trie: PrefixTrie, value, keys: list[str], count: int) -> None:
+        if count > 0:
+            trie.put(value, keys, count)
+        else:
+            trie.remove(value)
@@ -0,0 +1,126 @@
+"""
+Text embeddings for AI job matching: job listings are embedded from their title and description and resumes from
+their AI summary, as unit vectors whose dot product (cosine similarity) scores how alike two texts are.
+
+The embedder is pluggable: EMBEDDER names a registered one or gives the dotted path of a class taking the number of
+dimensions. The default, HashedTermEmbedder, needs no model, no network and no fitting, and always gives a text the
+same vector. Stored vectors carry a hash of their text and the embedder's fingerprint, so they are recomputed only
+when either changes. They are stored as float16, half the bytes of float32 at a precision cosine scores do not need.
+"""
+import hashlib
+import math
+from collections import Counter
+from functools import lru_cache
+from importlib import import_module
+from typing import Protocol, Sequence
+
+import numpy as np
+
+from app.config.settings import get_settings
+from app.search.text import WORD, stem
+
+STORED_DTYPE = np.dtype("<f2")
+
+# Words too common to say what a text is about; weighting terms by corpus frequency (IDF) would instead make every
+# vector depend on every other text, and change whenever any of them did
+STOP_WORDS = frozenset("""
+a about above after all also am an and any are as at be because been being but by can could did do does doing for
+from had has have having he her here hers him his how i if in into is it its just me more most my no nor not of off
+on once only or other our ours out over own same she should so some such than that the their them then there these
+they this those through to too under until up very was we were what when where which while who whom why will with
+would you your yours
+""".split())
+
+
+class Embedder(Protocol):
+    dimensions: int
+    # Identifies the embedder and its parameters; vectors are only comparable to those of the same fingerprint
+    fingerprint: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dimensions) float32 matrix of unit-length rows; a text without words embeds as zeros"""
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_hash(feature: str) -> int:
+    # Python's hash() is salted per process; vectors must be the same in every worker and across restarts
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+class HashedTermEmbedder:
+    """
+    Stemmed words and adjacent word pairs, stop words dropped, hashed into `dimensions` buckets with a hashed sign
+    (the hashing trick: a random projection of the sparse term vector that needs no vocabulary) and weighted by
+    sublinear term frequency, 1 + log(count)
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.fingerprint = f"hashed-terms-v1-{dimensions}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows, buckets, weights = [], [], []
+        for row, text in enumerate(texts):
+            for feature, count in Counter(self._features(text)).items():
+                hashed = _feature_hash(feature)
+                rows.append(row)
+                buckets.append(hashed % self.dimensions)
+                weights.append((1 + math.log(count)) * (1 if hashed >> 63 else -1))
+        # One scatter-add for the whole batch; features hashed to the same bucket add up
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(buckets, dtype=np.intp)),
+                  np.asarray(weights, dtype=np.float32))
+        return normalize(matrix)
+
+    @staticmethod
+    def _features(text: str) -> list[str]:
+        words = [stem(word) for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+# EMBEDDER values that name a built-in embedder
+EMBEDDERS = {"hashed_terms": HashedTermEmbedder}
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length in place, leaving zero rows as they are"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def job_listing_text(title: str, description: str) -> str:
+    return f"{title}\n{description}"
+
+
+def content_hash(embedder: Embedder, text: str) -> str:
+    """What a stored vector was computed from; a vector whose hash differs is stale"""
+    return hashlib.blake2b(f"{embedder.fingerprint}\0{text}".encode(), digest_size=16).hexdigest()
+
+
+def encode(vector: np.ndarray) -> bytes:
+    return vector.astype(STORED_DTYPE).tobytes()
+
+
+def decode(blobs: Sequence[bytes], dimensions: int) -> np.ndarray:
+    """(len(blobs), dimensions) float32 matrix of stored vectors"""
+    return np.frombuffer(b"".join(blobs), dtype=STORED_DTYPE).reshape(len(blobs), dimensions).astype(np.float32)
+
+
+def load_embedder(name: str, dimensions: int) -> Embedder:
+    """A registered embedder by name, or the class at a dotted path, e.g. mypackage.embedders.ModelEmbedder"""
+    embedder_class = EMBEDDERS.get(name)
+    if embedder_class is None:
+        module_name, _, class_name = name.rpartition(".")
+        if not module_name:
+            raise ValueError(f"Unknown embedder: {name}")
+        embedder_class = getattr(import_module(module_name), class_name)
+    return embedder_class(dimensions)
+
+
+@lru_cache
+def get_embedder() -> Embedder:
+    """This process's embedder, chosen by the settings on first use"""
+    settings = get_settings()
+    return load_embedder(settings.EMBEDDER, settings.EMBEDDING_DIMENSIONS)
+
@@ -0,0 +1,56 @@
+"""
+Per-worker cache of job board facet counts (GET /job_listings/facets), keyed by the normalized filter set.
+
+Counts change only when the set of published listings does, so JobListingService clears the cache when it publishes,
+delists, edits or deletes a published listing. Writes made by other workers show up once entries expire after
+FACET_CACHE_TTL_SECONDS. OrganizationService clears it from FastAPI's threadpool, so entries are accessed under a lock.
+"""
+import threading
+from functools import lru_cache
+from typing import Any, Hashable, Optional
+
+from cachetools import TTLCache
+
+from app.config.settings import get_settings
+
+
+def facet_key(**criteria: Any) -> tuple:
+    """Criteria with unset ones dropped and text normalized as search compares it, so equal filter sets share a key"""
+    normalized = {}
+    for name, value in criteria.items():
+        if value is None or value == "":
+            continue
+        if name == "keyword":
+            value = " ".join(value.lower().split())
+        elif name == "city":
+            value = value.lower()
+        elif name == "state_abbreviation":
+            value = value.upper()
+        normalized[name] = value
+    return tuple(sorted(normalized.items()))
+
+
+class FacetCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Hashable, facets: Any) -> None:
+        with self._lock:
+            self._entries[key] = facets
+
+    def invalidate(self) -> None:
+        """Drop every entry: any filter set may count the listing that changed"""
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def get_facet_cache() -> FacetCache:
+    """This worker's facet cache, sized from the settings on first use"""
+    settings = get_settings()
+    return FacetCache(settings.FACET_CACHE_MAX_ENTRIES, settings.FACET_CACHE_TTL_SECONDS)
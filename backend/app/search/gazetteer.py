@@ -0,0 +1,78 @@
+"""
+Offline gazetteer resolving a listing's city and state to coordinates (GET /job_listings/search/nearby).
+
+The bundled table (data/us_places.csv) holds one point per US city, so every located listing sits on one of a few
+hundred points. Listings are located when written and keep the coordinates they were given: after changing a
+place's coordinates, re-locate the listings there with scripts/locate_job_listings.py --all.
+"""
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+PLACES_PATH = Path(__file__).parent / "data" / "us_places.csv"
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LATITUDE = EARTH_RADIUS_MILES * math.pi / 180
+
+
+def place_key(city: str, state_abbreviation: str) -> tuple[str, str]:
+    """Case, punctuation and spacing insensitive lookup key; "Saint" and "St." are the same"""
+    words = city.casefold().replace(".", " ").split()
+    if words and words[0] == "saint":
+        words[0] = "st"
+    return " ".join(words), state_abbreviation.strip().upper()
+
+
+def distance_miles(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle (haversine) distance from one point to each of an array of points"""
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((latitudes - latitude) / 2) ** 2 + \
+        math.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class Gazetteer:
+    def __init__(self, places: list[tuple[str, str, float, float]]):
+        """places: (city, state abbreviation, latitude, longitude)"""
+        self._coordinates = {place_key(city, state): (latitude, longitude)
+                             for city, state, latitude, longitude in places}
+        # Distinct points sorted by latitude: a radius search only measures the band of latitudes it can reach
+        points = np.array(sorted(set(self._coordinates.values())), dtype=np.float64).reshape(-1, 2)
+        self._latitudes, self._longitudes = points[:, 0].copy(), points[:, 1].copy()
+
+    @classmethod
+    def load(cls, path: Path = PLACES_PATH) -> "Gazetteer":
+        with path.open(newline="", encoding="utf-8") as f:
+            return cls([(row["city"], row["state_abbreviation"], float(row["latitude"]), float(row["longitude"]))
+                        for row in csv.DictReader(f)])
+
+    def __len__(self) -> int:
+        return len(self._coordinates)
+
+    def locate(self, city: Optional[str], state_abbreviation: Optional[str]) -> Optional[tuple[float, float]]:
+        """(latitude, longitude) of a place, None when either part is missing or the place is unknown"""
+        if not city or not state_abbreviation:
+            return None
+        return self._coordinates.get(place_key(city, state_abbreviation))
+
+    def within(self, latitude: float, longitude: float,
+               radius_miles: float) -> list[tuple[float, float, float]]:
+        """(latitude, longitude, distance in miles) of the points within radius_miles of a point, nearest first"""
+        band = radius_miles / MILES_PER_DEGREE_LATITUDE
+        start = int(np.searchsorted(self._latitudes, latitude - band, side="left"))
+        stop = int(np.searchsorted(self._latitudes, latitude + band, side="right"))
+        latitudes, longitudes = self._latitudes[start:stop], self._longitudes[start:stop]
+        distances = distance_miles(latitude, longitude, latitudes, longitudes)
+        nearest = np.flatnonzero(distances <= radius_miles)
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return [(float(latitudes[i]), float(longitudes[i]), float(distances[i])) for i in nearest]
+
+
+@lru_cache
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer.load()
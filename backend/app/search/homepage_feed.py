@@ -0,0 +1,157 @@
+"""
+The worker's precomputed homepage feed (GET /job_listings/homepage): featured published listings and the newest
+published ones, most recently posted first. Each listing is held as its id and its response already serialized to
+JSON, and the response body is assembled from them once per change, so serving the feed neither queries nor
+serializes.
+
+JobListingService applies the listings it publishes, edits, delists and deletes in place. Each list keeps a reserve
+of the next listings beyond what it shows, which take the place of ones that leave; when a list runs short the feed
+is stale and rebuilds from the database (two small indexed queries) on the next request. Writes by other workers,
+imports and organization changes show once the feed expires after HOMEPAGE_FEED_TTL_SECONDS.
+"""
+import bisect
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Sequence
+from uuid import UUID
+
+from app.config.settings import get_settings
+from app.db.enums import JobListingStatus
+from app.db.models.job_listing import JobListing
+from app.schemas.job_listing import JobListingResponse
+
+# Each list holds this many times the listings it shows; the rest are the reserve
+CAPACITY_FACTOR = 2
+
+# A listing's place in a list: posted_at, then id breaking ties, as JobListingRepository.get_newest_published orders
+FeedKey = tuple[datetime, UUID]
+
+
+def serialize(job_listing: JobListing) -> bytes:
+    """The listing as GET /job_listings/{job_listing_id} returns it"""
+    return JobListingResponse.model_validate(job_listing).model_dump_json().encode()
+
+
+def feed_key(job_listing: JobListing) -> FeedKey:
+    # Published listings always have posted_at: JobListingService stamps it when they are published
+    return job_listing.posted_at, job_listing.id
+
+
+class _Section:
+    """
+    Listings most recently posted first, by posted_at and then id. Ids alone are not enough: listings created before
+    ids were UUID v7 have random ones, and posted_at can be set when a listing is written.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.capacity = limit * CAPACITY_FACTOR
+        # Ascending, so the newest are at the end
+        self._order: list[FeedKey] = []
+        self._keys: dict[UUID, FeedKey] = {}
+        self._items: dict[UUID, bytes] = {}
+        # Whether the database had no listings beyond those held when the section was loaded
+        self._complete = True
+
+    def load(self, items: Sequence[tuple[FeedKey, bytes]]) -> None:
+        items = items[:self.capacity]
+        self._keys = {key[1]: key for key, _ in items}
+        self._items = {key[1]: item for key, item in items}
+        self._order = sorted(self._keys.values())
+        self._complete = len(items) < self.capacity
+
+    @property
+    def short(self) -> bool:
+        """Whether listings left so that the section shows fewer than it could"""
+        return not self._complete and len(self._order) < self.limit
+
+    def ids(self) -> list[UUID]:
+        return [job_listing_id for _, job_listing_id in self._order[:-self.limit - 1:-1]]
+
+    def body(self) -> bytes:
+        return b"[" + b",".join(self._items[job_listing_id] for job_listing_id in self.ids()) + b"]"
+
+    def put(self, key: FeedKey, item: bytes) -> bool:
+        """Add or replace a listing; False when it ranks beyond the listings held, which are unchanged"""
+        job_listing_id = key[1]
+        if self._keys.get(job_listing_id) != key:
+            # New, or moved by a changed posted_at
+            removed = self.remove(job_listing_id)
+            if not self._complete and (not self._order or key < self._order[0]):
+                return removed
+            bisect.insort(self._order, key)
+            self._keys[job_listing_id] = key
+            if len(self._order) > self.capacity:
+                _, dropped_id = self._order.pop(0)
+                del self._keys[dropped_id], self._items[dropped_id]
+                self._complete = False
+        self._items[job_listing_id] = item
+        return True
+
+    def remove(self, job_listing_id: UUID) -> bool:
+        key = self._keys.pop(job_listing_id, None)
+        if key is None:
+            return False
+        del self._items[job_listing_id]
+        self._order.pop(bisect.bisect_left(self._order, key))
+        return True
+
+
+class HomepageFeed:
+    def __init__(self, featured_limit: int, recent_limit: int, ttl_seconds: float):
+        self.featured = _Section(featured_limit)
+        self.recent = _Section(recent_limit)
+        self.ttl_seconds = ttl_seconds
+        self._loaded_at: Optional[float] = None
+        self._body: Optional[bytes] = None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the feed must be loaded from the database before it is served"""
+        return (self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+                or self.featured.short or self.recent.short)
+
+    def load(self, featured: Sequence[JobListing], recent: Sequence[JobListing]) -> None:
+        """Replace the feed with listings read from the database, newest first, up to each list's capacity"""
+        items = {job_listing.id: serialize(job_listing) for job_listing in [*featured, *recent]}
+        self.featured.load([(feed_key(job_listing), items[job_listing.id]) for job_listing in featured])
+        self.recent.load([(feed_key(job_listing), items[job_listing.id]) for job_listing in recent])
+        self._loaded_at, self._body = time.monotonic(), None
+
+    def put(self, job_listing: JobListing) -> None:
+        """Apply a listing this worker just wrote: shown while published (and featured, for the featured list)"""
+        if self._loaded_at is None:
+            return
+        published = job_listing.status == JobListingStatus.PUBLISHED
+        item = serialize(job_listing) if published else None
+        changed = self.recent.put(feed_key(job_listing), item) if published else self.recent.remove(job_listing.id)
+        if published and job_listing.is_featured:
+            changed = self.featured.put(feed_key(job_listing), item) or changed
+        else:
+            changed = self.featured.remove(job_listing.id) or changed
+        if changed:
+            self._body = None
+
+    def remove(self, job_listing_id: UUID) -> None:
+        if self.featured.remove(job_listing_id) | self.recent.remove(job_listing_id):
+            self._body = None
+
+    def invalidate(self) -> None:
+        """Load the feed again on the next request, e.g. after writes made in SQL"""
+        # A single assignment, so OrganizationService may call it from FastAPI's threadpool
+        self._loaded_at = None
+
+    def body(self) -> bytes:
+        """The JSON response body: {"featured": [...], "recent": [...]}"""
+        if self._body is None:
+            self._body = b'{"featured":' + self.featured.body() + b',"recent":' + self.recent.body() + b"}"
+        return self._body
+
+
+@lru_cache
+def get_homepage_feed() -> HomepageFeed:
+    """This worker's homepage feed, sized from the settings on first use"""
+    settings = get_settings()
+    return HomepageFeed(settings.HOMEPAGE_FEATURED_LIMIT, settings.HOMEPAGE_RECENT_LIMIT,
+                        settings.HOMEPAGE_FEED_TTL_SECONDS)
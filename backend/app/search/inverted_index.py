@@ -0,0 +1,215 @@
+"""
+In-memory inverted index ranking matches with BM25.
+
+Every indexed document gets the next document number. A term's postings are two parallel NumPy arrays, document
+numbers (ascending, since numbers only grow) and field-weighted term frequencies, grown by doubling like a list.
+A query reads contiguous arrays and scores all of its matches with vectorized arithmetic instead of a Python loop
+per posting. Re-adding a key indexes the new text under a fresh number and leaves the old number behind as a
+tombstone, as removing a key does; the postings are compacted once tombstones make up a quarter of the index.
+"""
+import math
+from collections import Counter
+from typing import Generic, Hashable, Mapping, Optional, TypeVar
+
+import numpy as np
+
+from app.db.full_text import parse_websearch
+from app.search.text import tokenize
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+
+# Okapi BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Compact when tombstones are at least this share of document numbers (and at least COMPACT_MIN_REMOVED of them)
+COMPACT_REMOVED_RATIO = 0.25
+COMPACT_MIN_REMOVED = 1024
+
+EMPTY_DOCS = np.empty(0, dtype=np.uint32)
+EMPTY_SCORES = np.empty(0, dtype=np.float64)
+
+
+class _GrowableArray:
+    """A NumPy array appended to in amortized constant time; view() is the filled part"""
+    __slots__ = ("values", "size")
+
+    def __init__(self, dtype, values: Optional[np.ndarray] = None):
+        self.values = np.empty(4, dtype=dtype) if values is None else values.astype(dtype)
+        self.size = 0 if values is None else len(values)
+
+    def append(self, value) -> None:
+        if self.size == len(self.values):
+            grown = np.empty(max(len(self.values) * 2, 4), dtype=self.values.dtype)
+            grown[:self.size] = self.values
+            self.values = grown
+        self.values[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.values[:self.size]
+
+
+class _Postings:
+    __slots__ = ("docs", "frequencies")
+
+    def __init__(self, docs: Optional[np.ndarray] = None, frequencies: Optional[np.ndarray] = None):
+        self.docs = _GrowableArray(np.uint32, docs)
+        self.frequencies = _GrowableArray(np.float32, frequencies)
+
+
+class InvertedIndex(Generic[KeyType]):
+    """
+    Keyword index over documents made of weighted text fields (e.g. a title counting more than a body). Queries
+    use web search syntax (see app.db.full_text.parse_websearch); a quoted phrase matches documents holding all of
+    its words, as word positions are not kept.
+    """
+
+    def __init__(self, field_weights: Mapping[str, float]):
+        self.field_weights = dict(field_weights)
+        self._postings: dict[str, _Postings] = {}
+        # Document number -> key; None once the document is removed or re-added
+        self._keys: list[Optional[KeyType]] = []
+        self._numbers: dict[KeyType, int] = {}
+        self._lengths = _GrowableArray(np.float32)
+        self._live = _GrowableArray(np.bool_)
+        self._total_length = 0.0
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._numbers
+
+    def add(self, key: KeyType, fields: Mapping[str, Optional[str]]) -> None:
+        """Index (or re-index) a document from its text fields"""
+        self.remove(key)
+        frequencies: Counter = Counter()
+        for field, text in fields.items():
+            weight = self.field_weights[field]
+            for term in tokenize(text or ""):
+                frequencies[term] += weight
+        number = len(self._keys)
+        length = sum(frequencies.values())
+        self._keys.append(key)
+        self._numbers[key] = number
+        self._lengths.append(length)
+        self._live.append(True)
+        self._total_length += length
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.docs.append(number)
+            postings.frequencies.append(frequency)
+
+    def remove(self, key: KeyType) -> bool:
+        """Drop a document; False when it was not indexed"""
+        number = self._numbers.pop(key, None)
+        if number is None:
+            return False
+        self._keys[number] = None
+        self._live.values[number] = False
+        self._total_length -= float(self._lengths.values[number])
+        self._removed += 1
+        if self._removed >= COMPACT_MIN_REMOVED and self._removed >= COMPACT_REMOVED_RATIO * len(self._keys):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstones from the postings and renumber the documents left"""
+        live = self._live.view()
+        renumbered = np.cumsum(live, dtype=np.int64) - 1
+        for term, postings in list(self._postings.items()):
+            docs = postings.docs.view()
+            kept = live[docs]
+            if kept.any():
+                self._postings[term] = _Postings(renumbered[docs[kept]], postings.frequencies.view()[kept])
+            else:
+                del self._postings[term]
+        self._keys = [key for key in self._keys if key is not None]
+        self._numbers = {key: number for number, key in enumerate(self._keys)}
+        self._lengths = _GrowableArray(np.float32, self._lengths.view()[live])
+        self._live = _GrowableArray(np.bool_, np.ones(len(self._keys), dtype=np.bool_))
+        self._removed = 0
+
+    def search(self, query: str, limit: int) -> list[tuple[KeyType, float]]:
+        """The `limit` best (key, BM25 score) matches of query, highest score first, newest first among ties"""
+        groups, excluded = parse_websearch(query)
+        if not groups or not self._numbers or limit <= 0:
+            return []
+        docs, scores = self._match_any(groups[0])
+        for group in groups[1:]:
+            group_docs, group_scores = self._match_any(group)
+            in_docs, in_group = _intersect(docs, group_docs)
+            docs, scores = docs[in_docs], scores[in_docs] + group_scores[in_group]
+        if excluded and len(docs):
+            excluded_docs, _ = self._match_any(excluded)
+            kept = ~np.isin(docs, excluded_docs, assume_unique=True)
+            docs, scores = docs[kept], scores[kept]
+        live = self._live.view()[docs]
+        docs, scores = docs[live], scores[live]
+
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        order = np.lexsort((-docs.astype(np.int64), -scores))
+        return [(self._keys[doc], score) for doc, score in zip(docs[order].tolist(), scores[order].tolist())]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the postings and per-document arrays (not counting the keys themselves)"""
+        return sum(postings.docs.values.nbytes + postings.frequencies.values.nbytes
+                   for postings in self._postings.values()) + self._lengths.values.nbytes + self._live.values.nbytes
+
+    def _match_any(self, alternatives: list[list[str]]) -> tuple[np.ndarray, np.ndarray]:
+        """Documents matching any alternative (all of its words) in ascending order, with their summed scores"""
+        matches = [match for match in map(self._match_all, alternatives) if len(match[0])]
+        if not matches:
+            return EMPTY_DOCS, EMPTY_SCORES
+        if len(matches) == 1:
+            return matches[0]
+        # Scattering into arrays over all document numbers merges the alternatives without sorting them together
+        summed = np.zeros(len(self._keys))
+        matched = np.zeros(len(self._keys), dtype=np.bool_)
+        for docs, scores in matches:
+            summed[docs] += scores
+            matched[docs] = True
+        docs = np.flatnonzero(matched).astype(np.uint32)
+        return docs, summed[docs]
+
+    def _match_all(self, words: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        postings = [self._postings.get(term) for term in tokenize(" ".join(words))]
+        if not postings or None in postings:
+            return EMPTY_DOCS, EMPTY_SCORES
+        # Starting from the rarest term keeps every intersection as small as the final result
+        postings.sort(key=lambda term_postings: term_postings.docs.size)
+        docs = postings[0].docs.view()
+        scores = self._scores(postings[0], docs, postings[0].frequencies.view())
+        for term_postings in postings[1:]:
+            in_docs, in_term = _intersect(docs, term_postings.docs.view())
+            docs = docs[in_docs]
+            scores = scores[in_docs] + self._scores(term_postings, docs, term_postings.frequencies.view()[in_term])
+        return docs, scores
+
+    def _scores(self, postings: _Postings, docs: np.ndarray, frequencies: np.ndarray) -> np.ndarray:
+        # Document frequency counts tombstones until the next compaction, which keeps them under a quarter; capped
+        # at the live document count so idf stays positive
+        document_count = len(self._numbers)
+        document_frequency = min(postings.docs.size, document_count)
+        idf = math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = self._total_length / document_count if self._total_length > 0 else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths.view()[docs] / average_length)
+        return idf * frequencies * (BM25_K1 + 1) / (frequencies + length_norm)
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Indices into a and into b of the values both hold; both are sorted without duplicates"""
+    if len(a) > len(b):
+        in_b, in_a = _intersect(b, a)
+        return in_a, in_b
+    if not len(a):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Binary search of the shorter array's values in the longer one: cheap when a rare term meets a common one
+    positions = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    found = b[positions] == a
+    return np.flatnonzero(found), positions[found]
@@ -0,0 +1,188 @@
+"""
+The worker's in-memory search structures over published job listings: the keyword index
+(GET /job_listings/search/instant) and the autocomplete tries (GET /job_listings/search/autocomplete).
+
+Each worker process builds its own in the background after startup and keeps them current two ways:
+JobListingService and OrganizationService apply the writes they make, and a periodic refresh re-reads the listings
+and organizations updated since the last one, which covers writes by other workers, imports and scripts. A listing
+deleted by another worker stays indexed until a search finds it gone from the database and drops it; an
+organization deleted by another worker is suggested until the next build. Until the first build completes the
+index is not ready: searches go to the database and there are no suggestions.
+
+updated_at is stamped when the writing transaction starts, so a long transaction (an import) can commit rows stamped
+before the newest a refresh has already read. Each refresh therefore reads from REFRESH_OVERLAP_SECONDS before that
+newest updated_at, and leaves the listings it reads unchanged as they are.
+
+Builds and refreshes tokenize listings in a thread so that requests are served meanwhile; a build fills fresh
+structures and swaps them in. OrganizationService also writes from a thread (FastAPI's threadpool, as the organization
+endpoints are synchronous), so every read and write of the structures holds the index's lock. Writes are short, and a
+compaction of the keyword index happens inside the write that triggers it, so a search never sees it half done.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Sequence, Union
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.logging import log_event
+from app.config.settings import get_settings
+from app.db.enums import JobListingStatus
+from app.db.models.job_listing import JobListing
+from app.db.models.organization import Organization
+from app.repositories.job_listing_repository import JobListingRepository
+from app.search.autocomplete import Autocomplete
+from app.search.inverted_index import InvertedIndex
+
+logger = logging.getLogger("app.search")
+
+# Title matches weigh 2.5 times description matches, as in the database full-text ranking
+FIELD_WEIGHTS = {"title": 2.5, "description": 1.0}
+
+
+class JobListingIndex:
+    def __init__(self, autocomplete_top_k: Optional[int] = None, refresh_overlap_seconds: Optional[float] = None):
+        self.autocomplete_top_k = autocomplete_top_k or get_settings().AUTOCOMPLETE_TOP_K
+        self.refresh_overlap = timedelta(seconds=get_settings().REFRESH_OVERLAP_SECONDS
+                                         if refresh_overlap_seconds is None else refresh_overlap_seconds)
+        self.index: InvertedIndex[UUID] = InvertedIndex(FIELD_WEIGHTS)
+        self.autocomplete = Autocomplete(self.autocomplete_top_k)
+        self.ready = False
+        # updated_at of the newest listing and organization read from the database; the next refresh reads from
+        # refresh_overlap before there
+        self.updated_since: Optional[datetime] = None
+        self.organizations_updated_since: Optional[datetime] = None
+        # (updated_at, hash) of the listings read within the overlap, which the next refresh reads again
+        self._overlap_rows: dict[UUID, tuple[datetime, int]] = {}
+        # Reentrant: removing an organization removes its listings
+        self._lock = threading.RLock()
+
+    def put(self, job_listing: JobListing) -> None:
+        """Apply a listing this worker just wrote: index it when published, drop it otherwise"""
+        # Before the first build completes, the build or the refresh after it reads the listing instead
+        if self.ready:
+            with self._lock:
+                self._apply(job_listing)
+
+    def remove(self, job_listing_id: UUID) -> None:
+        with self._lock:
+            self.index.remove(job_listing_id)
+            self.autocomplete.remove_listing(job_listing_id)
+
+    def put_organization(self, organization: Organization) -> None:
+        """Apply an organization this worker just created or renamed"""
+        if self.ready:
+            with self._lock:
+                self.autocomplete.put_organization(organization.id, organization.name)
+
+    def remove_organization(self, organization_id: str) -> None:
+        """Drop an organization and its listings, which the database deletes with it"""
+        with self._lock:
+            for job_listing_id in self.autocomplete.listings_of(organization_id):
+                self.remove(job_listing_id)
+            self.autocomplete.remove_organization(organization_id)
+
+    def search(self, keyword: str, limit: int) -> list[tuple[UUID, float]]:
+        """(job listing id, BM25 score) of the `limit` best matches of keyword, best first"""
+        with self._lock:
+            return self.index.search(keyword, limit)
+
+    def suggest(self, prefix: str, limit: int):
+        """See Autocomplete.suggest"""
+        with self._lock:
+            return self.autocomplete.suggest(prefix, limit)
+
+    async def build(self, db: AsyncSession) -> None:
+        """Index every published listing and organization into fresh structures, then swap them in"""
+        building = JobListingIndex(self.autocomplete_top_k, self.refresh_overlap.total_seconds())
+        await building._read(JobListingRepository(db))
+        # Nothing else holds the new structures yet
+        await asyncio.to_thread(building.autocomplete.finish_loading)
+        with self._lock:
+            self.index, self.autocomplete = building.index, building.autocomplete
+            self.updated_since, self.organizations_updated_since = (building.updated_since,
+                                                                    building.organizations_updated_since)
+            self._overlap_rows = building._overlap_rows
+        self.ready = True
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Apply the listings and organizations updated since the last build or refresh"""
+        if self.ready:
+            await self._read(JobListingRepository(db))
+
+    async def _read(self, job_listing_repo: JobListingRepository) -> None:
+        # Listings are tokenized and counted in a thread, a batch at a time
+        rows = await job_listing_repo.get_organization_names(
+            self._overlapped(self.organizations_updated_since))
+        with self._lock:
+            for row in rows:
+                self.autocomplete.put_organization(row.id, row.name)
+                self.organizations_updated_since = _newest(self.organizations_updated_since, row.updated_at)
+        async for rows in job_listing_repo.stream_search_documents(self._overlapped(self.updated_since)):
+            await asyncio.to_thread(self._read_listings, rows)
+        if self.updated_since is not None:
+            overlap_start = self.updated_since - self.refresh_overlap
+            with self._lock:
+                self._overlap_rows = {job_listing_id: read for job_listing_id, read in self._overlap_rows.items()
+                                      if read[0] >= overlap_start}
+
+    def _read_listings(self, rows: Sequence[Row]) -> None:
+        for row in rows:
+            # Locked per listing, so a search waits for one listing's tokens at most
+            with self._lock:
+                # Re-indexing a listing tombstones its old postings, so one read unchanged is left as it is
+                read = (row.updated_at, hash(row))
+                if self._overlap_rows.get(row.id) != read:
+                    self._apply(row)
+                    self._overlap_rows[row.id] = read
+                self.updated_since = _newest(self.updated_since, row.updated_at)
+
+    def _overlapped(self, updated_since: Optional[datetime]) -> Optional[datetime]:
+        return None if updated_since is None else updated_since - self.refresh_overlap
+
+    def _apply(self, job_listing: Union[JobListing, Row]) -> None:
+        if job_listing.status == JobListingStatus.PUBLISHED:
+            self.index.add(job_listing.id, {"title": job_listing.title, "description": job_listing.description})
+            self.autocomplete.put_listing(job_listing.id, job_listing.title, job_listing.city,
+                                          job_listing.state_abbreviation, job_listing.organization_id)
+        else:
+            self.remove(job_listing.id)
+
+
+def _newest(updated_since: Optional[datetime], updated_at: datetime) -> datetime:
+    return updated_at if updated_since is None or updated_at > updated_since else updated_since
+
+
+@lru_cache
+def get_job_listing_index() -> JobListingIndex:
+    """This worker's index; empty and not ready unless maintain_job_listing_index runs"""
+    return JobListingIndex()
+
+
+async def maintain_job_listing_index(job_listing_index: JobListingIndex, session_factory: async_sessionmaker,
+                                     refresh_seconds: float) -> None:
+    """Build the index, then refresh it every refresh_seconds until cancelled; failures are retried"""
+    while True:
+        try:
+            async with session_factory() as db:
+                if job_listing_index.ready:
+                    await job_listing_index.refresh(db)
+                else:
+                    start = time.perf_counter()
+                    await job_listing_index.build(db)
+                    log_event(logger, "search_index_built",
+                              f"Indexed {len(job_listing_index.index)} published job listings",
+                              documents=len(job_listing_index.index),
+                              memory_bytes=job_listing_index.index.memory_bytes(),
+                              suggestions={"titles": len(job_listing_index.autocomplete.titles),
+                                           "locations": len(job_listing_index.autocomplete.locations),
+                                           "organizations": len(job_listing_index.autocomplete.organizations)},
+                              duration_ms=round((time.perf_counter() - start) * 1000, 3))
+        except Exception:
+            logger.exception("Updating the job listing search index failed")
+        await asyncio.sleep(refresh_seconds)
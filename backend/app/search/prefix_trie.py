@@ -0,0 +1,198 @@
+"""
+In-memory compressed prefix trie answering "the most popular values with a key starting with this prefix".
+
+Each edge holds a run of characters rather than one, so a trie of n keys has at most 2n nodes. Every node keeps the
+top-k values of its subtree by weight, so a lookup walks the prefix and returns that node's list without visiting
+the subtree. Changing a value's weight updates the lists on the paths of its keys only: a higher weight is merged in
+place, and a node a lower weight may have pushed out of its top-k is recomputed from its children's lists, which
+hold every value that can take its place.
+"""
+import heapq
+from typing import Generic, Hashable, Iterable, Optional, TypeVar
+
+ValueType = TypeVar("ValueType", bound=Hashable)
+
+
+class _Node:
+    __slots__ = ("label", "children", "values", "top")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        # First character of the child's label -> child
+        self.children: dict[str, _Node] = {}
+        # Values with a key ending at this node
+        self.values: set = set()
+        # (-weight, value) of the best values in the subtree, best first
+        self.top: list[tuple[int, ValueType]] = []
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+class PrefixTrie(Generic[ValueType]):
+    """
+    Values reachable under one or more keys each (e.g. every word suffix of a title), ranked by an integer weight.
+    Ties rank by value, so values must be orderable.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self._root = _Node()
+        self._weights: dict[ValueType, int] = {}
+        self._keys: dict[ValueType, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __contains__(self, value: ValueType) -> bool:
+        return value in self._weights
+
+    def weight(self, value: ValueType) -> Optional[int]:
+        return self._weights.get(value)
+
+    def load(self, entries: Iterable[tuple[ValueType, Iterable[str], int]]) -> None:
+        """Add many new (value, keys, weight) entries, computing the top-k lists once at the end"""
+        for value, keys, weight in entries:
+            self._weights[value], self._keys[value] = weight, tuple(dict.fromkeys(keys))
+            for key in self._keys[value]:
+                self._insert(key, value)
+        # Children before parents
+        stack, ordered = [self._root], []
+        while stack:
+            node = stack.pop()
+            ordered.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(ordered):
+            self._recompute(node)
+
+    def put(self, value: ValueType, keys: Iterable[str], weight: int) -> None:
+        """Add a value under keys, or change its weight; a value that changes keys is removed and added again"""
+        keys = tuple(dict.fromkeys(keys))
+        if value in self._weights and self._keys[value] != keys:
+            self.remove(value)
+        previous = self._weights.get(value)
+        self._weights[value], self._keys[value] = weight, keys
+        if previous is None:
+            nodes = self._nodes([self._insert(key, value) for key in keys])
+        else:
+            nodes = self._nodes([self._path(key) for key in keys])
+        if previous is None or weight > previous:
+            for node in nodes:
+                self._raise(node, value, weight)
+        elif weight < previous:
+            for node in nodes:
+                if any(entry[1] == value for entry in node.top):
+                    self._recompute(node)
+
+    def remove(self, value: ValueType) -> None:
+        if value not in self._weights:
+            return
+        del self._weights[value]
+        keys = self._keys.pop(value)
+        for key in keys:
+            path = self._path(key)
+            path[-1].values.discard(value)
+            self._prune(path)
+        # The nodes left where the keys were, some merged or gone
+        for node in self._nodes([self._walk(key) for key in keys]):
+            if any(entry[1] == value for entry in node.top):
+                self._recompute(node)
+
+    def top(self, prefix: str, limit: int) -> list[tuple[ValueType, int]]:
+        """(value, weight) of the best `limit` (at most top_k) values with a key starting with prefix, best first"""
+        node, rest = self._root, prefix
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                return []
+            if rest.startswith(child.label):
+                node, rest = child, rest[len(child.label):]
+            elif child.label.startswith(rest):
+                node, rest = child, ""
+            else:
+                return []
+        return [(value, -weight) for weight, value in node.top[:limit]]
+
+    def _insert(self, key: str, value: ValueType) -> list[_Node]:
+        """Add key's nodes (splitting an edge where the key leaves it) and return its path from the root"""
+        node, path, rest = self._root, [self._root], key
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = node.children[rest[0]] = _Node(rest)
+                rest = ""
+            else:
+                common = _common_prefix_length(child.label, rest)
+                if common < len(child.label):
+                    middle = node.children[rest[0]] = _Node(child.label[:common])
+                    child.label = child.label[common:]
+                    middle.children[child.label[0]] = child
+                    middle.top = list(child.top)
+                    child = middle
+                rest = rest[common:]
+            node = child
+            path.append(node)
+        node.values.add(value)
+        return path
+
+    def _path(self, key: str) -> list[_Node]:
+        node, path, rest = self._root, [self._root], key
+        while rest:
+            node = node.children[rest[0]]
+            rest = rest[len(node.label):]
+            path.append(node)
+        return path
+
+    def _walk(self, key: str) -> list[_Node]:
+        """Path from the root along key for as long as the trie holds it"""
+        node, path, rest = self._root, [self._root], key
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                break
+            path.append(child)
+            if not rest.startswith(child.label):
+                break
+            node, rest = child, rest[len(child.label):]
+        return path
+
+    @staticmethod
+    def _nodes(paths: list[list[_Node]]) -> list[_Node]:
+        """Distinct nodes of the paths, deepest first, so each is updated after the children it reads"""
+        depths: dict[int, tuple[int, _Node]] = {}
+        for path in paths:
+            for depth, node in enumerate(path):
+                depths[id(node)] = (depth, node)
+        return [node for _, node in sorted(depths.values(), key=lambda item: -item[0])]
+
+    def _raise(self, node: _Node, value: ValueType, weight: int) -> None:
+        top = [entry for entry in node.top if entry[1] != value]
+        entry = (-weight, value)
+        if len(top) < self.top_k or entry < top[-1]:
+            top.append(entry)
+            top.sort()
+            del top[self.top_k:]
+        node.top = top
+
+    def _recompute(self, node: _Node) -> None:
+        candidates = {value: self._weights[value] for value in node.values}
+        for child in node.children.values():
+            for _, value in child.top:
+                if value in self._weights:
+                    candidates[value] = self._weights[value]
+        node.top = heapq.nsmallest(self.top_k, ((-weight, value) for value, weight in candidates.items()))
+
+    def _prune(self, path: list[_Node]) -> None:
+        """Drop nodes left without values or children and merge a valueless node into its only child"""
+        for parent, node in zip(reversed(path[:-1]), reversed(path[1:])):
+            if not node.values and not node.children:
+                del parent.children[node.label[0]]
+            elif not node.values and len(node.children) == 1:
+                (child,) = node.children.values()
+                child.label = node.label + child.label
+                parent.children[child.label[0]] = child
@@ -0,0 +1,262 @@
+"""
+The worker's job recommendation index (GET /users/me/recommendations): the embeddings of published job listings in
+an approximate nearest neighbour index (app.search.vector_index), searched with the user's resume summary vector.
+
+It is kept current like the keyword index: JobListingService applies the listings it writes, embedding the
+published ones, and a periodic refresh reads the listings updated since the last one with their stored vectors
+(embedding those whose vector is missing or stale, as the embedding pipeline will). A refresh reads from
+REFRESH_OVERLAP_SECONDS before the newest updated_at read, for rows committed late by long transactions, and skips
+the listings it read unchanged. A listing deleted elsewhere stays indexed until a recommendation finds it gone from
+the database and drops it.
+
+Embedding written or stale listings and clustering run in a thread, so that requests are served meanwhile. A refresh that
+reclusters trains a copy of the index and swaps it in, replaying the writes applied to the live index while it
+trained.
+
+When RECOMMENDATION_INDEX_PATH is set, the index is written there after each refresh that changed it, and a worker
+starting up loads it from there and refreshes from where it was saved rather than reading and clustering every
+listing. A file written with another embedder is ignored.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.logging import log_event
+from app.config.settings import get_settings
+from app.db.enums import JobListingStatus
+from app.db.models.job_listing import JobListing
+from app.repositories.embedding_repository import JobListingEmbeddingRepository
+from app.search.embeddings import STORED_DTYPE, Embedder, content_hash, decode, get_embedder, job_listing_text
+from app.search.vector_index import IVFFlatIndex
+
+logger = logging.getLogger("app.search")
+
+# Version of the saved file's layout; files of another version are ignored
+FILE_FORMAT = 1
+
+
+class JobRecommendationIndex:
+    def __init__(self, path: Optional[str] = None, probes: Optional[int] = None,
+                 embedder: Optional[Embedder] = None):
+        settings = get_settings()
+        self.path = Path(path) if path else None
+        self.probes = probes or settings.RECOMMENDATION_INDEX_PROBES
+        self.embedder = embedder or get_embedder()
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.refresh_overlap = timedelta(seconds=settings.REFRESH_OVERLAP_SECONDS)
+        self.index: IVFFlatIndex[UUID] = IVFFlatIndex(self.embedder.dimensions, self.probes)
+        self.ready = False
+        # updated_at of the newest listing read from the database; the next refresh reads from refresh_overlap
+        # before there
+        self.updated_since: Optional[datetime] = None
+        # (updated_at, stored content hash) of the listings read within the overlap, which the next refresh reads
+        # again
+        self._overlap_rows: dict[UUID, tuple[datetime, Optional[str]]] = {}
+        # Whether the index changed since it was last saved
+        self.changed = False
+        # While a copy of the index is trained: key -> vector written meanwhile, or None when removed
+        self._changes: Optional[dict[UUID, Optional[np.ndarray]]] = None
+
+    async def put(self, job_listings: Sequence[JobListing]) -> None:
+        """
+        Apply listings this worker just wrote: published ones are embedded (one batch, in a thread) and indexed,
+        others dropped
+        """
+        if not self.ready:
+            return
+        published = [job_listing for job_listing in job_listings if job_listing.status == JobListingStatus.PUBLISHED]
+        for job_listing in job_listings:
+            if job_listing.status != JobListingStatus.PUBLISHED:
+                self.remove(job_listing.id)
+        if published:
+            vectors = await asyncio.to_thread(self.embedder.embed, [
+                job_listing_text(job_listing.title, job_listing.description) for job_listing in published])
+            self._add([job_listing.id for job_listing in published], vectors)
+
+    def remove(self, job_listing_id: UUID) -> None:
+        if self._changes is not None:
+            self._changes[job_listing_id] = None
+        if self.index.remove(job_listing_id):
+            self.changed = True
+
+    def search(self, vector: np.ndarray, limit: int) -> list[tuple[UUID, float]]:
+        """The `limit` listings closest to vector, closest first, with their cosine similarity"""
+        return self.index.search(vector, limit)
+
+    async def build(self, db: AsyncSession) -> None:
+        """Index every published listing into a fresh index, cluster it, then swap it in"""
+        building = JobRecommendationIndex(str(self.path) if self.path else None, self.probes, self.embedder)
+        building.ready = True
+        await building._read(JobListingEmbeddingRepository(db))
+        if building.index.needs_training:
+            # In a thread, so that requests are served meanwhile; nothing else holds the new index yet
+            await asyncio.to_thread(building.index.train)
+        self.index, self.updated_since, self.ready, self.changed = building.index, building.updated_since, True, True
+        self._overlap_rows = building._overlap_rows
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Apply the listings updated since the last build or refresh, and recluster once the index outgrew its lists"""
+        if self.ready:
+            await self._read(JobListingEmbeddingRepository(db))
+            # Rare, as the index has to grow fourfold first (RETRAIN_GROWTH)
+            if self.index.needs_training and self._changes is None:
+                await self._retrain()
+
+    async def _retrain(self) -> None:
+        """Cluster a copy of the index in a thread, then swap it in with the writes made meanwhile"""
+        keys, vectors = self.index.items()
+        training: IVFFlatIndex[UUID] = IVFFlatIndex(self.embedder.dimensions, self.probes)
+        training.restore(None, 0, keys, vectors, [len(keys)])
+        self._changes = {}
+        try:
+            await asyncio.to_thread(training.train)
+            changes = self._changes
+        finally:
+            self._changes = None
+        written = [(job_listing_id, vector) for job_listing_id, vector in changes.items() if vector is not None]
+        for job_listing_id, vector in changes.items():
+            if vector is None:
+                training.remove(job_listing_id)
+        if written:
+            training.add([job_listing_id for job_listing_id, _ in written], np.stack([vector for _, vector in written]))
+        self.index, self.changed = training, True
+
+    async def _read(self, repo: JobListingEmbeddingRepository) -> None:
+        after = None
+        updated_since = None if self.updated_since is None else self.updated_since - self.refresh_overlap
+        while True:
+            rows = await repo.get_vectors(after, self.batch_size, updated_since)
+            stored, stale = [], []
+            for row in rows:
+                self.updated_since = max(self.updated_since or row.updated_at, row.updated_at)
+                # Re-adding a listing read unchanged would only mark the index changed and saved again
+                read = (row.updated_at, row.content_hash)
+                if self._overlap_rows.get(row.id) == read:
+                    continue
+                self._overlap_rows[row.id] = read
+                if row.status != JobListingStatus.PUBLISHED:
+                    self.remove(row.id)
+                    continue
+                text = job_listing_text(row.title, row.description)
+                if row.content_hash == content_hash(self.embedder, text):
+                    stored.append(row)
+                else:
+                    stale.append((row.id, text))
+            if stored:
+                self._add([row.id for row in stored], decode([row.vector for row in stored], self.embedder.dimensions))
+            if stale:
+                # In a thread, like clustering: a model embedder can take a while over a batch
+                self._add([job_listing_id for job_listing_id, _ in stale],
+                          await asyncio.to_thread(self.embedder.embed, [text for _, text in stale]))
+            if len(rows) < self.batch_size:
+                break
+            after = rows[-1].id
+        if self.updated_since is not None:
+            overlap_start = self.updated_since - self.refresh_overlap
+            self._overlap_rows = {job_listing_id: read for job_listing_id, read in self._overlap_rows.items()
+                                  if read[0] >= overlap_start}
+
+    def _add(self, job_listing_ids: Sequence[UUID], vectors: np.ndarray) -> None:
+        # A listing without words embeds as zeros and is close to nothing
+        embedded = vectors.any(axis=1)
+        for job_listing_id in np.asarray(job_listing_ids, dtype=object)[~embedded]:
+            self.remove(job_listing_id)
+        if embedded.any():
+            kept_ids = [job_listing_id for job_listing_id, keep in zip(job_listing_ids, embedded) if keep]
+            self.index.add(kept_ids, vectors[embedded])
+            if self._changes is not None:
+                self._changes.update(zip(kept_ids, vectors[embedded]))
+            self.changed = True
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """The index as arrays for save(), taken at once so that the file can be written while writes continue"""
+        keys, vectors = self.index.items()
+        arrays = {
+            "format": np.array(FILE_FORMAT),
+            "fingerprint": np.array(self.embedder.fingerprint),
+            "updated_since": np.array(self.updated_since.isoformat() if self.updated_since else ""),
+            "trained_size": np.array(self.index.trained_size),
+            "keys": np.frombuffer(b"".join(key.bytes for key in keys), dtype=np.uint8).reshape(len(keys), 16),
+            "vectors": vectors.astype(STORED_DTYPE),
+            "list_sizes": np.array(self.index.list_sizes(), dtype=np.int64),
+        }
+        if self.index.centroids is not None:
+            arrays["centroids"] = self.index.centroids
+        return arrays
+
+    def save(self, arrays: dict[str, np.ndarray]) -> None:
+        """Write a snapshot to the path, replacing the previous file atomically"""
+        partial = self.path.with_name(f"{self.path.name}.{os.getpid()}.partial")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(partial, self.path)
+
+    def load(self) -> bool:
+        """Replace the index with the saved one; False when there is none written by this embedder"""
+        if self.path is None or not self.path.exists():
+            return False
+        with np.load(self.path) as arrays:
+            if int(arrays["format"]) != FILE_FORMAT or str(arrays["fingerprint"]) != self.embedder.fingerprint:
+                return False
+            blob = arrays["keys"].tobytes()
+            keys = [UUID(bytes=blob[start:start + 16]) for start in range(0, len(blob), 16)]
+            self.index.restore(arrays["centroids"] if "centroids" in arrays else None, int(arrays["trained_size"]),
+                               keys, arrays["vectors"].astype(np.float32), arrays["list_sizes"].tolist())
+            updated_since = str(arrays["updated_since"])
+        self.updated_since = datetime.fromisoformat(updated_since) if updated_since else None
+        self.ready, self.changed = True, False
+        return True
+
+
+@lru_cache
+def get_job_recommendation_index() -> JobRecommendationIndex:
+    """This worker's index; empty and not ready unless maintain_job_recommendation_index runs"""
+    return JobRecommendationIndex(get_settings().RECOMMENDATION_INDEX_PATH)
+
+
+async def maintain_job_recommendation_index(recommendation_index: JobRecommendationIndex,
+                                            session_factory: async_sessionmaker, refresh_seconds: float) -> None:
+    """
+    Load the saved index, or build it when there is none, then refresh it every refresh_seconds until cancelled,
+    saving it after each change; failures are retried
+    """
+    while True:
+        try:
+            start = time.perf_counter()
+            if not recommendation_index.ready and recommendation_index.load():
+                _log_ready(recommendation_index, "loaded", start)
+            async with session_factory() as db:
+                if recommendation_index.ready:
+                    await recommendation_index.refresh(db)
+                else:
+                    await recommendation_index.build(db)
+                    _log_ready(recommendation_index, "built", start)
+            if recommendation_index.changed and recommendation_index.path is not None:
+                recommendation_index.changed = False
+                try:
+                    # Written in a thread: the file is as large as the vectors, and serving goes on meanwhile
+                    await asyncio.to_thread(recommendation_index.save, recommendation_index.snapshot())
+                except Exception:
+                    recommendation_index.changed = True
+                    raise
+        except Exception:
+            logger.exception("Updating the job recommendation index failed")
+        await asyncio.sleep(refresh_seconds)
+
+
+def _log_ready(recommendation_index: JobRecommendationIndex, how: str, start: float) -> None:
+    index = recommendation_index.index
+    log_event(logger, "recommendation_index_ready",
+              f"Recommendation index {how} with {len(index)} published job listings",
+              how=how, documents=len(index), lists=len(index.list_sizes()), memory_bytes=index.memory_bytes(),
+              duration_ms=round((time.perf_counter() - start) * 1000, 3))
@@ -0,0 +1,120 @@
+"""
+Tokenizing for in-process search: lowercase words reduced to their Porter stems, the same analysis SQLite's
+porter tokenizer applies (app.db.full_text), so a keyword matches the same listings in memory and in the database.
+"""
+import re
+from functools import lru_cache
+
+WORD = re.compile(r"\w+")
+# Longer words are indexed as they are, as SQLite's porter tokenizer does
+STEM_LENGTH_MAX = 64
+
+# Porter's algorithm (M. F. Porter, "An algorithm for suffix stripping", 1980) with the later -bli and -logi rules,
+# as SQLite implements it
+STEP2_SUFFIXES = [
+    ("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"), ("bli", "ble"),
+    ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"), ("ization", "ize"), ("ation", "ate"),
+    ("ator", "ate"), ("alism", "al"), ("iveness", "ive"), ("fulness", "ful"), ("ousness", "ous"), ("aliti", "al"),
+    ("iviti", "ive"), ("biliti", "ble"), ("logi", "log"),
+]
+STEP3_SUFFIXES = [
+    ("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"), ("ful", ""), ("ness", ""),
+]
+STEP4_SUFFIXES = [
+    "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent", "ion", "ou", "ism", "ate", "iti",
+    "ous", "ive", "ize",
+]
+
+
+def _is_consonant(word: str, i: int) -> bool:
+    if word[i] in "aeiou":
+        return False
+    if word[i] == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem: str) -> int:
+    """m in [C](VC){m}[V]: the number of vowel-consonant sequences"""
+    pattern = "".join("c" if _is_consonant(stem, i) else "v" for i in range(len(stem)))
+    return len(re.findall("v+c+", pattern))
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _ends_double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _ends_cvc(word: str) -> bool:
+    """Consonant-vowel-consonant, the last consonant not w, x or y (e.g. -hop, not -how)"""
+    return (len(word) >= 3 and _is_consonant(word, len(word) - 3) and not _is_consonant(word, len(word) - 2)
+            and _is_consonant(word, len(word) - 1) and word[-1] not in "wxy")
+
+
+def _replace_suffix(word: str, suffixes: list[tuple[str, str]], min_measure: int) -> str:
+    for suffix, replacement in suffixes:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Porter stem of a lowercase word; words of one or two letters are returned unchanged"""
+    if len(word) <= 2 or len(word) > STEM_LENGTH_MAX:
+        return word
+
+    # Step 1a: plurals
+    if word.endswith("sses") or word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+
+    # Step 1b: -eed, -ed, -ing
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _ends_double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += "e"
+                break
+
+    # Step 1c: y -> i when the stem has a vowel
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+
+    word = _replace_suffix(word, STEP2_SUFFIXES, 0)
+    word = _replace_suffix(word, STEP3_SUFFIXES, 0)
+
+    # Step 4: drop a suffix from a stem of measure above one (-ion only after s or t)
+    for suffix in STEP4_SUFFIXES:
+        if word.endswith(suffix):
+            stem_ = word[:-len(suffix)]
+            if _measure(stem_) > 1 and (suffix != "ion" or stem_.endswith(("s", "t"))):
+                word = stem_
+            break
+
+    # Step 5: final -e and -ll
+    if word.endswith("e"):
+        stem_ = word[:-1]
+        if _measure(stem_) > 1 or (_measure(stem_) == 1 and not _ends_cvc(stem_)):
+            word = stem_
+    if _measure(word) > 1 and _ends_double_consonant(word) and word.endswith("l"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Stemmed lowercase words of text, in order"""
+    return [stem(word) for word in WORD.findall(text.lower())]
@@ -0,0 +1,191 @@
+"""
+Approximate nearest neighbour search over unit vectors by inner product (cosine similarity): an inverted file index
+with flat storage (IVF-flat).
+
+Training clusters the vectors with spherical k-means into about sqrt(n) lists, each with a centroid, and stores
+every vector in the list of its closest centroid, one contiguous float32 matrix per list. A query scores the
+centroids, then only the vectors of the `probes` lists whose centroids scored highest: a few small matrix-vector
+products instead of one over every vector. A vector filed in a list that was not probed is missed, which is the
+approximation; more probes trade speed for recall.
+
+Adding a vector appends it to its list; removing one moves the list's last vector into the gap, so neither leaves
+holes to compact. Centroids stay as trained, and lists grow as vectors are added, so the index is retrained once it
+holds RETRAIN_GROWTH times the vectors it was trained on. Until it holds TRAIN_MIN vectors there is a single list,
+searched exactly.
+"""
+import math
+from typing import Generic, Hashable, Optional, Sequence, TypeVar
+
+import numpy as np
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+
+TRAIN_MIN = 1024
+RETRAIN_GROWTH = 4
+# k-means runs on at most this many vectors per list, drawn at random, then every vector is filed by its centroid
+TRAIN_SAMPLE_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+# Rows scored against the centroids at a time, bounding the (rows, lists) score matrix
+ASSIGN_CHUNK_ROWS = 8192
+
+
+class _InvertedList(Generic[KeyType]):
+    __slots__ = ("vectors", "keys")
+
+    def __init__(self, dimensions: int, keys: Sequence[KeyType] = (), vectors: Optional[np.ndarray] = None):
+        self.keys = list(keys)
+        self.vectors = np.empty((max(len(self.keys), 4), dimensions), dtype=np.float32)
+        if self.keys:
+            self.vectors[:len(self.keys)] = vectors
+
+    def append(self, key: KeyType, vector: np.ndarray) -> int:
+        size = len(self.keys)
+        if size == len(self.vectors):
+            grown = np.empty((size * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:size] = self.vectors
+            self.vectors = grown
+        self.vectors[size] = vector
+        self.keys.append(key)
+        return size
+
+    def pop(self, position: int) -> Optional[KeyType]:
+        """Remove the vector at position by moving the last one into its place; the key moved, if any"""
+        last = len(self.keys) - 1
+        moved = None
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            moved = self.keys[position] = self.keys[last]
+        self.keys.pop()
+        return moved
+
+    def view(self) -> np.ndarray:
+        return self.vectors[:len(self.keys)]
+
+
+class IVFFlatIndex(Generic[KeyType]):
+    def __init__(self, dimensions: int, probes: int):
+        self.dimensions = dimensions
+        self.probes = probes
+        # (lists, dimensions) unit rows; None until trained
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._lists: list[_InvertedList[KeyType]] = [_InvertedList(dimensions)]
+        # Key -> (list number, position in the list)
+        self._positions: dict[KeyType, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._positions
+
+    @property
+    def needs_training(self) -> bool:
+        return len(self) >= TRAIN_MIN and len(self) >= self.trained_size * RETRAIN_GROWTH
+
+    def add(self, keys: Sequence[KeyType], vectors: np.ndarray) -> None:
+        """Add or replace the unit vectors (rows) of keys"""
+        for key, list_number, vector in zip(keys, self._assign(vectors), vectors):
+            self.remove(key)
+            self._positions[key] = (list_number, self._lists[list_number].append(key, vector))
+
+    def remove(self, key: KeyType) -> bool:
+        location = self._positions.pop(key, None)
+        if location is None:
+            return False
+        list_number, position = location
+        moved = self._lists[list_number].pop(position)
+        if moved is not None:
+            self._positions[moved] = location
+        return True
+
+    def search(self, query: np.ndarray, limit: int, probes: Optional[int] = None) -> list[tuple[KeyType, float]]:
+        """The `limit` keys whose vectors have the highest inner product with query, highest first"""
+        probes = min(probes or self.probes, len(self._lists))
+        if self.centroids is None:
+            probed = [0]
+        else:
+            probed = np.argpartition(self.centroids @ query, -probes)[-probes:]
+        lists = [self._lists[list_number] for list_number in probed if self._lists[list_number].keys]
+        if not lists or limit <= 0:
+            return []
+        scores = np.concatenate([inverted_list.view() @ query for inverted_list in lists])
+        limit = min(limit, len(scores))
+        top = np.argpartition(scores, -limit)[-limit:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        # Map positions in the concatenated scores back to (list, position in the list)
+        ends = np.cumsum([len(inverted_list.keys) for inverted_list in lists])
+        owners = np.searchsorted(ends, top, side="right")
+        starts = ends[owners] - [len(lists[owner].keys) for owner in owners]
+        return [(lists[owner].keys[position - start], float(scores[position]))
+                for owner, start, position in zip(owners.tolist(), starts.tolist(), top.tolist())]
+
+    def train(self, seed: int = 0) -> None:
+        """Cluster the vectors into about sqrt(n) lists and file every vector in its closest list"""
+        keys, vectors = self.items()
+        list_count = max(1, round(math.sqrt(len(keys))))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(keys), list_count * TRAIN_SAMPLE_PER_LIST)
+        sample = vectors[rng.choice(len(keys), sample_size, replace=False)] if sample_size < len(keys) else vectors
+        self.centroids = _spherical_kmeans(sample, list_count, rng)
+        self.trained_size = len(keys)
+        # Vectors grouped by list, so that each list is allocated once at its size
+        assignment = _closest(vectors, self.centroids)
+        order = np.argsort(assignment, kind="stable")
+        self.restore(self.centroids, self.trained_size, [keys[position] for position in order], vectors[order],
+                     np.bincount(assignment, minlength=list_count).tolist())
+
+    def items(self) -> tuple[list[KeyType], np.ndarray]:
+        """Every key and its vector, list by list"""
+        keys = [key for inverted_list in self._lists for key in inverted_list.keys]
+        vectors = np.concatenate([inverted_list.view() for inverted_list in self._lists]) if keys else np.empty(
+            (0, self.dimensions), dtype=np.float32)
+        return keys, vectors
+
+    def list_sizes(self) -> list[int]:
+        return [len(inverted_list.keys) for inverted_list in self._lists]
+
+    def restore(self, centroids: Optional[np.ndarray], trained_size: int, keys: Sequence[KeyType],
+                vectors: np.ndarray, list_sizes: Sequence[int]) -> None:
+        """Replace the contents with what items(), list_sizes(), centroids and trained_size gave, without reassigning"""
+        self.centroids, self.trained_size = centroids, trained_size
+        self._lists, self._positions, start = [], {}, 0
+        for list_number, size in enumerate(list_sizes):
+            list_keys = keys[start:start + size]
+            self._lists.append(_InvertedList(self.dimensions, list_keys, vectors[start:start + size]))
+            self._positions.update((key, (list_number, position)) for position, key in enumerate(list_keys))
+            start += size
+
+    def memory_bytes(self) -> int:
+        """Approximate: vector storage and centroids, not the Python key objects"""
+        centroid_bytes = 0 if self.centroids is None else self.centroids.nbytes
+        return centroid_bytes + sum(inverted_list.vectors.nbytes for inverted_list in self._lists)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.intp)
+        return _closest(vectors, self.centroids)
+
+
+def _closest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.argmax(vectors[start:start + ASSIGN_CHUNK_ROWS] @ centroids.T, axis=1)
+                           for start in range(0, len(vectors), ASSIGN_CHUNK_ROWS)] or [np.empty(0, np.intp)])
+
+
+def _spherical_kmeans(vectors: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k unit centroids: each iteration files vectors by inner product and moves centroids to their normalized mean"""
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = _closest(vectors, centroids)
+        # Sum each cluster's vectors as one contiguous run of the vectors sorted by cluster
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=k)
+        filled = np.flatnonzero(counts)
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(vectors[order], (np.cumsum(counts) - counts)[filled])
+        # A list left empty restarts from a random vector
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.divide(sums, norms, out=sums, where=norms > 0)
+    return centroids
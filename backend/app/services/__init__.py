@@ -1,3 +1,4 @@
+from .embedding_service import EmbeddingService
 from .job_listing_application_service import JobListingApplicationService
 from .job_listing_service import JobListingService
 from .organization_service import OrganizationService
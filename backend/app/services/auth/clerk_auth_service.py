@@ -4,11 +4,12 @@ from fastapi import HTTPException, status
 from clerk_backend_api import Clerk
 from clerk_backend_api.security.types import AuthenticateRequestOptions
 from clerk_backend_api.models import User as ClerkUser
-from app.config.settings import settings
+from app.config.settings import get_settings
 
 
 class ClerkAuthService:
     def __init__(self):
+        settings = get_settings()
         self.clerk = Clerk(bearer_auth=settings.CLERK_SECRET_KEY)
         self.authorized_parties = settings.CLERK_AUTHORIZED_PARTIES
 
@@ -0,0 +1,138 @@
+"""
+Embedding pipeline for AI job matching: keeps a stored vector (app.search.embeddings) for every published job listing
+and every resume with an AI summary.
+
+Texts are read in batches of EMBEDDING_BATCH_SIZE with the content hash of their stored vector. Only those whose
+hash differs, because the text or the embedder changed, are embedded (one NumPy batch) and written (one upsert).
+A background task started with the app runs a full pass, then passes over what was updated since the last one: from
+REFRESH_OVERLAP_SECONDS before the newest updated_at read, as a long transaction commits rows stamped when it started
+(see app.search.job_listing_index). Vectors are deleted with their listing or resume.
+
+Texts are embedded in a thread, here and on the request path, so that a model embedder taking a while over a batch
+does not hold up the other requests on the worker.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.logging import log_event
+from app.config.settings import get_settings
+from app.db.unit_of_work import async_unit_of_work
+from app.repositories.embedding_repository import JobListingEmbeddingRepository, UserResumeEmbeddingRepository
+from app.search.embeddings import Embedder, content_hash, decode, encode, get_embedder, job_listing_text
+
+logger = logging.getLogger("app.search")
+
+
+class EmbeddingService:
+    def __init__(self, db: AsyncSession, embedder: Optional[Embedder] = None):
+        self.db = db
+        self.embedder = embedder or get_embedder()
+        settings = get_settings()
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.refresh_overlap = timedelta(seconds=settings.REFRESH_OVERLAP_SECONDS)
+        self.job_listing_embedding_repo = JobListingEmbeddingRepository(db)
+        self.user_resume_embedding_repo = UserResumeEmbeddingRepository(db)
+
+    async def sync_job_listings(self, updated_since: Optional[datetime] = None) -> tuple[int, Optional[datetime]]:
+        """
+        Embed the published listings without a current vector: all of them, or those updated at or after
+        refresh_overlap before updated_since. Returns the number embedded and the newest updated_at read, the
+        updated_since of the next pass.
+        """
+        return await self._sync(self.job_listing_embedding_repo, "job_listing_id",
+                                lambda row: job_listing_text(row.title, row.description), updated_since)
+
+    async def sync_user_resumes(self, updated_since: Optional[datetime] = None) -> tuple[int, Optional[datetime]]:
+        """Embed the resume summaries without a current vector, as sync_job_listings"""
+        return await self._sync(self.user_resume_embedding_repo, "user_id", lambda row: row.ai_summary,
+                                updated_since)
+
+    async def get_user_resume_vector(self, user_id: str) -> Optional[np.ndarray]:
+        """A user's resume summary vector, embedded now when missing or stale; None without a summary"""
+        row = await self.user_resume_embedding_repo.get_text(user_id)
+        if row is None:
+            return None
+        text_hash = content_hash(self.embedder, row.ai_summary)
+        if row.content_hash == text_hash:
+            return decode([row.vector], self.embedder.dimensions)[0]
+        vector = (await asyncio.to_thread(self.embedder.embed, [row.ai_summary]))[0]
+        async with async_unit_of_work(self.db):
+            await self.user_resume_embedding_repo.bulk_upsert(
+                [{"user_id": user_id, "content_hash": text_hash, "vector": encode(vector)}])
+        return vector
+
+    async def embed_user_resumes(self, summaries: Sequence[tuple[str, str]]) -> np.ndarray:
+        """Embed (user id, resume summary) pairs in one batch and store their vectors; returns them in order"""
+        vectors = await asyncio.to_thread(self.embedder.embed, [summary for _, summary in summaries])
+        async with async_unit_of_work(self.db):
+            await self.user_resume_embedding_repo.bulk_upsert(
+                [{"user_id": user_id, "content_hash": content_hash(self.embedder, summary), "vector": encode(vector)}
+                 for (user_id, summary), vector in zip(summaries, vectors)])
+        return vectors
+
+    async def get_job_listing_vector(self, job_listing_id: UUID) -> Optional[np.ndarray]:
+        """A listing's vector, embedded now when missing or stale; None when there is no such listing"""
+        row = await self.job_listing_embedding_repo.get_vector(job_listing_id)
+        if row is None:
+            return None
+        text = job_listing_text(row.title, row.description)
+        text_hash = content_hash(self.embedder, text)
+        if row.content_hash == text_hash:
+            return decode([row.vector], self.embedder.dimensions)[0]
+        vector = (await asyncio.to_thread(self.embedder.embed, [text]))[0]
+        async with async_unit_of_work(self.db):
+            await self.job_listing_embedding_repo.bulk_upsert(
+                [{"job_listing_id": job_listing_id, "content_hash": text_hash, "vector": encode(vector)}])
+        return vector
+
+    async def _sync(self, repo, key_field: str, text_of: Callable[[Any], str],
+                    updated_since: Optional[datetime]) -> tuple[int, Optional[datetime]]:
+        embedded, newest, after = 0, updated_since, None
+        # Rows read again unchanged match their stored hash and are not embedded again
+        read_since = None if updated_since is None else updated_since - self.refresh_overlap
+        while True:
+            rows = await repo.get_texts(after, self.batch_size, read_since)
+            stale = []
+            for row in rows:
+                text = text_of(row)
+                text_hash = content_hash(self.embedder, text)
+                if row.content_hash != text_hash:
+                    stale.append((row[0], text_hash, text))
+                newest = row.updated_at if newest is None or row.updated_at > newest else newest
+            if stale:
+                vectors = await asyncio.to_thread(self.embedder.embed, [text for _, _, text in stale])
+                async with async_unit_of_work(self.db):
+                    await repo.bulk_upsert([{key_field: key, "content_hash": text_hash, "vector": encode(vector)}
+                                            for (key, text_hash, _), vector in zip(stale, vectors)])
+                embedded += len(stale)
+            if len(rows) < self.batch_size:
+                return embedded, newest
+            after = rows[-1][0]
+
+
+async def maintain_embeddings(session_factory: async_sessionmaker, refresh_seconds: float) -> None:
+    """Embed every listing and resume summary, then what changed every refresh_seconds until cancelled"""
+    job_listings_since = user_resumes_since = None
+    while True:
+        try:
+            async with session_factory() as db:
+                start = time.perf_counter()
+                service = EmbeddingService(db)
+                job_listings, job_listings_since = await service.sync_job_listings(job_listings_since)
+                user_resumes, user_resumes_since = await service.sync_user_resumes(user_resumes_since)
+                if job_listings or user_resumes:
+                    log_event(logger, "embeddings_updated",
+                              f"Embedded {job_listings} job listings and {user_resumes} resumes",
+                              job_listings=job_listings, user_resumes=user_resumes,
+                              embedder=service.embedder.fingerprint,
+                              duration_ms=round((time.perf_counter() - start) * 1000, 3))
+        except Exception:
+            logger.exception("Updating the embeddings failed")
+        await asyncio.sleep(refresh_seconds)
@@ -1,36 +1,115 @@
-import uuid
+from typing import Any, AsyncIterator, Literal, Mapping, Optional
+from uuid import UUID
 
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.job_listing_application import JobListingApplication
-from app.repositories.job_listing_application_repository import JobListingApplicationRepository
-from app.schemas.job_listing_application import JobListingApplicationCreate, JobListingApplicationUpdate
+from app.db.unit_of_work import async_unit_of_work
+from app.repositories.job_listing_application_repository import EXPORT_FIELDS, JobListingApplicationRepository
+from app.repositories.pagination import PageParams, PageResult
+from app.schemas.job_listing_application import JobListingApplicationCreate, JobListingApplicationUpdate, \
+    RankedJobListingApplication
+from app.search.application_ranking import ApplicationRanking, ApplicationRankingCache, \
+    get_application_ranking_cache, rank_applications
+from app.search.embeddings import Embedder, content_hash, decode, get_embedder
+from app.services.embedding_service import EmbeddingService
+from app.utils.record_streams import to_csv_chunks, to_ndjson_chunks
 
 
 class JobListingApplicationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, ranking_cache: Optional[ApplicationRankingCache] = None,
+                 embedder: Optional[Embedder] = None):
+        self.db = db
         self.job_listing_application_repo = JobListingApplicationRepository(db)
+        # The worker's cached rankings, dropped for a listing when its applications are written here
+        self.ranking_cache = ranking_cache or get_application_ranking_cache()
+        self.embedder = embedder or get_embedder()
 
-    def create_job_listing_application(self,
-                                       job_listing_application_in: JobListingApplicationCreate) -> JobListingApplication:
-        job_listing_application = JobListingApplication(**job_listing_application_in.dict())
-        job_listing_application.id = str(uuid.uuid4())
-        return self.job_listing_application_repo.create(job_listing_application)
+    async def create_job_listing_application(self,
+                                             job_listing_application_in: JobListingApplicationCreate) -> JobListingApplication:
+        job_listing_application = JobListingApplication(**job_listing_application_in.model_dump())
+        async with async_unit_of_work(self.db):
+            job_listing_application = await self.job_listing_application_repo.create(job_listing_application)
+        self.ranking_cache.invalidate(job_listing_application.job_listing_id)
+        return job_listing_application
 
-    def get_job_listing_application_by_id(self, job_listing_application_id: str) -> JobListingApplication:
-        return self.job_listing_application_repo.get_by_id(job_listing_application_id)
+    async def get_job_listing_application_by_id(self, job_listing_id: UUID,
+                                                user_id: str) -> Optional[JobListingApplication]:
+        return await self.job_listing_application_repo.get_by_id(job_listing_id, user_id)
 
-    def get_all_job_listing_applications(self) -> list[JobListingApplication]:
-        return self.job_listing_application_repo.get_all()
+    async def get_job_listing_applications_page(
+            self, page: PageParams, filters: Optional[Mapping[str, Any]] = None) -> PageResult[JobListingApplication]:
+        return await self.job_listing_application_repo.get_page(page, filters)
 
-    def update_job_listing_application(self, job_listing_application_id: str,
-                                       job_listing_application_in: JobListingApplicationUpdate) -> JobListingApplication:
-        job_listing_application = self.job_listing_application_repo.get_by_id(job_listing_application_id)
-        if not job_listing_application:
-            return None
-        for field, value in job_listing_application_in.dict(exclude_unset=True).items():
-            setattr(job_listing_application, field, value)
-        return self.job_listing_application_repo.update(job_listing_application)
+    def export_job_listing_applications(self, export_format: Literal["csv", "ndjson"],
+                                        job_listing_id: Optional[UUID] = None,
+                                        organization_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Applications of a job listing or organization as CSV or NDJSON text, one chunk per fetched batch"""
+        batches = self.job_listing_application_repo.stream_export(job_listing_id, organization_id)
+        if export_format == "csv":
+            return to_csv_chunks(batches, EXPORT_FIELDS)
+        return to_ndjson_chunks(batches)
+
+    async def update_job_listing_application(
+            self, job_listing_id: UUID, user_id: str,
+            job_listing_application_in: JobListingApplicationUpdate) -> Optional[JobListingApplication]:
+        async with async_unit_of_work(self.db):
+            job_listing_application = await self.job_listing_application_repo.get_by_id(job_listing_id, user_id)
+            if not job_listing_application:
+                return None
+            for field, value in job_listing_application_in.model_dump(exclude_unset=True).items():
+                setattr(job_listing_application, field, value)
+            job_listing_application = await self.job_listing_application_repo.update(job_listing_application)
+        self.ranking_cache.invalidate(job_listing_id)
+        return job_listing_application
+
+    async def delete_job_listing_application(self, job_listing_id: UUID, user_id: str):
+        async with async_unit_of_work(self.db):
+            deleted = await self.job_listing_application_repo.delete(job_listing_id, user_id)
+        if deleted:
+            self.ranking_cache.invalidate(job_listing_id)
 
-    def delete_job_listing_application(self, job_listing_application_id: str):
-        self.job_listing_application_repo.delete(job_listing_application_id)
+    async def rank_job_listing_applications(self, job_listing_id: UUID,
+                                            limit: int) -> Optional[list[RankedJobListingApplication]]:
+        """
+        The `limit` applications of a listing that fit it best, best first, selected from the listing's cached ranking
+        or from one computed now; None when there is no such listing
+        """
+        ranking = self.ranking_cache.get(job_listing_id)
+        if ranking is None:
+            ranking = await self._rank(job_listing_id)
+            if ranking is None:
+                return None
+            self.ranking_cache.put(job_listing_id, ranking)
+        top = ranking.top(limit)
+        job_listing_applications = {
+            job_listing_application.user_id: job_listing_application
+            for job_listing_application in await self.job_listing_application_repo.get_by_user_ids(
+                job_listing_id, [user_id for user_id, _, _ in top])}
+        # An application deleted by another worker since the ranking was cached is skipped
+        return [RankedJobListingApplication(application=job_listing_applications[user_id], score=score,
+                                            similarity=similarity)
+                for user_id, score, similarity in top if user_id in job_listing_applications]
+
+    async def _rank(self, job_listing_id: UUID) -> Optional[ApplicationRanking]:
+        embedding_service = EmbeddingService(self.db, self.embedder)
+        listing_vector = await embedding_service.get_job_listing_vector(job_listing_id)
+        if listing_vector is None:
+            return None
+        rows = await self.job_listing_application_repo.get_ranking_features(job_listing_id)
+        # Stored vectors are decoded in one batch. Stale ones are embedded in one batch in a thread and stored, so the
+        # next ranking of any listing reads them. An applicant without a summary keeps a zero row.
+        resume_vectors = np.zeros((len(rows), self.embedder.dimensions), dtype=np.float32)
+        stored, stale = [], []
+        for position, row in enumerate(rows):
+            if row.ai_summary is not None:
+                current = row.content_hash == content_hash(self.embedder, row.ai_summary)
+                (stored if current else stale).append(position)
+        if stored:
+            resume_vectors[stored] = decode([rows[position].vector for position in stored], self.embedder.dimensions)
+        if stale:
+            resume_vectors[stale] = await embedding_service.embed_user_resumes(
+                [(rows[position].user_id, rows[position].ai_summary) for position in stale])
+        return rank_applications(listing_vector, [row.user_id for row in rows], resume_vectors,
+                                 [row.rating for row in rows], [row.stage for row in rows])
@@ -1,34 +1,309 @@
-import uuid
+import enum
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Mapping, Optional, Sequence
+from uuid import UUID
 
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.config.settings import get_settings
+from app.db.enums import JobListingStatus
 from app.db.models.job_listing import JobListing
-from app.repositories.job_listing_repository import JobListingRepository
-from app.schemas.job_listing import JobListingCreate, JobListingUpdate
+from app.db.types import uuid7
+from app.db.unit_of_work import async_unit_of_work
+from app.repositories.job_listing_repository import WAGE_BANDS, JobListingRepository
+from app.repositories.pagination import PageParams, PageResult
+from app.schemas.job_listing import AutocompleteSuggestions, FacetCount, JobListingBatchUpdate, JobListingCreate, \
+    JobListingFacets, JobListingImportReport, JobListingImportRowError, JobListingUpdate, LocationSuggestion, \
+    OrganizationSuggestion, TitleSuggestion, WageBandCount
+from app.search.facet_cache import FacetCache, facet_key, get_facet_cache
+from app.search.gazetteer import get_gazetteer
+from app.search.homepage_feed import HomepageFeed, get_homepage_feed
+from app.search.job_listing_index import JobListingIndex, get_job_listing_index
+from app.search.recommendation_index import JobRecommendationIndex, get_job_recommendation_index
+from app.services.embedding_service import EmbeddingService
+from app.utils.record_streams import MalformedRecord, Record
+
+# Fields a listing's coordinates are located from
+LOCATION_FIELDS = {"city", "state_abbreviation"}
 
 
 class JobListingService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, search_index: Optional[JobListingIndex] = None,
+                 facet_cache: Optional[FacetCache] = None, homepage_feed: Optional[HomepageFeed] = None,
+                 recommendation_index: Optional[JobRecommendationIndex] = None):
+        self.db = db
         self.job_listing_repo = JobListingRepository(db)
+        # The worker's in-memory keyword index, autocomplete, facet counts, homepage feed and recommendation index,
+        # kept in step with the writes made here
+        self.search_index = search_index or get_job_listing_index()
+        self.facet_cache = facet_cache or get_facet_cache()
+        self.homepage_feed = homepage_feed or get_homepage_feed()
+        self.recommendation_index = recommendation_index or get_job_recommendation_index()
+
+    async def _written(self, job_listings: Sequence[JobListing], was_published: bool = False) -> None:
+        """Apply written listings to the in-memory index and feed; facet counts change when one is or was published"""
+        for job_listing in job_listings:
+            self.search_index.put(job_listing)
+            self.homepage_feed.put(job_listing)
+        await self.recommendation_index.put(job_listings)
+        if was_published or any(job_listing.status == JobListingStatus.PUBLISHED for job_listing in job_listings):
+            self.facet_cache.invalidate()
+
+    async def create_job_listing(self, job_listing_in: JobListingCreate) -> JobListing:
+        job_listing = JobListing(**_posted(_located(job_listing_in.model_dump())))
+        async with async_unit_of_work(self.db):
+            job_listing = await self.job_listing_repo.create(job_listing)
+        await self._written([job_listing])
+        return job_listing
+
+    async def create_job_listings(self, job_listings_in: list[JobListingCreate]) -> list[JobListing]:
+        async with async_unit_of_work(self.db):
+            job_listings = await self.job_listing_repo.bulk_create(
+                [_posted(_located(job_listing_in.model_dump())) for job_listing_in in job_listings_in])
+        await self._written(job_listings)
+        return job_listings
+
+    async def import_job_listings(self, records: AsyncIterator[tuple[int, Record]]) -> JobListingImportReport:
+        """
+        Validate streamed records one at a time and stage the valid ones in chunks, then merge them in one
+        statement. Only a chunk of rows and the capped error list are held in memory. The merge writes in SQL, so
+        the keyword and recommendation indexes pick the imported listings up on their next periodic refresh.
+        """
+        settings = get_settings()
+        report = JobListingImportReport()
+
+        def reject(row_number: int, errors: list[str]):
+            report.failed += 1
+            if len(report.errors) < settings.IMPORT_ERRORS_MAX:
+                report.errors.append(JobListingImportRowError(row=row_number, errors=errors))
+            else:
+                report.errors_truncated = True
+
+        async with async_unit_of_work(self.db):
+            await self.job_listing_repo.create_import_staging()
+            staged, chunk = 0, []
+            async for row_number, record in records:
+                if isinstance(record, MalformedRecord):
+                    reject(row_number, [record.message])
+                    continue
+                try:
+                    job_listing_in = JobListingCreate(**record)
+                except ValidationError as e:
+                    reject(row_number, [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()])
+                    continue
+                chunk.append({"row_number": row_number, "id": uuid7(),
+                              **_posted(_located(job_listing_in.model_dump()))})
+                if len(chunk) == settings.BULK_WRITE_CHUNK_SIZE:
+                    await self.job_listing_repo.copy_to_import_staging(chunk)
+                    staged, chunk = staged + len(chunk), []
+            if chunk:
+                await self.job_listing_repo.copy_to_import_staging(chunk)
+                staged += len(chunk)
+
+            unmerged_count, unmerged_rows = await self.job_listing_repo.merge_import_staging(
+                report_limit=max(settings.IMPORT_ERRORS_MAX - len(report.errors), 0))
+            for row_number, organization_id in unmerged_rows:
+                reject(row_number, [f"organization_id: Organization '{organization_id}' not found"])
+            # Rows beyond the report limit were not fetched but still count as failed
+            report.failed += unmerged_count - len(unmerged_rows)
+            report.errors_truncated = report.errors_truncated or unmerged_count > len(unmerged_rows)
+            report.imported = staged - unmerged_count
+        if report.imported:
+            self.facet_cache.invalidate()
+            self.homepage_feed.invalidate()
+        report.errors.sort(key=lambda error: error.row)
+        return report
 
-    def create_job_listing(self, job_listing_in: JobListingCreate) -> JobListing:
-        job_listing = JobListing(**job_listing_in.dict())
-        job_listing.id = str(uuid.uuid4())
-        return self.job_listing_repo.create(job_listing)
+    async def get_job_listing_by_id(self, job_listing_id: UUID) -> JobListing:
+        return await self.job_listing_repo.get_by_id(job_listing_id)
 
-    def get_job_listing_by_id(self, job_listing_id: str) -> JobListing:
-        return self.job_listing_repo.get_by_id(job_listing_id)
+    async def get_job_listings_page(self, page: PageParams,
+                                    filters: Optional[Mapping[str, Any]] = None) -> PageResult[JobListing]:
+        return await self.job_listing_repo.get_page(page, filters)
 
-    def get_all_job_listings(self) -> list[JobListing]:
-        return self.job_listing_repo.get_all()
+    async def search_job_listings(self, page: PageParams, **criteria) -> PageResult[JobListing]:
+        return await self.job_listing_repo.search(page, **criteria)
 
-    def update_job_listing(self, job_listing_id: str, job_listing_in: JobListingUpdate) -> JobListing:
-        job_listing = self.job_listing_repo.get_by_id(job_listing_id)
-        if not job_listing:
+    async def search_nearby_job_listings(self, page: PageParams, latitude: float, longitude: float,
+                                         radius_miles: float, **criteria) -> PageResult[JobListing]:
+        """Published listings within radius_miles of a point that match the search criteria, nearest first"""
+        places = get_gazetteer().within(latitude, longitude, radius_miles)
+        return await self.job_listing_repo.search_nearby(page, places, **criteria)
+
+    @staticmethod
+    def locate(city: str, state_abbreviation: str) -> Optional[tuple[float, float]]:
+        """(latitude, longitude) of a city in the gazetteer, None when it is not there"""
+        return get_gazetteer().locate(city, state_abbreviation)
+
+    async def instant_search_job_listings(self, keyword: str, limit: int) -> list[JobListing]:
+        """
+        The `limit` published listings best matching keyword, ranked by BM25 in this worker's in-memory index and
+        then loaded by id. Until the index is built, the database full-text search answers instead.
+        """
+        if not self.search_index.ready:
+            return (await self.job_listing_repo.search(PageParams(limit=limit), keyword=keyword)).items
+        return await self._published_hits(self.search_index.search(keyword, limit), self.search_index.remove)
+
+    async def recommend_job_listings(self, user_id: str, limit: int) -> Optional[list[JobListing]]:
+        """
+        The `limit` published listings closest to the user's resume summary by embedding, found in this worker's
+        recommendation index and then loaded by id; None when the user has no summary, and none until the index is
+        ready
+        """
+        embedding_service = EmbeddingService(self.db, self.recommendation_index.embedder)
+        vector = await embedding_service.get_user_resume_vector(user_id)
+        if vector is None:
             return None
-        for field, value in job_listing_in.dict(exclude_unset=True).items():
-            setattr(job_listing, field, value)
-        return self.job_listing_repo.update(job_listing)
+        if not self.recommendation_index.ready or not vector.any():
+            return []
+        return await self._published_hits(self.recommendation_index.search(vector, limit),
+                                          self.recommendation_index.remove)
+
+    async def _published_hits(self, hits: Sequence[tuple[UUID, float]],
+                              remove: Callable[[UUID], None]) -> list[JobListing]:
+        """The listings of in-memory index hits, in the order of the hits; hits no longer published are removed"""
+        job_listings = {job_listing.id: job_listing
+                        for job_listing in await self.job_listing_repo.get_published_by_ids([id for id, _ in hits])}
+        for job_listing_id, _ in hits:
+            if job_listing_id not in job_listings:
+                # Deleted by another worker (or unpublished since the last refresh)
+                remove(job_listing_id)
+        return [job_listings[job_listing_id] for job_listing_id, _ in hits if job_listing_id in job_listings]
+
+    def autocomplete(self, prefix: str, limit: int) -> AutocompleteSuggestions:
+        """
+        The `limit` titles, locations and organizations of published listings most listed among those with a word
+        starting with prefix, from this worker's in-memory tries; none until they are built
+        """
+        if not self.search_index.ready:
+            return AutocompleteSuggestions()
+        titles, locations, organizations = self.search_index.suggest(prefix, limit)
+        return AutocompleteSuggestions(
+            titles=[TitleSuggestion(title=title, count=count) for title, count in titles],
+            locations=[LocationSuggestion(city=city, state_abbreviation=state_abbreviation, count=count)
+                       for city, state_abbreviation, count in locations],
+            organizations=[OrganizationSuggestion(id=organization_id, name=name, count=count)
+                           for organization_id, name, count in organizations],
+        )
+
+    async def get_homepage_feed(self) -> bytes:
+        """
+        JSON body of the featured and newest published listings (JobListingHomepageFeed), served from this worker's
+        precomputed feed; the database is read only when the feed is stale
+        """
+        if self.homepage_feed.stale:
+            self.homepage_feed.load(
+                await self.job_listing_repo.get_newest_published(self.homepage_feed.featured.capacity, featured=True),
+                await self.job_listing_repo.get_newest_published(self.homepage_feed.recent.capacity))
+        return self.homepage_feed.body()
+
+    async def get_job_listing_facets(self, **criteria) -> JobListingFacets:
+        """Facet counts of the published listings matching search criteria, cached by filter set"""
+        key = facet_key(**criteria)
+        facets = self.facet_cache.get(key)
+        if facets is None:
+            facets = _roll_up_facets(await self.job_listing_repo.facet_counts(**criteria))
+            self.facet_cache.put(key, facets)
+        return facets
+
+    async def update_job_listing(self, job_listing_id: UUID, job_listing_in: JobListingUpdate) -> JobListing:
+        async with async_unit_of_work(self.db):
+            job_listing = await self.job_listing_repo.get_by_id(job_listing_id)
+            if not job_listing:
+                return None
+            was_published = job_listing.status == JobListingStatus.PUBLISHED
+            changes = job_listing_in.model_dump(exclude_unset=True)
+            for field, value in changes.items():
+                setattr(job_listing, field, value)
+            if changes.keys() & LOCATION_FIELDS:
+                job_listing.latitude, job_listing.longitude = _coordinates(job_listing.city,
+                                                                           job_listing.state_abbreviation)
+            if job_listing.status == JobListingStatus.PUBLISHED and job_listing.posted_at is None:
+                job_listing.posted_at = datetime.now(timezone.utc)
+            job_listing = await self.job_listing_repo.update(job_listing)
+        await self._written([job_listing], was_published)
+        return job_listing
+
+    async def update_job_listings(self, job_listings_in: list[JobListingBatchUpdate]) -> Optional[list[JobListing]]:
+        """Apply every update or none of them; None when any of the job listings does not exist"""
+        try:
+            async with async_unit_of_work(self.db):
+                rows = [job_listing_in.model_dump(exclude_unset=True) for job_listing_in in job_listings_in]
+                job_listings = await self.job_listing_repo.bulk_update(rows)
+                # A row may change the city or the state alone, so listings are located once both are known; the
+                # reload refreshes the listings already returned
+                moved = {row["id"] for row in rows if row.keys() & LOCATION_FIELDS}
+                located = []
+                for job_listing in job_listings:
+                    if job_listing.id in moved:
+                        latitude, longitude = _coordinates(job_listing.city, job_listing.state_abbreviation)
+                        located.append({"id": job_listing.id, "latitude": latitude, "longitude": longitude})
+                if located:
+                    await self.job_listing_repo.bulk_update(located)
+                posted = [{"id": job_listing.id, "posted_at": datetime.now(timezone.utc)}
+                          for job_listing in job_listings
+                          if job_listing.status == JobListingStatus.PUBLISHED and job_listing.posted_at is None]
+                if posted:
+                    await self.job_listing_repo.bulk_update(posted)
+        except StaleDataError:
+            return None
+        # Whether any of them was published before is not known here
+        await self._written(job_listings, was_published=True)
+        return job_listings
+
+    async def delete_job_listing(self, job_listing_id: UUID):
+        async with async_unit_of_work(self.db):
+            await self.job_listing_repo.delete(job_listing_id)
+        self.search_index.remove(job_listing_id)
+        self.homepage_feed.remove(job_listing_id)
+        self.recommendation_index.remove(job_listing_id)
+        self.facet_cache.invalidate()
+
+
+def _coordinates(city: Optional[str], state_abbreviation: Optional[str]) -> tuple[Optional[float], Optional[float]]:
+    return get_gazetteer().locate(city, state_abbreviation) or (None, None)
+
+
+def _located(values: dict[str, Any]) -> dict[str, Any]:
+    """A new listing's column values with the coordinates of its city and state (None when the gazetteer has none)"""
+    latitude, longitude = _coordinates(values.get("city"), values.get("state_abbreviation"))
+    return {**values, "latitude": latitude, "longitude": longitude}
+
+
+def _posted(values: dict[str, Any]) -> dict[str, Any]:
+    """A new listing's column values, posted now when it is published without a posted_at (the homepage order)"""
+    if values.get("status") == JobListingStatus.PUBLISHED and values.get("posted_at") is None:
+        return {**values, "posted_at": datetime.now(timezone.utc)}
+    return values
+
+
+def _roll_up_facets(rows) -> JobListingFacets:
+    """Sum counts by facet column combination (JobListingRepository.facet_counts) into each facet's counts"""
+    facets = {name: Counter() for name in ("experience_level", "type", "location_requirement", "state_abbreviation")}
+    wage_bands: Counter = Counter()
+    for row in rows:
+        for name, counts in facets.items():
+            counts[getattr(row, name)] += row.count
+        if row.wage_band is not None:
+            wage_bands[row.wage_interval, row.wage_band] += row.count
+
+    def facet_counts(counts: Counter) -> list[FacetCount]:
+        # Listings without a value (e.g. remote ones have no state) count towards the total only
+        return [FacetCount(value=value.value if isinstance(value, enum.Enum) else value, count=count)
+                for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+                if value is not None]
+
+    def wage_band(wage_interval, band: int, count: int) -> WageBandCount:
+        bounds = WAGE_BANDS[wage_interval]
+        return WageBandCount(wage_interval=wage_interval, min_wage=bounds[band - 1] if band else None,
+                             max_wage=bounds[band] - 1 if band < len(bounds) else None, count=count)
 
-    def delete_job_listing(self, job_listing_id: str):
-        self.job_listing_repo.delete(job_listing_id)
+    return JobListingFacets(
+        total=sum(row.count for row in rows),
+        **{name: facet_counts(counts) for name, counts in facets.items()},
+        wage_band=[wage_band(wage_interval, band, count) for (wage_interval, band), count in sorted(
+            wage_bands.items(), key=lambda item: (list(WAGE_BANDS).index(item[0][0]), item[0][1]))],
+    )
@@ -1,34 +1,69 @@
 import uuid
+from typing import Any, Mapping, Optional
 
 from sqlalchemy.orm import Session
 
 from app.db.models.organization import Organization
+from app.db.unit_of_work import unit_of_work
 from app.repositories.organization_repository import OrganizationRepository
+from app.repositories.pagination import PageParams, PageResult
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.search.facet_cache import FacetCache, get_facet_cache
+from app.search.homepage_feed import HomepageFeed, get_homepage_feed
+from app.search.job_listing_index import JobListingIndex, get_job_listing_index
 
 
 class OrganizationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, search_index: Optional[JobListingIndex] = None,
+                 facet_cache: Optional[FacetCache] = None, homepage_feed: Optional[HomepageFeed] = None):
+        self.db = db
         self.organization_repo = OrganizationRepository(db)
+        # The worker's in-memory autocomplete suggests organizations by name, and the homepage feed shows them with
+        # their listings; deleting one deletes its listings
+        self.search_index = search_index or get_job_listing_index()
+        self.facet_cache = facet_cache or get_facet_cache()
+        self.homepage_feed = homepage_feed or get_homepage_feed()
 
     def create_organization(self, organization_in: OrganizationCreate) -> Organization:
-        organization = Organization(**organization_in.dict())
+        organization = Organization(**organization_in.model_dump())
         organization.id = str(uuid.uuid4())
-        return self.organization_repo.create(organization)
+        with unit_of_work(self.db):
+            organization = self.organization_repo.create(organization)
+        self.search_index.put_organization(organization)
+        return organization
+
+    def upsert_organizations(self, organizations_in: list[OrganizationCreate]) -> list[Organization]:
+        """Create or update organizations by id, e.g. when syncing them from the identity provider"""
+        with unit_of_work(self.db):
+            organizations = self.organization_repo.bulk_upsert(
+                [organization_in.model_dump() for organization_in in organizations_in])
+        for organization in organizations:
+            self.search_index.put_organization(organization)
+        self.homepage_feed.invalidate()
+        return organizations
 
     def get_organization_by_id(self, organization_id: str) -> Organization:
         return self.organization_repo.get_by_id(organization_id)
 
-    def get_all_organizations(self) -> list[Organization]:
-        return self.organization_repo.get_all()
+    def get_organizations_page(self, page: PageParams,
+                               filters: Optional[Mapping[str, Any]] = None) -> PageResult[Organization]:
+        return self.organization_repo.get_page(page, filters)
 
     def update_organization(self, organization_id: str, organization_in: OrganizationUpdate) -> Organization:
-        organization = self.organization_repo.get_by_id(organization_id)
-        if not organization:
-            return None
-        for field, value in organization_in.dict(exclude_unset=True).items():
-            setattr(organization, field, value)
-        return self.organization_repo.update(organization)
+        with unit_of_work(self.db):
+            organization = self.organization_repo.get_by_id(organization_id)
+            if not organization:
+                return None
+            for field, value in organization_in.model_dump(exclude_unset=True).items():
+                setattr(organization, field, value)
+            organization = self.organization_repo.update(organization)
+        self.search_index.put_organization(organization)
+        self.homepage_feed.invalidate()
+        return organization
 
     def delete_organization(self, organization_id: str):
-        self.organization_repo.delete(organization_id)
+        with unit_of_work(self.db):
+            self.organization_repo.delete(organization_id)
+        self.search_index.remove_organization(organization_id)
+        self.facet_cache.invalidate()
+        self.homepage_feed.invalidate()
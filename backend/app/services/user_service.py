@@ -1,9 +1,11 @@
 import uuid
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from sqlalchemy.orm import Session
 
 from app.db.models.user import User
+from app.db.unit_of_work import unit_of_work
+from app.repositories.pagination import PageParams, PageResult
 from app.repositories.user_repository import UserRepository
 from app.schemas.user import UserCreate, UserUpdate
 from app.exceptions.auth_exceptions import (
@@ -20,6 +22,7 @@ logger = get_auth_logger("user_service")
 
 class UserService:
     def __init__(self, db: Session):
+        self.db = db
         self.user_repo = UserRepository(db)
 
     def create_user(self, user_in: UserCreate) -> User:
@@ -27,9 +30,10 @@ class UserService:
         try:
             user = User(
                 id=str(uuid.uuid4()),
-                **user_in.dict()
+                **user_in.model_dump()
             )
-            return self.user_repo.create(user)
+            with unit_of_work(self.db):
+                return self.user_repo.create(user)
         except Exception as e:
             log_auth_event(
                 logger,
@@ -41,6 +45,25 @@ class UserService:
             )
             raise
 
+    def upsert_users(self, users_in: list[UserCreate]) -> list[User]:
+        """Create or update users by Clerk ID in one statement per chunk, with error handling"""
+        try:
+            with unit_of_work(self.db):
+                # The generated id is only used for new users; existing users keep theirs
+                return self.user_repo.bulk_upsert(
+                    [{"id": str(uuid.uuid4()), **user_in.model_dump()} for user_in in users_in],
+                    conflict_fields=["clerk_id"])
+        except Exception as e:
+            log_auth_event(
+                logger,
+                "user_service_upsert_failed",
+                f"User service failed to upsert users",
+                level="ERROR",
+                user_count=len(users_in),
+                error_details={"service_error": str(e)}
+            )
+            raise
+
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID with error handling"""
         try:
@@ -71,15 +94,15 @@ class UserService:
             )
             raise
 
-    def get_all_users(self) -> list[User]:
-        """Get all users with error handling"""
+    def get_users_page(self, page: PageParams, filters: Optional[Mapping[str, Any]] = None) -> PageResult[User]:
+        """Get one page of users with error handling"""
         try:
-            return self.user_repo.get_all()
+            return self.user_repo.get_page(page, filters)
         except Exception as e:
             log_auth_event(
                 logger,
                 "user_service_list_failed",
-                f"User service failed to get all users",
+                f"User service failed to list users",
                 level="ERROR",
                 error_details={"service_error": str(e)}
             )
@@ -88,24 +111,25 @@ class UserService:
     def update_user(self, user_id: str, user_in: UserUpdate) -> Optional[User]:
         """Update user with comprehensive error handling"""
         try:
-            user = self.user_repo.get_by_id(user_id)
-            if not user:
-                log_auth_event(
-                    logger,
-                    "user_service_update_failed",
-                    f"Cannot update user - user not found",
-                    level="WARNING",
-                    user_id=user_id
-                )
-                raise UserNotFoundError(
-                    f"User not found for update",
-                    details={"user_id": user_id}
-                )
-            
-            for field, value in user_in.dict(exclude_unset=True).items():
-                setattr(user, field, value)
-            
-            return self.user_repo.update(user)
+            with unit_of_work(self.db):
+                user = self.user_repo.get_by_id(user_id)
+                if not user:
+                    log_auth_event(
+                        logger,
+                        "user_service_update_failed",
+                        f"Cannot update user - user not found",
+                        level="WARNING",
+                        user_id=user_id
+                    )
+                    raise UserNotFoundError(
+                        f"User not found for update",
+                        details={"user_id": user_id}
+                    )
+                
+                for field, value in user_in.model_dump(exclude_unset=True).items():
+                    setattr(user, field, value)
+                
+                return self.user_repo.update(user)
             
         except UserNotFoundError:
             # Re-raise user not found errors
@@ -124,7 +148,8 @@ class UserService:
     def delete_user(self, user_id: str) -> bool:
         """Delete user with error handling"""
         try:
-            return self.user_repo.delete(user_id)
+            with unit_of_work(self.db):
+                return self.user_repo.delete(user_id)
         except Exception as e:
             log_auth_event(
                 logger,
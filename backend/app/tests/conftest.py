@@ -0,0 +1,50 @@
+"""
+Fixtures shared by the tests that run services against a database.
+
+Async tests are marked `pytest.mark.anyio` and run on asyncio; they await each step and assert on it in place.
+"""
+from typing import AsyncIterator, Callable
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement
+from app.db.models import Organization
+from app.schemas.job_listing import JobListingCreate
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_engine(tmp_path) -> AsyncIterator[AsyncEngine]:
+    """An aiosqlite engine on a new database file with every table created"""
+    test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield test_engine
+    await test_engine.dispose()
+
+
+@pytest.fixture
+async def db(async_engine) -> AsyncIterator[AsyncSession]:
+    """A session on async_engine, with the organization "org_1" that listing() posts to"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        session.add(Organization(id="org_1", name="Org"))
+        await session.commit()
+        yield session
+
+
+@pytest.fixture
+def listing() -> Callable[..., JobListingCreate]:
+    """Builds a published, remote, full-time senior listing of org_1; keyword arguments replace any field"""
+    def listing(title: str, **fields) -> JobListingCreate:
+        return JobListingCreate(**{
+            "organization_id": "org_1", "title": title, "description": "...",
+            "location_requirement": LocationRequirement.REMOTE, "type": JobListingType.FULL_TIME,
+            "experience_level": ExperienceLevel.SENIOR, "status": JobListingStatus.PUBLISHED, **fields})
+
+    return listing
@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import io
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config.settings import get_settings
+from app.db.base import Base
+from app.db.enums import ApplicationStage, ExperienceLevel, JobListingType, LocationRequirement
+from app.db.models import JobListing, JobListingApplication, Organization, User
+from app.services.job_listing_application_service import JobListingApplicationService
+
+
+def export(tmp_path, export_format, organization_id=None, first_listing_only=False):
+    async def run():
+        test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/export.db")
+        async with test_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(test_engine, expire_on_commit=False) as db:
+            db.add_all([Organization(id="org_1", name="Org"), Organization(id="org_2", name="Other")])
+            listings = [
+                JobListing(organization_id=owner_id, title=title, description="...",
+                           location_requirement=LocationRequirement.REMOTE, experience_level=ExperienceLevel.SENIOR,
+                           type=JobListingType.FULL_TIME)
+                for owner_id, title in [("org_1", "Engineer"), ("org_1", "Designer"), ("org_2", "Other")]
+            ]
+            db.add_all(listings)
+            db.add_all([User(id=f"user_{index}", clerk_id=f"clerk_{index}", email=f"user{index}@example.com",
+                             image_url="avatar.png") for index in range(5)])
+            await db.flush()
+            db.add_all([
+                JobListingApplication(job_listing_id=listing.id, user_id=f"user_{index}", cover_letter='Hi, "me"',
+                                      stage=ApplicationStage.INTERESTED)
+                for listing in listings for index in range(5)
+            ])
+            await db.commit()
+
+            service = JobListingApplicationService(db)
+            job_listing_id = listings[0].id if first_listing_only else None
+            chunks = [chunk async for chunk in service.export_job_listing_applications(
+                export_format, job_listing_id, organization_id)]
+        await test_engine.dispose()
+        return chunks
+
+    return asyncio.run(run())
+
+
+def test_csv_export_streams_one_chunk_per_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "EXPORT_BATCH_SIZE", 4)
+    chunks = export(tmp_path, "csv", organization_id="org_1")
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(chunks) == 3
+    assert len(rows) == 10
+    assert {row["job_listing_title"] for row in rows} == {"Engineer", "Designer"}
+    assert rows[0]["stage"] == "interested" and rows[0]["cover_letter"] == 'Hi, "me"'
+    assert rows[0]["user_email"].endswith("@example.com")
+
+
+def test_ndjson_export_filters_by_job_listing(tmp_path):
+    chunks = export(tmp_path, "ndjson", first_listing_only=True)
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(rows) == 5
+    assert {row["job_listing_title"] for row in rows} == {"Engineer"}
+    assert rows[0]["rating"] is None
+
+
+def test_csv_export_without_matches_is_just_the_header(tmp_path):
+    chunks = export(tmp_path, "csv", organization_id="org_missing")
+    assert "".join(chunks).splitlines() == [
+        "job_listing_id,job_listing_title,organization_id,user_id,user_email,user_first_name,user_last_name,stage,"
+        "rating,cover_letter,created_at,updated_at"]
@@ -0,0 +1,103 @@
+import threading
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+
+from app.db.enums import ApplicationStage, ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement
+from app.db.models import JobListing, User, UserResume, UserResumeEmbedding
+from app.schemas.job_listing_application import JobListingApplicationCreate, JobListingApplicationUpdate
+from app.search.application_ranking import RATING_MAX, RATING_WEIGHT, SIMILARITY_WEIGHT, STAGE_SCORES, UNRATED, \
+    ApplicationRankingCache, rank_applications
+from app.search.embeddings import HashedTermEmbedder, normalize
+from app.services.job_listing_application_service import JobListingApplicationService
+
+
+def test_rank_applications_matches_scoring_one_application_at_a_time():
+    rng = np.random.default_rng(7)
+    vectors = normalize(rng.normal(size=(500, 32)).astype(np.float32))
+    vectors[::7] = 0  # applicants without a summary
+    listing_vector = normalize(rng.normal(size=(1, 32)).astype(np.float32))[0]
+    user_ids = [f"user_{number}" for number in range(500)]
+    ratings = [None if number % 3 == 0 else int(rating) for number, rating in enumerate(rng.integers(1, 6, 500))]
+    stages = [list(ApplicationStage)[stage] for stage in rng.integers(0, len(ApplicationStage), 500)]
+
+    ranking = rank_applications(listing_vector, user_ids, vectors, ratings, stages)
+    expected = [SIMILARITY_WEIGHT * float(vector @ listing_vector)
+                + RATING_WEIGHT * (UNRATED if rating is None else rating / RATING_MAX) + STAGE_SCORES[stage]
+                for vector, rating, stage in zip(vectors, ratings, stages)]
+    top = ranking.top(20)
+    assert [user_id for user_id, _, _ in top] == [user_ids[position] for position in np.argsort(expected)[::-1][:20]]
+    assert np.allclose([score for _, score, _ in top], sorted(expected, reverse=True)[:20], atol=1e-5)
+    assert len(ranking.top(1000)) == 500 and rank_applications(listing_vector, [], vectors[:0], [], []).top(5) == []
+
+
+@pytest.mark.anyio
+async def test_ranked_applications_are_cached_until_an_application_arrives(db, monkeypatch):
+    embedded = []
+    embed = HashedTermEmbedder.embed
+
+    def recording_embed(embedder, texts):
+        embedded.append((threading.current_thread(), list(texts)))
+        return embed(embedder, texts)
+
+    monkeypatch.setattr(HashedTermEmbedder, "embed", recording_embed)
+    summaries = {"user_1": "Python developer who builds data pipelines", "user_2": "Pastry chef who bakes bread",
+                 "user_3": "Python developer", "user_4": None, "user_5": "Python data pipelines engineer"}
+    job_listing_id = uuid.uuid4()
+    db.add(JobListing(id=job_listing_id, organization_id="org_1", title="Data engineer",
+                      description="Build data pipelines in Python", status=JobListingStatus.PUBLISHED,
+                      location_requirement=LocationRequirement.REMOTE, type=JobListingType.FULL_TIME,
+                      experience_level=ExperienceLevel.SENIOR))
+    db.add_all([User(id=user_id, clerk_id=f"clerk_{user_id}", image_url="", email=f"{user_id}@example.com",
+                     resume=UserResume(resume_file_url="", resume_file_key="", ai_summary=summary))
+                for user_id, summary in summaries.items()])
+    await db.commit()
+    service = JobListingApplicationService(db, ApplicationRankingCache(10, 60), HashedTermEmbedder(64))
+
+    async def ranked(limit=10):
+        return [(ranked_application.application.user_id, round(ranked_application.similarity, 3))
+                for ranked_application in await service.rank_job_listing_applications(job_listing_id, limit)]
+
+    def user_ids(ranking):
+        return [user_id for user_id, _ in ranking]
+
+    for user_id, rating, stage in [("user_1", None, ApplicationStage.APPLIED),
+                                   ("user_2", 5, ApplicationStage.INTERVIEWED),
+                                   ("user_3", None, ApplicationStage.DENIED),
+                                   ("user_4", None, ApplicationStage.APPLIED)]:
+        await service.create_job_listing_application(JobListingApplicationCreate(
+            job_listing_id=job_listing_id, user_id=user_id, rating=rating, stage=stage))
+    ranking = await ranked()
+    similarities = dict(ranking)
+    # The closest summary ranks first, an interviewed and top rated applicant above an unrated one with no summary,
+    # and a denied applicant last whatever their summary
+    assert user_ids(ranking) == ["user_1", "user_2", "user_4", "user_3"]
+    assert similarities["user_1"] > similarities["user_3"] > similarities["user_2"] == 0 == similarities["user_4"]
+    assert user_ids(await ranked(limit=1)) == ["user_1"]
+    # Summaries without a stored vector are embedded off the event loop and stored
+    assert embedded and all(thread is not threading.current_thread() for thread, _ in embedded)
+    assert await db.scalar(select(func.count()).select_from(UserResumeEmbedding)) == 3
+
+    # Served from the cache: a changed summary is not read again
+    resume = await db.get(UserResume, "user_2")
+    resume.ai_summary = "Python developer who builds data pipelines"
+    await db.commit()
+    assert await ranked() == ranking
+    await service.create_job_listing_application(JobListingApplicationCreate(
+        job_listing_id=job_listing_id, user_id="user_5"))
+    ranking = await ranked()
+    assert user_ids(ranking) == ["user_2", "user_1", "user_5", "user_4", "user_3"]
+    assert dict(ranking)["user_2"] == similarities["user_1"]
+
+    # Moving an applicant to another stage, or withdrawing an application, drops the cached ranking too; the
+    # summaries embedded for the last one are read back, not embedded again
+    await service.update_job_listing_application(job_listing_id, "user_3",
+                                                 JobListingApplicationUpdate(stage=ApplicationStage.HIRED))
+    embedded.clear()
+    assert user_ids(await ranked()) == ["user_2", "user_1", "user_5", "user_3", "user_4"]
+    assert embedded == []
+    await service.delete_job_listing_application(job_listing_id, "user_2")
+    assert user_ids(await ranked()) == ["user_1", "user_5", "user_3", "user_4"]
+    assert await service.rank_job_listing_applications(uuid.uuid4(), 10) is None
@@ -0,0 +1,166 @@
+import random
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.enums import JobListingStatus, LocationRequirement
+from app.db.models import JobListing
+from app.schemas.job_listing import JobListingUpdate
+from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.search.autocomplete import Autocomplete
+from app.search.job_listing_index import JobListingIndex
+from app.search.prefix_trie import PrefixTrie
+from app.services.job_listing_service import JobListingService
+from app.services.organization_service import OrganizationService
+
+
+def test_trie_matches_brute_force_and_stays_compressed():
+    random.seed(3)
+
+    def random_keys():
+        return ["".join(random.choices("ab c", k=random.randint(1, 6))) for _ in range(random.randint(1, 3))]
+
+    for top_k in (1, 3):
+        trie, weights, keys = PrefixTrie(top_k), {}, {}
+        entries = [(value, random_keys(), random.randint(0, 9)) for value in range(20)]
+        trie.load(entries)
+        for value, value_keys, weight in entries:
+            keys[value], weights[value] = value_keys, weight
+        for _ in range(1500):
+            value = random.randrange(30)
+            if random.random() < 0.3:
+                trie.remove(value)
+                weights.pop(value, None)
+            else:
+                # Same keys with a new weight, or new keys
+                if value not in keys or random.random() < 0.5:
+                    keys[value] = random_keys()
+                weights[value] = random.randint(0, 9)
+                trie.put(value, keys[value], weights[value])
+            for prefix in ("", "a", "ab", "b ", "c", "aba"):
+                expected = sorted((-weight, value) for value, weight in weights.items()
+                                  if any(key.startswith(prefix) for key in keys[value]))[:top_k]
+                assert trie.top(prefix, top_k) == [(value, -weight) for weight, value in expected]
+
+    nodes = [trie._root]
+    while nodes:
+        node = nodes.pop()
+        children = list(node.children.values())
+        assert node is trie._root or node.values or len(children) > 1
+        nodes.extend(children)
+
+
+def test_autocomplete_counts_listings_under_every_word():
+    autocomplete = Autocomplete(top_k=3)
+    autocomplete.put_organization("org_1", "Acme Robotics")
+    autocomplete.put_listing(1, "Senior Backend Engineer", "Austin", "TX", "org_1")
+    autocomplete.finish_loading()
+    autocomplete.put_listing(2, "senior backend engineer!", "austin", "tx", "org_1")
+    autocomplete.put_listing(3, "Backend Developer", "Boston", "MA", "org_2")
+    autocomplete.put_organization("org_2", "Backend Labs")
+
+    assert autocomplete.suggest("back", 5) == (
+        [("Senior Backend Engineer", 2), ("Backend Developer", 1)], [],
+        [("org_2", "Backend Labs", 1)])
+    assert autocomplete.suggest("  ROBO", 5) == ([], [], [("org_1", "Acme Robotics", 2)])
+    assert autocomplete.suggest("tx", 5)[1] == [("Austin", "TX", 2)]
+    assert autocomplete.suggest("b", 1)[1] == [("Boston", "MA", 1)]
+
+    # Moving a listing recounts it; the last listing of a title takes the title with it
+    autocomplete.put_listing(1, "Senior Backend Engineer", "Boston", "MA", "org_1")
+    autocomplete.remove_listing(3)
+    assert autocomplete.suggest("b", 5)[:2] == ([("Senior Backend Engineer", 2)], [("Boston", "MA", 1)])
+    assert autocomplete.suggest("a", 5)[1:] == ([("Austin", "TX", 1)], [("org_1", "Acme Robotics", 2)])
+    assert autocomplete.suggest("labs", 5)[2] == [("org_2", "Backend Labs", 0)]
+    assert autocomplete.suggest("!", 5) == ([], [], [])
+
+
+@pytest.mark.anyio
+async def test_suggestions_follow_listing_and_organization_writes(async_engine, db, listing):
+    def located(title, city, **fields):
+        return listing(title, city=city, state_abbreviation="TX", location_requirement=LocationRequirement.IN_OFFICE,
+                       **fields)
+
+    search_index = JobListingIndex(autocomplete_top_k=5)
+    service = JobListingService(db, search_index)
+    # Organization writes go through a synchronous session, as the organization endpoints' do
+    sync_engine = create_engine(async_engine.url.set(drivername="sqlite"))
+    with Session(sync_engine) as sync_db:
+        organizations = OrganizationService(sync_db, search_index)
+        acme = organizations.upsert_organizations([OrganizationCreate(id="org_1", name="Acme")])[0]
+        sync_db.add(JobListing(**located("Data Engineer", "Austin").model_dump()))
+        sync_db.commit()
+        suggestions = service.autocomplete("data", 5)
+        assert suggestions.titles == suggestions.organizations == []
+        await search_index.build(db)
+        assert [(title.title, title.count) for title in service.autocomplete("data", 5).titles] == [
+            ("Data Engineer", 1)]
+
+        data_scientist = await service.create_job_listing(located("Data Scientist", "Dallas"))
+        await service.create_job_listing(located("Data Scientist", "Austin"))
+        await service.create_job_listing(located("Data Clerk", "Austin", status=JobListingStatus.DRAFT))
+        assert [(title.title, title.count) for title in service.autocomplete("data", 5).titles] == [
+            ("Data Scientist", 2), ("Data Engineer", 1)]
+        assert [(location.city, location.count) for location in service.autocomplete("a", 5).locations] == [
+            ("Austin", 2)]
+
+        await service.update_job_listing(data_scientist.id, JobListingUpdate(title="Data Analyst"))
+        assert [(title.title, title.count) for title in service.autocomplete("data", 5).titles] == [
+            ("Data Analyst", 1), ("Data Engineer", 1), ("Data Scientist", 1)]
+
+        globex_id = organizations.create_organization(OrganizationCreate(id="org_2", name="Globex Data")).id
+        organizations.update_organization(acme.id, OrganizationUpdate(name="Acme Data"))
+        assert [(organization.name, organization.count)
+                for organization in service.autocomplete("data", 5).organizations] == [
+            ("Acme Data", 3), ("Globex Data", 0)]
+
+        # Deleting an organization deletes its listings
+        organizations.delete_organization(acme.id)
+        suggestions = service.autocomplete("data", 5)
+        assert suggestions.titles == []
+        assert [(organization.id, organization.count) for organization in suggestions.organizations] == [
+            (globex_id, 0)]
+    sync_engine.dispose()
+
+
+def test_organization_writes_from_other_threads_do_not_break_searches():
+    # Organization endpoints write from FastAPI's threadpool while searches run on the event loop
+    search_index = JobListingIndex(autocomplete_top_k=5)
+    search_index.ready = True
+    organization_ids = [f"org_{number}" for number in range(4)]
+
+    def listings(organization_id):
+        return [JobListing(id=uuid.uuid4(), organization_id=organization_id, title=f"Data engineer {number}",
+                           description="Build data pipelines", status=JobListingStatus.PUBLISHED)
+                for number in range(600)]
+
+    for organization_id in organization_ids:
+        for job_listing in listings(organization_id):
+            search_index.put(job_listing)
+    failures = []
+
+    def write():
+        try:
+            # Each organization removed takes its 600 listings, so tombstones pile up and the index compacts
+            for organization_id in organization_ids * 3:
+                search_index.remove_organization(organization_id)
+                for job_listing in listings(organization_id):
+                    search_index.put(job_listing)
+        except Exception as error:
+            failures.append(error)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        try:
+            hits = search_index.search("data pipelines", 50)
+            assert all(job_listing_id is not None for job_listing_id, _ in hits)
+            search_index.suggest("dat", 5)
+        except Exception as error:
+            failures.append(error)
+            break
+    writer.join()
+    assert failures == [] and len(search_index.index) == 2400
@@ -0,0 +1,38 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core import bootstrap
+from app.db import session
+
+
+def test_startup_phase_records_duration_on_failure():
+    with pytest.raises(RuntimeError):
+        with bootstrap.startup_phase("failing_phase"):
+            raise RuntimeError("boom")
+    assert bootstrap.get_startup_timings()["failing_phase"] >= 0
+
+
+def test_database_is_built_once_and_rebuilt_after_dispose():
+    database = session.get_database()
+    assert session.get_database() is database
+    assert session.engine is database.engine
+    asyncio.run(session.dispose_database())
+    assert session.get_database() is not database
+
+
+def test_bootstrap_imports_without_settings():
+    # Settings are read on first use, not at import time
+    env = {name: value for name, value in os.environ.items()
+           if name not in ("DATABASE_URL", "CLERK_SECRET_KEY", "CLERK_PUBLISHABLE_KEY", "CLERK_WEBHOOK_SECRET")}
+    subprocess.run([sys.executable, "-c", "import app.core.bootstrap"], env=env, check=True)
+
+
+def test_bootstrap_leaves_the_application_modules_to_the_imports_phase():
+    # main times the "imports" phase after importing bootstrap; anything bootstrap imports escapes it
+    code = ("import sys, app.core.bootstrap; "
+            "assert not [name for name in sys.modules if name.startswith(('app.db', 'app.search', 'app.services'))]")
+    subprocess.run([sys.executable, "-c", code], check=True)
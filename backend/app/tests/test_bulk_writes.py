@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.config.settings import get_settings
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement
+from app.db.models import Organization, User
+from app.repositories.job_listing_repository import JobListingRepository
+from app.repositories.organization_repository import OrganizationRepository
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    test_engine = create_engine(f"sqlite:///{tmp_path}/bulk.db")
+    Base.metadata.create_all(test_engine)
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(test_engine) as session:
+        session.info["statements"] = statements
+        yield session
+    test_engine.dispose()
+
+
+def test_bulk_create_sends_one_statement_per_chunk(db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "BULK_WRITE_CHUNK_SIZE", 100)
+    organizations = OrganizationRepository(db).bulk_create(
+        [{"id": f"org_{index}", "name": f"Org {index}"} for index in range(250)])
+    assert len(organizations) == 250
+    assert len(db.info["statements"]) == 3
+    assert db.query(Organization).count() == 250
+
+
+def test_bulk_upsert_updates_existing_rows_and_keeps_their_primary_key(db):
+    repo = UserRepository(db)
+    repo.bulk_upsert([{"id": "user_1", "clerk_id": "clerk_1", "email": "old@example.com", "image_url": "a.png"}],
+                     conflict_fields=["clerk_id"])
+    users = repo.bulk_upsert([
+        {"id": "user_2", "clerk_id": "clerk_1", "email": "new@example.com", "image_url": "b.png"},
+        {"id": "user_3", "clerk_id": "clerk_3", "email": "third@example.com", "image_url": "c.png"},
+    ], conflict_fields=["clerk_id"])
+    assert sorted((user.id, user.email) for user in users) == [
+        ("user_1", "new@example.com"), ("user_3", "third@example.com")]
+    assert db.query(User).count() == 2
+
+
+def test_bulk_upsert_rejects_rows_with_different_fields(db):
+    with pytest.raises(ValueError):
+        OrganizationRepository(db).bulk_upsert([{"id": "org_1", "name": "Org"}, {"id": "org_2"}])
+
+
+def test_bulk_update_changes_rows_by_primary_key(db):
+    repo = OrganizationRepository(db)
+    repo.bulk_create([{"id": f"org_{index}", "name": "Org"} for index in range(3)])
+    organizations = repo.bulk_update([{"id": "org_0", "name": "First"}, {"id": "org_2", "image_url": "logo.png"}])
+    assert sorted((organization.id, organization.name, organization.image_url) for organization in organizations) == [
+        ("org_0", "First", None), ("org_2", "Org", "logo.png")]
+    with pytest.raises(StaleDataError):
+        repo.bulk_update([{"id": "org_1", "name": "Second"}, {"id": "missing", "name": "Nobody"}])
+
+
+@pytest.mark.anyio
+async def test_async_bulk_create_eager_loads_relationships(async_engine):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        session.add(Organization(id="org_1", name="Org"))
+        await session.flush()
+        job_listings = await JobListingRepository(session).bulk_create([
+            {"organization_id": "org_1", "title": f"Job {index}", "description": "...",
+             "location_requirement": LocationRequirement.REMOTE, "experience_level": ExperienceLevel.SENIOR,
+             "type": JobListingType.FULL_TIME}
+            for index in range(3)
+        ])
+    assert len({job_listing.id for job_listing in job_listings}) == 3
+    assert all(job_listing.status == JobListingStatus.DRAFT for job_listing in job_listings)
+    # Loaded by the RETURNING statement itself, so serializing after the session closed does no IO
+    assert all(job_listing.organization.name == "Org" for job_listing in job_listings)
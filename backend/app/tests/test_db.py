@@ -18,5 +18,13 @@ def test_db_connection():
         print(f"❌ Database connection failed: {e}")
 
 
+def test_async_database_url():
+    from app.db.session import get_async_database_url
+
+    assert get_async_database_url("sqlite:///./job-board.db") == "sqlite+aiosqlite:///./job-board.db"
+    assert get_async_database_url("postgresql://user:pw@db:5432/jobs") == "postgresql+asyncpg://user:pw@db:5432/jobs"
+    assert get_async_database_url("postgresql+psycopg2://user:pw@db/jobs") == "postgresql+asyncpg://user:pw@db/jobs"
+
+
 if __name__ == "__main__":
     test_db_connection()
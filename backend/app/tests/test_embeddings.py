@@ -0,0 +1,125 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing, JobListingEmbedding, User, UserResume
+from app.schemas.job_listing import JobListingUpdate
+from app.search.embeddings import HashedTermEmbedder, decode, encode, load_embedder
+from app.search.facet_cache import FacetCache
+from app.search.homepage_feed import HomepageFeed
+from app.search.job_listing_index import JobListingIndex
+from app.services.embedding_service import EmbeddingService
+from app.services.job_listing_service import JobListingService
+
+
+def test_hashed_term_embeddings_are_deterministic_unit_vectors_that_score_alike_texts_higher():
+    embedder = load_embedder("hashed_terms", 256)
+    texts = ["Senior Python developer building data pipelines",
+             "Python developers: build data pipelines (senior role)",
+             "Pastry chef for a busy downtown bakery",
+             "The and of"]
+    vectors = embedder.embed(texts)
+    assert vectors.shape == (4, 256) and vectors.dtype == np.float32
+    assert np.array_equal(vectors, HashedTermEmbedder(256).embed(texts))
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1) and not vectors[3].any()
+    similarities = vectors @ vectors[0]
+    assert similarities[1] > 0.5 > similarities[2]
+    # One batch embeds as the texts would one at a time
+    assert np.allclose(vectors[2], embedder.embed([texts[2]])[0])
+    stored = decode([encode(vector) for vector in vectors], 256)
+    assert len(encode(vectors[0])) == 512 and np.allclose(stored, vectors, atol=1e-3)
+
+
+class CountingEmbedder(HashedTermEmbedder):
+    """Records the texts it embeds and the threads it embeds them in"""
+
+    def __init__(self, dimensions: int):
+        super().__init__(dimensions)
+        self.texts = []
+        self.threads = set()
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        self.threads.add(threading.current_thread())
+        return super().embed(texts)
+
+
+@pytest.mark.anyio
+async def test_sync_embeds_only_changed_texts(async_engine, db, listing):
+    def described(title, **fields):
+        return listing(title, description=f"{title} wanted", **fields)
+
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    embedder = CountingEmbedder(64)
+    db.add_all([User(id="user_1", clerk_id="clerk_1", image_url="", email="one@example.com",
+                     resume=UserResume(resume_file_url="", resume_file_key="", ai_summary="Backend engineer, Python")),
+                User(id="user_2", clerk_id="clerk_2", image_url="", email="two@example.com")])
+    await db.commit()
+    job_listing_service = JobListingService(db, JobListingIndex(), FacetCache(10, 60), HomepageFeed(1, 1, 60))
+    embedding_service = EmbeddingService(db, embedder)
+    embedding_service.batch_size = 2
+    created = await job_listing_service.create_job_listings(
+        [described("Python developer"), described("Chef"), described("Draft", status=JobListingStatus.DRAFT),
+         described("Welder")])
+    titles = {job_listing.title: job_listing for job_listing in created}
+
+    embedded, updated_since = await embedding_service.sync_job_listings()
+    assert embedded == 3 and updated_since is not None
+    assert (await embedding_service.sync_user_resumes())[0] == 1
+    assert embedder.texts == ["Python developer\nPython developer wanted", "Chef\nChef wanted",
+                              "Welder\nWelder wanted", "Backend engineer, Python"]
+
+    embedder.texts.clear()
+    await job_listing_service.update_job_listing(titles["Chef"].id, JobListingUpdate(title="Head chef"))
+    # Republishing with the same text keeps the stored vector
+    await job_listing_service.update_job_listing(titles["Welder"].id,
+                                                 JobListingUpdate(status=JobListingStatus.DELISTED))
+    await job_listing_service.update_job_listing(titles["Welder"].id,
+                                                 JobListingUpdate(status=JobListingStatus.PUBLISHED))
+    assert (await embedding_service.sync_job_listings())[0] == 1
+    assert embedder.texts == ["Head chef\nChef wanted"]
+    assert (await embedding_service.sync_job_listings(updated_since))[0] == 0
+
+    # Resume vectors are current: read, not embedded
+    embedder.texts.clear()
+    vector = await embedding_service.get_user_resume_vector("user_1")
+    statements.clear()
+    assert np.allclose(await embedding_service.get_user_resume_vector("user_1"), vector, atol=1e-3)
+    assert len(statements) == 1
+    assert await embedding_service.get_user_resume_vector("user_2") is None
+    assert embedder.texts == []
+
+    # A resume edited since is embedded on the request path, in a thread like every batch above
+    resume = await db.get(UserResume, "user_1")
+    resume.ai_summary = "Backend engineer, Go"
+    await db.commit()
+    assert await embedding_service.get_user_resume_vector("user_1") is not None
+    assert embedder.texts == ["Backend engineer, Go"]
+    assert embedder.threads and threading.current_thread() not in embedder.threads
+
+    # Deleting a listing deletes its vector
+    await job_listing_service.delete_job_listing(titles["Python developer"].id)
+    assert await db.scalar(select(func.count()).select_from(JobListingEmbedding)) == 2
+
+
+@pytest.mark.anyio
+async def test_sync_embeds_rows_committed_after_newer_ones(db, listing):
+    embedder = CountingEmbedder(64)
+    embedding_service = EmbeddingService(db, embedder)
+    await JobListingService(db, JobListingIndex(), FacetCache(10, 60), HomepageFeed(1, 1, 60)).create_job_listing(
+        listing("Python developer"))
+    embedded, updated_since = await embedding_service.sync_job_listings()
+    assert embedded == 1
+
+    # Stamped when its long transaction started, before the listing the last pass read
+    await db.execute(insert(JobListing).values(**listing("Data engineer").model_dump(),
+                                               updated_at=updated_since - timedelta(seconds=120)))
+    await db.commit()
+    embedder.texts.clear()
+    assert await embedding_service.sync_job_listings(updated_since) == (1, updated_since)
+    assert embedder.texts == ["Data engineer\n..."]
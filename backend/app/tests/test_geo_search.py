@@ -0,0 +1,73 @@
+import pytest
+
+from app.db.enums import ExperienceLevel, JobListingStatus, LocationRequirement
+from app.exceptions.pagination_exceptions import InvalidSortError
+from app.repositories.pagination import PageParams
+from app.schemas.job_listing import JobListingBatchUpdate, JobListingUpdate
+from app.search.gazetteer import Gazetteer, get_gazetteer
+from app.search.job_listing_index import JobListingIndex
+from app.services.job_listing_service import JobListingService
+
+AUSTIN = (30.2672, -97.7431)
+
+
+def test_gazetteer_locates_places_and_finds_them_nearest_first():
+    gazetteer = Gazetteer([("St. Louis", "MO", 38.627, -90.1994), ("Austin", "TX", *AUSTIN),
+                           ("Round Rock", "TX", 30.5083, -97.6789), ("San Antonio", "TX", 29.4241, -98.4936)])
+    assert gazetteer.locate(" saint  louis", "mo") == gazetteer.locate("St Louis", "MO") == (38.627, -90.1994)
+    assert gazetteer.locate("Austin", None) is None and gazetteer.locate("Austin", "MN") is None
+
+    places = gazetteer.within(*AUSTIN, 100)
+    assert [place[:2] for place in places] == [AUSTIN, (30.5083, -97.6789), (29.4241, -98.4936)]
+    assert places[0][2] == 0 and places[1][2] == pytest.approx(17.1, abs=0.5)
+    assert [place[:2] for place in gazetteer.within(*AUSTIN, 50)] == [AUSTIN, (30.5083, -97.6789)]
+    # Every bundled city is found within a mile of itself
+    assert all(get_gazetteer().within(*get_gazetteer().locate(city, state), 1)
+               for city, state in [("New York", "NY"), ("Cheyenne", "WY"), ("Honolulu", "HI")])
+
+
+@pytest.mark.anyio
+async def test_nearby_listings_are_located_on_write_and_ranked_by_distance(db, listing):
+    def located(title, city, state, **fields):
+        return listing(title, city=city, state_abbreviation=state, location_requirement=LocationRequirement.IN_OFFICE,
+                       **fields)
+
+    service = JobListingService(db, JobListingIndex())
+
+    async def titles(page=PageParams(limit=20), radius_miles=100, **criteria):
+        result = await service.search_nearby_job_listings(page, *AUSTIN, radius_miles, **criteria)
+        return [job_listing.title for job_listing in result.items], result
+
+    first_austin = await service.create_job_listing(located("Austin 1", "austin", "tx"))
+    created = await service.create_job_listings([
+        located("Round Rock", "Round Rock", "TX"), located("San Antonio", "San Antonio", "TX"),
+        located("Dallas", "Dallas", "TX"), located("Nowhere", "Nowhere", "TX"),
+        located("Draft Austin", "Austin", "TX", status=JobListingStatus.DRAFT),
+        located("Junior Austin", "Austin", "TX", experience_level=ExperienceLevel.JUNIOR),
+        located("Austin 2", "Austin", "TX"),
+    ])
+    assert (first_austin.latitude, first_austin.longitude) == AUSTIN
+    assert (await titles())[0] == ["Austin 2", "Junior Austin", "Austin 1", "Round Rock", "San Antonio"]
+    assert (await titles(experience_level=ExperienceLevel.SENIOR, radius_miles=50))[0] == [
+        "Austin 2", "Austin 1", "Round Rock"]
+
+    # Cursor pages run through listings at the same distance, then the farther ones
+    pages, page = [], PageParams(limit=2, include_total=True)
+    while True:
+        page_titles, result = await titles(page)
+        pages.append((page_titles, result.total))
+        if not result.next_cursor:
+            break
+        page = PageParams(limit=2, cursor=result.next_cursor)
+    assert pages == [(["Austin 2", "Junior Austin"], 5), (["Austin 1", "Round Rock"], None), (["San Antonio"], None)]
+
+    # Moving a listing locates it again, whether one or both of city and state change
+    await service.update_job_listing(first_austin.id, JobListingUpdate(city="Dallas"))
+    await service.update_job_listings([JobListingBatchUpdate(id=created[1].id, city="Round Rock")])
+    # San Antonio moved to Round Rock; the newer of the two listings there comes first
+    assert (await titles())[0] == ["Austin 2", "Junior Austin", "San Antonio", "Round Rock"]
+    assert (await titles(radius_miles=400))[0] == [
+        "Austin 2", "Junior Austin", "San Antonio", "Round Rock", "Dallas", "Austin 1"]
+
+    with pytest.raises(InvalidSortError):
+        await titles(PageParams(limit=2, sort="title"))
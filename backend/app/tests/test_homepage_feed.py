@@ -0,0 +1,85 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing
+from app.schemas.job_listing import JobListingBatchUpdate, JobListingResponse, JobListingUpdate
+from app.search.facet_cache import FacetCache
+from app.search.homepage_feed import HomepageFeed
+from app.search.job_listing_index import JobListingIndex
+from app.services.job_listing_service import JobListingService
+
+
+@pytest.mark.anyio
+async def test_feed_follows_writes_and_reloads_when_short_or_expired(async_engine, db, listing):
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    # Two listings shown per list, four held
+    service = JobListingService(db, JobListingIndex(), FacetCache(10, 60),
+                                HomepageFeed(featured_limit=2, recent_limit=2, ttl_seconds=3600))
+
+    async def feed():
+        body = json.loads(await service.get_homepage_feed())
+        return ([job_listing["title"] for job_listing in body["featured"]],
+                [job_listing["title"] for job_listing in body["recent"]])
+
+    created = await service.create_job_listings([
+        listing("One", is_featured=True), listing("Two"), listing("Draft", status=JobListingStatus.DRAFT),
+        listing("Three", is_featured=True), listing("Four"), listing("Five"),
+    ])
+    titles = {job_listing.title: job_listing for job_listing in created}
+    assert await feed() == (["Three", "One"], ["Five", "Four"])
+    # Each listing is served as the detail endpoint returns it
+    body = json.loads(await service.get_homepage_feed())["featured"][0]
+    assert JobListingResponse.model_validate(body).title == "Three" and body["organization"]["name"] == "Org"
+
+    titles["Six"] = await service.create_job_listing(listing("Six", is_featured=True))
+    await service.update_job_listing(titles["One"].id, JobListingUpdate(title="One, edited"))
+    await service.update_job_listings([JobListingBatchUpdate(id=titles["Five"].id, is_featured=True)])
+    writes = len(statements)
+    assert await feed() == (["Six", "Five"], ["Six", "Five"])
+    assert len(statements) == writes
+
+    # Leaving listings are replaced from the reserve, without reading the database
+    await service.update_job_listing(titles["Six"].id, JobListingUpdate(status=JobListingStatus.DELISTED))
+    await service.delete_job_listing(titles["Five"].id)
+    writes = len(statements)
+    assert await feed() == (["Three", "One, edited"], ["Four", "Three"])
+    assert len(statements) == writes
+
+    # Once the reserve runs out, the next request reads the feed again
+    await service.delete_job_listing(titles["Four"].id)
+    await service.delete_job_listing(titles["Three"].id)
+    await service.delete_job_listing(titles["Two"].id)
+    writes = len(statements)
+    assert await feed() == (["One, edited"], ["One, edited"])
+    assert len(statements) > writes
+
+
+@pytest.mark.anyio
+async def test_feed_orders_by_posted_at_whatever_the_ids(db, listing):
+    service = JobListingService(db, JobListingIndex(), FacetCache(10, 60),
+                                HomepageFeed(featured_limit=3, recent_limit=3, ttl_seconds=3600))
+
+    async def recent():
+        return [job_listing["title"] for job_listing in json.loads(await service.get_homepage_feed())["recent"]]
+
+    # A listing with a random (UUID v4) id, as created before ids were time-ordered, posted most recently
+    db.add(JobListing(id=uuid.uuid4(), **listing("Legacy", posted_at=datetime(2020, 10, 1)).model_dump()))
+    await db.commit()
+    created = await service.create_job_listings([listing("Older", posted_at=datetime(2020, 9, 1)),
+                                                 listing("Draft", status=JobListingStatus.DRAFT)])
+    assert await recent() == ["Legacy", "Older"]
+
+    # Publishing stamps posted_at, and a changed posted_at moves a listing in the feed already loaded
+    draft = await service.update_job_listing(created[1].id, JobListingUpdate(status=JobListingStatus.PUBLISHED))
+    assert draft.posted_at is not None
+    await service.update_job_listing(created[0].id, JobListingUpdate(posted_at=datetime(2020, 8, 1)))
+    await service.update_job_listings([JobListingBatchUpdate(id=created[0].id, posted_at=datetime(2020, 10, 2))])
+    assert await recent() == ["Draft", "Older", "Legacy"]
+    service.homepage_feed.invalidate()
+    assert await recent() == ["Draft", "Older", "Legacy"]
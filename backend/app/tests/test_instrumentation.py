@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingType, LocationRequirement
+from app.db.instrumentation import (begin_query_stats, end_query_stats, get_query_stats,
+                                    install_query_instrumentation, statement_shape)
+from app.db.models import JobListing, Organization
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?)") == statement_shape("SELECT * FROM t WHERE id IN (?)")
+
+
+def test_lazy_loads_are_flagged_as_repeated_shapes(tmp_path):
+    test_engine = create_engine(f"sqlite:///{tmp_path}/stats.db")
+    Base.metadata.create_all(test_engine)
+    install_query_instrumentation(test_engine, "test", slow_query_ms=10_000)
+    with Session(test_engine) as db:
+        for index in range(3):
+            db.add(Organization(id=f"org_{index}", name=f"Org {index}"))
+            db.add(JobListing(organization_id=f"org_{index}", title="Engineer", description="...",
+                              location_requirement=LocationRequirement.REMOTE,
+                              experience_level=ExperienceLevel.SENIOR, type=JobListingType.FULL_TIME))
+        db.commit()
+
+    token = begin_query_stats()
+    try:
+        with Session(test_engine) as db:
+            for job_listing in db.execute(select(JobListing)).scalars():
+                assert job_listing.organization.name
+        stats = get_query_stats()
+    finally:
+        end_query_stats(token)
+
+    assert stats.count == 4
+    repeated = stats.repeated_shapes(threshold=2)
+    assert len(repeated) == 1 and repeated[0][1] == 3
+    assert "FROM organizations" in repeated[0][0]
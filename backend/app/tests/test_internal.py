@@ -0,0 +1,21 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import internal
+from app.config.settings import get_settings
+
+
+def test_internal_endpoints_need_the_internal_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(internal.router)
+    client = TestClient(app)
+
+    # Not served at all until a token is configured
+    monkeypatch.setattr(get_settings(), "INTERNAL_API_TOKEN", None)
+    assert client.get("/internal/startup").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "INTERNAL_API_TOKEN", "s3cret")
+    for path in ["/internal/db/pool", "/internal/startup"]:
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer s3cret"}).status_code == 200
@@ -0,0 +1,141 @@
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, func, insert, update
+
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing
+from app.schemas.job_listing import JobListingUpdate
+from app.search import inverted_index
+from app.search.inverted_index import InvertedIndex
+from app.search.job_listing_index import JobListingIndex
+from app.search.text import stem, tokenize
+from app.services.job_listing_service import JobListingService
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("engineering", "engin"), ("engineers", "engin"), ("analysts", "analyst"), ("relational", "relat"),
+    ("technology", "technolog"), ("possibly", "possibl"), ("hopping", "hop"), ("python", "python"), ("sql", "sql"),
+])
+def test_stem_matches_porter(word, expected):
+    assert stem(word) == expected
+
+
+def test_index_ranks_by_bm25_with_title_weight():
+    index = InvertedIndex({"title": 2.5, "description": 1.0})
+    index.add("analyst", {"title": "Data Analyst", "description": "Python and SQL every day"})
+    index.add("developer", {"title": "Python Developer", "description": "Build APIs"})
+    index.add("designer", {"title": "Designer", "description": "Figma and Sketch for our design system, some Python"})
+
+    assert [key for key, _ in index.search("pythons", 10)] == ["developer", "analyst", "designer"]
+    assert [key for key, _ in index.search("python -figma", 10)] == ["developer", "analyst"]
+    assert [key for key, _ in index.search('"build apis" or sql', 10)] == ["developer", "analyst"]
+    assert [key for key, _ in index.search("python", 1)] == ["developer"]
+    assert index.search("-python", 10) == [] and index.search("cobol", 10) == []
+
+    index.add("designer", {"title": "Python Designer", "description": "Figma"})
+    index.remove("analyst")
+    hits = index.search("python", 10)
+    assert [key for key, _ in hits] == ["designer", "developer"] and all(score > 0 for _, score in hits)
+    assert len(index) == 2 and "analyst" not in index
+
+
+def test_index_matches_brute_force_across_compactions(monkeypatch):
+    monkeypatch.setattr(inverted_index, "COMPACT_MIN_REMOVED", 8)
+    random.seed(7)
+    words = [f"word{number}" for number in range(40)]
+    index, documents = InvertedIndex({"text": 1.0}), {}
+    for step in range(3000):
+        key = random.randrange(200)
+        if random.random() < 0.3:
+            index.remove(key)
+            documents.pop(key, None)
+        else:
+            text = " ".join(random.choices(words, k=6))
+            index.add(key, {"text": text})
+            documents[key] = set(tokenize(text))
+        if step % 100 == 0:
+            first, second = random.sample(words, 2)
+            assert {key for key, _ in index.search(f"{first} {second}", 1000)} == {
+                key for key, terms in documents.items() if {first, second} <= terms}
+            assert {key for key, _ in index.search(f"{first} or {second} -word0", 1000)} == {
+                key for key, terms in documents.items() if (first in terms or second in terms) and "word0" not in terms}
+    assert len(index) == len(documents)
+
+
+@pytest.mark.anyio
+async def test_service_keeps_index_in_step_with_writes(db, listing):
+    search_index = JobListingIndex()
+    service = JobListingService(db, search_index)
+
+    async def titles(keyword):
+        return [job_listing.title for job_listing in await service.instant_search_job_listings(keyword, 10)]
+
+    backend = await service.create_job_listing(listing("Backend Engineer"))
+    await service.create_job_listing(listing("Draft Engineer", status=JobListingStatus.DRAFT))
+    # Not built yet: the database answers
+    assert await titles("engineer") == ["Backend Engineer"]
+
+    await search_index.build(db)
+    frontend = await service.create_job_listing(listing("Frontend Engineer"))
+    assert await titles("engineer") == ["Frontend Engineer", "Backend Engineer"]
+    await service.update_job_listing(backend.id, JobListingUpdate(title="Backend Developer"))
+    await service.update_job_listing(frontend.id, JobListingUpdate(status=JobListingStatus.DELISTED))
+    assert await titles("engineer") == [] and await titles("developer") == ["Backend Developer"]
+    await service.delete_job_listing(backend.id)
+    assert await titles("developer") == []
+
+    # Writes by another worker: the refresh reads updated listings, searches drop deleted ones
+    await db.execute(update(JobListing).where(JobListing.title == "Draft Engineer").values(
+        status=JobListingStatus.PUBLISHED, updated_at=func.now()))
+    await db.commit()
+    await search_index.refresh(db)
+    assert await titles("engineer") == ["Draft Engineer"]
+    await db.execute(delete(JobListing).where(JobListing.title == "Draft Engineer"))
+    await db.commit()
+    assert await titles("engineer") == [] and len(search_index.index) == 0
+
+
+@pytest.mark.anyio
+async def test_refresh_reads_rows_committed_after_newer_ones(db, listing):
+    # updated_at is stamped when a transaction starts, so a long one commits rows older than the newest read
+    search_index = JobListingIndex(refresh_overlap_seconds=300)
+    service = JobListingService(db, search_index)
+    await search_index.build(db)
+
+    async def publish_elsewhere(title, updated_at):
+        await db.execute(insert(JobListing).values(**listing(title).model_dump(), updated_at=updated_at))
+        await db.commit()
+        await search_index.refresh(db)
+        return sorted(job_listing.title for job_listing in await service.instant_search_job_listings("engineer", 10))
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    assert await publish_elsewhere("Backend Engineer", now) == ["Backend Engineer"]
+    assert search_index.updated_since == now.replace(tzinfo=None)
+    assert await publish_elsewhere("Import Engineer", now - timedelta(seconds=120)) == [
+        "Backend Engineer", "Import Engineer"]
+    # Listings read unchanged again are left as indexed
+    assert search_index.index._removed == 0
+    # Transactions longer than the overlap are missed
+    assert await publish_elsewhere("Stale Engineer", now - timedelta(seconds=900)) == [
+        "Backend Engineer", "Import Engineer"]
+
+
+@pytest.mark.anyio
+async def test_build_tokenizes_off_the_event_loop(db, listing, monkeypatch):
+    threads = set()
+    add = InvertedIndex.add
+
+    def recording_add(index, key, fields):
+        threads.add(threading.current_thread())
+        add(index, key, fields)
+
+    monkeypatch.setattr(InvertedIndex, "add", recording_add)
+    search_index = JobListingIndex()
+    service = JobListingService(db, search_index)
+    await service.create_job_listings([listing(f"Engineer {number}") for number in range(5)])
+    await search_index.build(db)
+    assert threads and threading.current_thread() not in threads
+    assert len(await service.instant_search_job_listings("engineer", 10)) == 5
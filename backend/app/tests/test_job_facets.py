@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import insert
+
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement, WageInterval
+from app.db.models import JobListing
+from app.schemas.job_listing import JobListingUpdate
+from app.search.facet_cache import FacetCache, facet_key
+from app.search.job_listing_index import JobListingIndex
+from app.services.job_listing_service import JobListingService
+
+LISTINGS = [
+    ("Senior Backend Engineer", "Austin", "TX", ExperienceLevel.SENIOR, 150_000, WageInterval.YEARLY),
+    ("Backend Engineer", "Austin", "TX", ExperienceLevel.MID_LEVEL, 110_000, WageInterval.YEARLY),
+    ("Data Analyst", "Dallas", "TX", ExperienceLevel.JUNIOR, 40, WageInterval.HOURLY),
+    ("Frontend Engineer", "Seattle", "WA", ExperienceLevel.SENIOR, 250_000, WageInterval.YEARLY),
+    ("Support Specialist", None, None, ExperienceLevel.JUNIOR, None, None),
+]
+
+
+def test_facet_key_normalizes_equivalent_filters():
+    assert facet_key(city="Austin", keyword="  Backend   ENGINEER", state_abbreviation="tx", type=None) == \
+        facet_key(state_abbreviation="TX", keyword="backend engineer", city="AUSTIN", min_wage=None)
+    assert facet_key(city="Austin") != facet_key(city="Dallas")
+
+
+@pytest.mark.anyio
+async def test_facets_count_in_one_pass_and_cache_until_published_set_changes(db, listing):
+    def located(title, city, state, experience_level, wage, wage_interval, **fields):
+        return listing(title, city=city, state_abbreviation=state, experience_level=experience_level, wage=wage,
+                       wage_interval=wage_interval, location_requirement=LocationRequirement.HYBRID, **fields)
+
+    service = JobListingService(db, JobListingIndex(), FacetCache(max_entries=16, ttl_seconds=60))
+    await service.create_job_listings([located(*fields) for fields in LISTINGS])
+    draft = await service.create_job_listing(located("Draft Engineer", "Austin", "TX", ExperienceLevel.SENIOR,
+                                                     90_000, WageInterval.YEARLY, status=JobListingStatus.DRAFT))
+
+    facets = await service.get_job_listing_facets()
+    assert facets.total == 5
+    assert [(count.value, count.count) for count in facets.experience_level] == [
+        ("junior", 2), ("senior", 2), ("mid-level", 1)]
+    assert [(count.value, count.count) for count in facets.state_abbreviation] == [("TX", 3), ("WA", 1)]
+    assert [(count.value, count.count) for count in facets.type] == [("full-time", 5)]
+    assert [(band.wage_interval, band.min_wage, band.max_wage, band.count) for band in facets.wage_band] == [
+        (WageInterval.YEARLY, 100_000, 149_999, 1), (WageInterval.YEARLY, 150_000, 199_999, 1),
+        (WageInterval.YEARLY, 200_000, None, 1), (WageInterval.HOURLY, 25, 49, 1)]
+    texas = await service.get_job_listing_facets(state_abbreviation="tx", keyword="engineer")
+    assert texas.total == 2
+
+    # Written behind the service's back: the cached counts stand
+    await db.execute(insert(JobListing), [{
+        "organization_id": "org_1", "title": "Backend Engineer", "description": "...", "city": "Austin",
+        "state_abbreviation": "TX", "location_requirement": LocationRequirement.HYBRID,
+        "experience_level": ExperienceLevel.JUNIOR, "type": JobListingType.FULL_TIME,
+        "status": JobListingStatus.PUBLISHED}])
+    await db.commit()
+    assert await service.get_job_listing_facets(state_abbreviation="TX", keyword="Engineer") is texas
+
+    # Publishing a listing clears the cache
+    await service.update_job_listing(draft.id, JobListingUpdate(status=JobListingStatus.PUBLISHED))
+    published = await service.get_job_listing_facets(state_abbreviation="TX", keyword="engineer")
+    assert published.total == 4
+    assert [(count.value, count.count) for count in published.experience_level] == [
+        ("senior", 2), ("junior", 1), ("mid-level", 1)]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config.settings import get_settings
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing
+from app.exceptions.import_exceptions import ImportFileError
+from app.search.job_listing_index import JobListingIndex
+from app.search.recommendation_index import JobRecommendationIndex
+from app.services.job_listing_service import JobListingService
+from app.utils.record_streams import MalformedRecord, iter_csv_records, iter_ndjson_records
+
+
+async def stream(data: bytes, chunk_size: int = 7):
+    # Small chunks split lines and multi-byte characters across reads
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def collect(records):
+    async def run():
+        return [record async for record in records]
+    return asyncio.run(run())
+
+
+def test_csv_records_handle_bom_quoted_newlines_and_empty_cells():
+    data = '﻿title,description,wage\r\n"Café ""lead""","Line one\nline two",\r\nShort,row\r\n'.encode()
+    assert collect(iter_csv_records(stream(data))) == [
+        (1, {"title": 'Café "lead"', "description": "Line one\nline two", "wage": None}),
+        (2, MalformedRecord("Expected 3 columns, got 2")),
+    ]
+
+
+def test_csv_header_must_parse():
+    with pytest.raises(ImportFileError):
+        collect(iter_csv_records(stream(b'title,"description\n')))
+
+
+def test_csv_unterminated_quote_costs_one_row(monkeypatch):
+    monkeypatch.setattr(get_settings(), "IMPORT_ROW_MAX_BYTES", 64)
+    rows = "".join(f"Row {number},Description {number},{number}\n" for number in range(20))
+    data = f'title,description,wage\nBad,"stray quote,1\n{rows}'.encode()
+    records = collect(iter_csv_records(stream(data)))
+    # The open field takes in rows 0 to 2, passing 64 bytes, then parsing resumes at the next line
+    assert records[0] == (1, MalformedRecord("Unterminated quoted field"))
+    assert records[1:] == [(row_number, {"title": f"Row {number}", "description": f"Description {number}",
+                                         "wage": str(number)})
+                           for row_number, number in zip(range(2, 19), range(3, 20))]
+
+
+def test_ndjson_records_report_malformed_lines():
+    data = b'{"title": "A"}\n\n[1]\n{not json\n{"title": "B"}'
+    records = collect(iter_ndjson_records(stream(data)))
+    assert [row_number for row_number, _ in records] == [1, 2, 3, 4]
+    assert records[0][1] == {"title": "A"} and records[3][1] == {"title": "B"}
+    assert all(isinstance(record, MalformedRecord) for _, record in records[1:3])
+
+
+def test_overlong_lines_cost_one_row_each(monkeypatch):
+    monkeypatch.setattr(get_settings(), "IMPORT_ROW_MAX_BYTES", 64)
+    long_line = "x" * 100
+    records = collect(iter_ndjson_records(stream(f'{{"title": "A"}}\n{long_line}\n{{"title": "B"}}\n'.encode())))
+    assert records == [(1, {"title": "A"}), (2, MalformedRecord("Line longer than 64 bytes")), (3, {"title": "B"})]
+    records = collect(iter_csv_records(stream(f"title,wage\nA,1\n{long_line}\nB,2\n{long_line}".encode())))
+    assert records == [(1, {"title": "A", "wage": "1"}), (2, MalformedRecord("Line longer than 64 bytes")),
+                       (3, {"title": "B", "wage": "2"}), (4, MalformedRecord("Line longer than 64 bytes"))]
+    with pytest.raises(ImportFileError):
+        collect(iter_csv_records(stream(f"{long_line}\nA,1\n".encode())))
+
+
+def test_body_without_line_breaks_is_read_in_linear_time(monkeypatch):
+    # 1 MB in 1 KB chunks: joining the whole tail on every chunk would copy about half a gigabyte
+    monkeypatch.setattr(get_settings(), "IMPORT_ROW_MAX_BYTES", 2048)
+    records = collect(iter_ndjson_records(stream(b"x" * 1_048_576 + b'\n{"title": "A"}', 1024)))
+    assert records == [(1, MalformedRecord("Line longer than 2048 bytes")), (2, {"title": "A"})]
+
+
+@pytest.mark.anyio
+async def test_import_stages_valid_rows_and_reports_the_rest(db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "BULK_WRITE_CHUNK_SIZE", 2)
+
+    async def refresh(index, db):
+        raise AssertionError("the import request refreshed an index")
+
+    # The imported listings are left to the periodic refreshes rather than awaited by the request
+    monkeypatch.setattr(JobListingIndex, "refresh", refresh)
+    monkeypatch.setattr(JobRecommendationIndex, "refresh", refresh)
+    valid = {"title": "Engineer", "description": "...", "organization_id": "org_1", "location_requirement": "remote",
+             "experience_level": "senior", "type": "full-time", "status": "published"}
+    rows = [valid, dict(valid, title="Designer"), dict(valid, experience_level="wizard"), dict(valid, title="Ops"),
+            dict(valid, organization_id="org_missing"), dict(valid, title="Support", wage="lots")]
+    data = "\n".join(json.dumps(row) for row in rows).encode()
+
+    report = await JobListingService(db).import_job_listings(iter_ndjson_records(stream(data, 64)))
+    assert (report.imported, report.failed, report.errors_truncated) == (3, 3, False)
+    assert [error.row for error in report.errors] == [3, 5, 6]
+    assert report.errors[1].errors == ["organization_id: Organization 'org_missing' not found"]
+    assert report.errors[0].errors[0].startswith("experience_level:")
+    assert (await db.execute(select(JobListing.title).order_by(JobListing.id))).scalars().all() == [
+        "Engineer", "Designer", "Ops"]
+    assert await db.scalar(select(func.count()).where(JobListing.status == JobListingStatus.PUBLISHED)) == 3
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, delete, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement, WageInterval
+from app.db.full_text import websearch_to_fts5
+from app.db.models import JobListing, Organization
+from app.repositories.job_listing_repository import JobListingRepository
+from app.repositories.pagination import PageParams
+
+LISTINGS = [
+    ("Senior Backend Engineer", "Austin", "TX", ExperienceLevel.SENIOR, 150_000, WageInterval.YEARLY),
+    ("Backend Engineer", "Austin", "TX", ExperienceLevel.MID_LEVEL, 110_000, WageInterval.YEARLY),
+    ("Data Analyst", "Dallas", "TX", ExperienceLevel.JUNIOR, 40, WageInterval.HOURLY),
+    ("Frontend Engineer", "Seattle", "WA", ExperienceLevel.SENIOR, 170_000, WageInterval.YEARLY),
+    ("Support Specialist", None, None, ExperienceLevel.JUNIOR, None, None),
+]
+
+
+def search(tmp_path, **criteria):
+    async def run():
+        test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/search.db")
+        async with test_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(test_engine, expire_on_commit=False) as db:
+            db.add(Organization(id="org_1", name="Org"))
+            db.add_all([
+                JobListing(organization_id="org_1", title=title, description="...", city=city,
+                           state_abbreviation=state, experience_level=experience_level, wage=wage,
+                           wage_interval=wage_interval, location_requirement=LocationRequirement.HYBRID,
+                           type=JobListingType.FULL_TIME, status=JobListingStatus.PUBLISHED)
+                for title, city, state, experience_level, wage, wage_interval in LISTINGS
+            ])
+            db.add(JobListing(organization_id="org_1", title="Draft Backend Engineer", description="...",
+                              city="Austin", state_abbreviation="TX", experience_level=ExperienceLevel.SENIOR,
+                              location_requirement=LocationRequirement.HYBRID, type=JobListingType.FULL_TIME))
+            await db.commit()
+            page = await JobListingRepository(db).search(PageParams(limit=10, include_total=True), **criteria)
+        await test_engine.dispose()
+        return page
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("criteria, titles", [
+    ({}, ["Support Specialist", "Frontend Engineer", "Data Analyst", "Backend Engineer",
+          "Senior Backend Engineer"]),
+    ({"keyword": "backend"}, ["Backend Engineer", "Senior Backend Engineer"]),
+    ({"keyword": "engineering -frontend"}, ["Backend Engineer", "Senior Backend Engineer"]),
+    ({"city": "AUSTIN", "experience_level": ExperienceLevel.SENIOR}, ["Senior Backend Engineer"]),
+    ({"state_abbreviation": "tx", "wage_interval": WageInterval.YEARLY, "min_wage": 120_000},
+     ["Senior Backend Engineer"]),
+    ({"wage_interval": WageInterval.YEARLY, "min_wage": 100_000, "max_wage": 160_000},
+     ["Backend Engineer", "Senior Backend Engineer"]),
+    ({"keyword": "engineer", "type": JobListingType.INTERNSHIP}, []),
+])
+def test_search_matches_published_listings_newest_first(tmp_path, criteria, titles):
+    page = search(tmp_path, **criteria)
+    assert [job_listing.title for job_listing in page.items] == titles
+    assert page.total == len(titles)
+
+
+@pytest.mark.parametrize("criteria, index_name", [
+    ({"city": "Austin", "experience_level": ExperienceLevel.SENIOR}, "ix_job_listings_published_city"),
+    ({"state_abbreviation": "TX", "wage_interval": WageInterval.YEARLY, "min_wage": 1},
+     "ix_job_listings_published_state"),
+])
+def test_search_seeks_partial_indexes_in_page_order(tmp_path, criteria, index_name):
+    db_engine = create_engine(f"sqlite:///{tmp_path}/plan.db")
+    Base.metadata.create_all(db_engine)
+    repo = JobListingRepository(None)
+    statement, _, _ = repo._page_statement(PageParams(limit=20), *repo.search_clauses("sqlite", **criteria))
+    sql = statement.compile(db_engine, compile_kwargs={"literal_binds": True})
+    with db_engine.connect() as conn:
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    db_engine.dispose()
+    # The index already yields newest first, so there is no sort step
+    assert len(plan) == 1 and plan[0].startswith(f"SEARCH job_listings USING INDEX {index_name}")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("backend engineer", '("backend") AND ("engineer")'),
+    ('"data science" or ml -intern', '(("data science" OR "ml")) NOT ("intern")'),
+    # FTS5 syntax typed by users is matched as plain words
+    ("title:python NEAR(", '("title python") AND ("NEAR")'),
+    ("-intern", None),
+])
+def test_websearch_to_fts5(query, expected):
+    assert websearch_to_fts5(query) == expected
+
+
+@pytest.mark.anyio
+async def test_keyword_ranks_title_matches_first_and_follows_writes(db):
+    db.add_all([
+        JobListing(organization_id="org_1", title=title, description=description,
+                   location_requirement=LocationRequirement.REMOTE, experience_level=ExperienceLevel.SENIOR,
+                   type=JobListingType.FULL_TIME, status=JobListingStatus.PUBLISHED)
+        for title, description in [("Data Analyst", "Python and SQL every day"),
+                                   ("Python Developer", "Build APIs"), ("Designer", "Figma")]
+    ])
+    await db.commit()
+    repo = JobListingRepository(db)
+
+    async def titles(keyword):
+        pages, cursor = [], None
+        while True:
+            page = await repo.search(PageParams(limit=1, cursor=cursor), keyword=keyword)
+            pages += [(job_listing.title, job_listing.relevance > 0) for job_listing in page.items]
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    assert await titles("pythons") == [("Python Developer", True), ("Data Analyst", True)]
+    projected = await repo.search(PageParams(limit=5, fields=["title", "relevance"]), keyword="python")
+    assert [item["title"] for item in projected.items] == ["Python Developer", "Data Analyst"]
+    assert projected.items[0]["relevance"] > projected.items[1]["relevance"] > 0
+    # Triggers keep the index in step with updates and deletes
+    await db.execute(update(JobListing).where(JobListing.title == "Designer").values(title="Python Designer"))
+    await db.execute(delete(JobListing).where(JobListing.title == "Data Analyst"))
+    await db.commit()
+    assert sorted(title for title, _ in await titles("python")) == ["Python Designer", "Python Developer"]
+    assert await titles("figma") == [("Python Designer", True)]
@@ -0,0 +1,141 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.config.settings import get_settings
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingType, LocationRequirement
+from app.db.models import JobListing, Organization
+from app.exceptions.pagination_exceptions import (
+    InvalidCursorError,
+    InvalidFieldError,
+    InvalidFilterError,
+    InvalidSortError,
+    OffsetTooLargeError,
+    PaginationError,
+)
+from app.repositories.job_listing_repository import JobListingRepository
+from app.repositories.organization_repository import OrganizationRepository
+from app.repositories.pagination import PageParams, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    job_listing_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor([job_listing_id]), [uuid.UUID]) == [job_listing_id]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["a", "b"]), encode_cursor(["not-a-uuid"])])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, [uuid.UUID])
+
+
+@pytest.mark.anyio
+async def test_job_listing_pages_cover_every_row_once(db):
+    db.add_all([
+        JobListing(organization_id="org_1", title=f"Job {index}", description="...",
+                   location_requirement=LocationRequirement.REMOTE,
+                   experience_level=ExperienceLevel.SENIOR, type=JobListingType.FULL_TIME)
+        for index in range(25)
+    ])
+    await db.commit()
+
+    repo = JobListingRepository(db)
+    pages, cursor = [], None
+    while True:
+        page = await repo.get_page(PageParams(limit=10, cursor=cursor))
+        pages.append([job_listing.title for job_listing in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [10, 10, 5]
+    # Newest first: ids are time-ordered
+    assert sum(pages, []) == [f"Job {index}" for index in reversed(range(25))]
+
+
+@pytest.mark.anyio
+async def test_job_listing_fields_select_only_requested_columns(async_engine, db):
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    db.add_all([
+        JobListing(organization_id="org_1", title=f"Job {index}", description="..." * 1000, city="Austin",
+                   location_requirement=LocationRequirement.REMOTE,
+                   experience_level=ExperienceLevel.SENIOR, type=JobListingType.FULL_TIME)
+        for index in range(3)
+    ])
+    await db.commit()
+
+    repo = JobListingRepository(db)
+    statements.clear()
+    first = await repo.get_page(PageParams(limit=2, fields=["title", "city", "organization.name"]))
+    second = await repo.get_page(PageParams(limit=2, fields=["title"], cursor=first.next_cursor))
+    assert first.items == [{"title": f"Job {index}", "city": "Austin", "organization": {"name": "Org"}}
+                           for index in (2, 1)]
+    assert second.items == [{"title": "Job 0"}] and second.next_cursor is None
+    # One statement, and the wide description column is never read
+    assert "LEFT OUTER JOIN organizations" in statements[0] and "description" not in statements[0]
+
+
+@pytest.fixture
+def organizations(tmp_path):
+    test_engine = create_engine(f"sqlite:///{tmp_path}/organizations.db")
+    Base.metadata.create_all(test_engine)
+    with Session(test_engine) as db:
+        # Names repeat so the primary key has to break ties
+        db.add_all([Organization(id=f"org_{index:02d}", name=f"Org {index % 5}") for index in range(23)])
+        db.commit()
+        yield OrganizationRepository(db)
+    test_engine.dispose()
+
+
+def collect(repo, params, filters=None):
+    pages = []
+    while True:
+        page = repo.get_page(params, filters)
+        pages.append([organization.id for organization in page.items])
+        if page.next_cursor is None and page.next_offset is None:
+            return pages
+        params.cursor, params.offset = page.next_cursor, page.next_offset
+
+
+@pytest.mark.parametrize("sort", ["name", "-name", "created_at", "-created_at"])
+def test_cursor_pages_follow_sort_with_primary_key_tie_breaker(organizations, sort):
+    pages = collect(organizations, PageParams(limit=4, sort=sort))
+    descending = sort.startswith("-")
+    expected = sorted(organizations.db.query(Organization).all(),
+                      key=lambda organization: (getattr(organization, sort.lstrip("-")), organization.id),
+                      reverse=descending)
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 3]
+    assert sum(pages, []) == [organization.id for organization in expected]
+
+
+def test_offset_pages_and_filters(organizations):
+    pages = collect(organizations, PageParams(limit=2, offset=0, sort="name"), {"name": "Org 1"})
+    assert pages == [["org_01", "org_06"], ["org_11", "org_16"], ["org_21"]]
+
+
+def test_total_is_capped_and_flagged_as_estimate(organizations, monkeypatch):
+    page = organizations.get_page(PageParams(limit=5, include_total=True))
+    assert (page.total, page.total_is_estimate) == (23, False)
+    monkeypatch.setattr(get_settings(), "PAGE_COUNT_MAX", 10)
+    page = organizations.get_page(PageParams(limit=5, include_total=True))
+    assert (page.total, page.total_is_estimate) == (10, True)
+    page = organizations.get_page(PageParams(limit=5, include_total=True), {"name": "Org 1"})
+    assert (page.total, page.total_is_estimate) == (5, False)
+
+
+@pytest.mark.parametrize("params, filters, error", [
+    (PageParams(limit=5, sort="image_url"), None, InvalidSortError),
+    (PageParams(limit=5), {"image_url": "x"}, InvalidFilterError),
+    (PageParams(limit=5, fields=["name", "secret"]), None, InvalidFieldError),
+    (PageParams(limit=5, offset=10 ** 6), None, OffsetTooLargeError),
+    (PageParams(limit=5, offset=5, cursor=encode_cursor(["-created_at", "2024-01-01T00:00:00", "org_01"])),
+     None, PaginationError),
+    (PageParams(limit=5, sort="name", cursor=encode_cursor(["-created_at", "2024-01-01T00:00:00", "org_01"])),
+     None, InvalidCursorError),
+])
+def test_rejected_list_requests(organizations, params, filters, error):
+    with pytest.raises(error):
+        organizations.get_page(params, filters)
@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import PoolStats, instrumented_pool_class
+
+
+def test_pool_stats_records_checkouts_and_timeouts(tmp_path):
+    stats = PoolStats("test")
+    test_engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=instrumented_pool_class(QueuePool, stats),
+                                pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with test_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            test_engine.connect()
+        snapshot = stats.snapshot(test_engine.pool)
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 1
+    assert snapshot["saturation"] == 1.0
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import uuid
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing, User, UserResume
+from app.schemas.job_listing import JobListingUpdate
+from app.search.embeddings import HashedTermEmbedder, normalize
+from app.search.facet_cache import FacetCache
+from app.search.homepage_feed import HomepageFeed
+from app.search.job_listing_index import JobListingIndex
+from app.search.recommendation_index import JobRecommendationIndex
+from app.search.vector_index import TRAIN_MIN, IVFFlatIndex
+from app.services.embedding_service import EmbeddingService
+from app.services.job_listing_service import JobListingService
+
+
+def test_ivf_flat_index_matches_exact_search_and_stays_consistent():
+    rng = np.random.default_rng(7)
+    # Clustered vectors, as similar texts embed
+    centers = rng.normal(size=(40, 32))
+    vectors = normalize((centers[rng.integers(0, 40, 4000)] + 0.4 * rng.normal(size=(4000, 32))).astype(np.float32))
+    index = IVFFlatIndex(32, probes=8)
+    index.add(range(TRAIN_MIN - 1), vectors[:TRAIN_MIN - 1])
+    assert not index.needs_training
+    index.add(range(TRAIN_MIN - 1, 4000), vectors[TRAIN_MIN - 1:])
+    assert index.needs_training
+    index.train()
+    assert len(index.list_sizes()) == 63 and not index.needs_training
+
+    # Replace some vectors and remove others; every list stays packed
+    vectors[0:1000:2] = normalize(rng.normal(size=(500, 32)).astype(np.float32))
+    index.add(range(0, 1000, 2), vectors[0:1000:2])
+    for key in range(1000, 2000):
+        assert index.remove(key)
+    assert not index.remove(1000) and len(index) == 3000
+    live = np.r_[0:1000, 2000:4000]
+
+    hits = 0
+    for query in vectors[rng.choice(live, 50)]:
+        exact = live[np.argsort(-(vectors[live] @ query), kind="stable")[:10]]
+        # Probing every list is exact search
+        assert [key for key, _ in index.search(query, 10, probes=len(index.list_sizes()))] == exact.tolist()
+        found = index.search(query, 10)
+        assert [score for _, score in found] == sorted((score for _, score in found), reverse=True)
+        hits += len({key for key, _ in found} & set(exact.tolist()))
+    assert hits / 500 > 0.9
+
+    restored = IVFFlatIndex(32, probes=8)
+    restored.restore(index.centroids, index.trained_size, *index.items(), index.list_sizes())
+    assert restored.search(vectors[5], 10) == index.search(vectors[5], 10)
+
+
+@pytest.mark.anyio
+async def test_recommendations_follow_writes_and_survive_a_restart(tmp_path, db, listing, monkeypatch):
+    threads = set()
+    embed = HashedTermEmbedder.embed
+
+    def recording_embed(embedder, texts):
+        threads.add(threading.current_thread())
+        return embed(embedder, texts)
+
+    monkeypatch.setattr(HashedTermEmbedder, "embed", recording_embed)
+    embedder = HashedTermEmbedder(64)
+    path = str(tmp_path / "index" / "recommendations.npz")
+    db.add_all([User(id="user_1", clerk_id="clerk_1", image_url="", email="one@example.com",
+                     resume=UserResume(resume_file_url="", resume_file_key="",
+                                       ai_summary="Python developer who builds data pipelines")),
+                User(id="user_2", clerk_id="clerk_2", image_url="", email="two@example.com")])
+    await db.commit()
+    recommendation_index = JobRecommendationIndex(path, embedder=embedder)
+    service = JobListingService(db, JobListingIndex(), FacetCache(10, 60), HomepageFeed(1, 1, 60),
+                                recommendation_index)
+
+    async def recommended(user_id="user_1", limit=2):
+        job_listings = await service.recommend_job_listings(user_id, limit)
+        return job_listings if job_listings is None else [job_listing.title for job_listing in job_listings]
+
+    created = await service.create_job_listings([
+        listing("Data engineer", description="Build data pipelines in Python"),
+        listing("Pastry chef", description="Bake bread and pastries"),
+        listing("Python developer", description="Python developer for web services"),
+        listing("Welder", description="Weld steel frames", status=JobListingStatus.DRAFT),
+    ])
+    titles = {job_listing.title: job_listing for job_listing in created}
+    assert await recommended() == []
+    # Part of the listings already have stored vectors
+    await EmbeddingService(db, embedder).sync_job_listings()
+    await service.create_job_listing(listing("Sous chef", description="Cook and plate dishes"))
+    await recommendation_index.build(db)
+    built = await recommended(limit=4)
+    assert built[:2] == ["Data engineer", "Python developer"] and sorted(built[2:]) == ["Pastry chef", "Sous chef"]
+
+    # Written listings are applied as they are written, embedded off the event loop as every listing above
+    titles["Python data"] = await service.create_job_listing(
+        listing("Python data developer", description="Python developer who builds data pipelines"))
+    await service.update_job_listing(titles["Data engineer"].id, JobListingUpdate(status=JobListingStatus.DELISTED))
+    assert await recommended() == ["Python data developer", "Python developer"]
+    assert threads and threading.current_thread() not in threads
+    assert await recommended("user_2") is None
+    recommendation_index.save(recommendation_index.snapshot())
+
+    # A listing published after the file was saved is picked up by a worker starting from the file
+    await service.update_job_listing(titles["Welder"].id, JobListingUpdate(
+        title="Python pipeline developer", description="Python data pipelines", status=JobListingStatus.PUBLISHED))
+    restarted = JobRecommendationIndex(path, embedder=embedder)
+    assert restarted.load() and restarted.ready and len(restarted.index) == 4
+    await restarted.refresh(db)
+    service.recommendation_index = restarted
+    assert await recommended(limit=3) == ["Python data developer", "Python pipeline developer", "Python developer"]
+    assert not JobRecommendationIndex(path, embedder=HashedTermEmbedder(32)).load()
+
+
+@pytest.mark.anyio
+async def test_reclustering_runs_off_the_event_loop_and_keeps_writes_made_meanwhile():
+    rng = np.random.default_rng(3)
+    recommendation_index = JobRecommendationIndex(embedder=HashedTermEmbedder(32))
+    recommendation_index.ready = True
+    keys = [uuid.uuid4() for _ in range(TRAIN_MIN + 100)]
+    recommendation_index._add(keys, normalize(rng.normal(size=(len(keys), 32)).astype(np.float32)))
+    assert recommendation_index.index.needs_training
+    written = uuid.uuid4()
+    vector = normalize(rng.normal(size=(1, 32)).astype(np.float32))
+
+    retraining = asyncio.create_task(recommendation_index._retrain())
+    await asyncio.sleep(0)
+    # Training runs in a thread: the loop goes on applying writes to the live index
+    assert recommendation_index.index.centroids is None
+    recommendation_index._add([written], vector)
+    recommendation_index.remove(keys[0])
+    await retraining
+
+    index = recommendation_index.index
+    assert index.centroids is not None and not index.needs_training and len(index) == len(keys)
+    assert written in index and keys[0] not in index
+    assert index.search(vector[0], 1, probes=len(index.list_sizes()))[0][0] == written
+
+
+@pytest.mark.anyio
+async def test_refresh_reads_listings_committed_after_newer_ones(db, listing):
+    embedder = HashedTermEmbedder(64)
+    db.add(User(id="user_1", clerk_id="clerk_1", image_url="", email="one@example.com",
+                resume=UserResume(resume_file_url="", resume_file_key="", ai_summary="Python data pipelines")))
+    await db.commit()
+    recommendation_index = JobRecommendationIndex(embedder=embedder)
+    service = JobListingService(db, JobListingIndex(), FacetCache(10, 60), HomepageFeed(1, 1, 60),
+                                recommendation_index)
+    await service.create_job_listing(listing("Pastry chef", description="Bake bread"))
+    await recommendation_index.build(db)
+    recommendation_index.changed = False
+
+    # Stamped when its long transaction started, before the listing the build read
+    await db.execute(insert(JobListing).values(
+        **listing("Data engineer", description="Python data pipelines").model_dump(),
+        updated_at=recommendation_index.updated_since - timedelta(seconds=120)))
+    await db.commit()
+    await recommendation_index.refresh(db)
+    assert [job_listing.title for job_listing in await service.recommend_job_listings("user_1", 1)] == [
+        "Data engineer"]
+    # Listings read again unchanged leave the index as it was, so it is not saved again
+    recommendation_index.changed = False
+    await recommendation_index.refresh(db)
+    assert not recommendation_index.changed
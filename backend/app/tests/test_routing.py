@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, select
+
+from app.db.base import Base
+from app.db.models import Organization
+from app.db.routing import RoutingSession, begin_routing_state, end_routing_state, get_routing_state
+
+
+def _engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    for db_engine in (primary, replica):
+        Base.metadata.create_all(db_engine)
+    with RoutingSession(bind=primary) as db:
+        db.add(Organization(id="org_primary", name="Only on primary"))
+        db.commit()
+    return primary, replica
+
+
+def test_reads_go_to_replica_until_session_writes(tmp_path):
+    primary, replica = _engines(tmp_path)
+    token = begin_routing_state()
+    try:
+        with RoutingSession(bind=primary, replicas=[replica]) as db:
+            assert db.execute(select(Organization)).scalars().all() == []
+
+            db.add(Organization(id="org_new", name="New"))
+            db.flush()
+            ids = {org.id for org in db.execute(select(Organization)).scalars()}
+            assert ids == {"org_primary", "org_new"}
+            db.rollback()
+        assert get_routing_state().wrote
+    finally:
+        end_routing_state(token)
+
+
+def test_pinned_request_reads_from_primary(tmp_path):
+    primary, replica = _engines(tmp_path)
+    token = begin_routing_state(pinned_to_primary=True)
+    try:
+        with RoutingSession(bind=primary, replicas=[replica]) as db:
+            assert [org.id for org in db.execute(select(Organization)).scalars()] == ["org_primary"]
+    finally:
+        end_routing_state(token)
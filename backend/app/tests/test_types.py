@@ -0,0 +1,32 @@
+import uuid
+
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select
+
+from app.db.types import UUIDType, uuid7
+
+
+def test_uuid7_is_version_7_and_strictly_increasing():
+    ids = [uuid7() for _ in range(10000)]
+    assert all(value.version == 7 and value.variant == uuid.RFC_4122 for value in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_uuid_type_stores_16_bytes_and_accepts_strings():
+    metadata = MetaData()
+    table = Table("items", metadata, Column("id", UUIDType, primary_key=True))
+    test_engine = create_engine("sqlite://")
+    metadata.create_all(test_engine)
+    value = uuid7()
+    with test_engine.begin() as conn:
+        conn.execute(insert(table), [{"id": value}])
+        assert conn.exec_driver_sql("SELECT length(id), typeof(id) FROM items").one() == (16, "blob")
+        assert conn.execute(select(table.c.id).where(table.c.id == str(value))).scalar_one() == value
+
+
+def test_uuid_type_renders_sqlite_literals_as_hex_blobs():
+    table = Table("items", MetaData(), Column("id", UUIDType, primary_key=True))
+    value = uuid7()
+    statement = select(table.c.id).where(table.c.id == value)
+    sql = str(statement.compile(create_engine("sqlite://"), compile_kwargs={"literal_binds": True}))
+    assert f"X'{value.hex.upper()}'" in sql
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.models import Organization
+from app.db.unit_of_work import unit_of_work
+from app.repositories.organization_repository import OrganizationRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    test_engine = create_engine(f"sqlite:///{tmp_path}/uow.db")
+    Base.metadata.create_all(test_engine)
+    with Session(test_engine) as session:
+        yield session
+
+
+def _count(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(Organization)).scalar_one()
+
+
+def test_nested_blocks_commit_once(db):
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+    repo = OrganizationRepository(db)
+    with unit_of_work(db):
+        organization = repo.create(Organization(id="org_1", name="One"))
+        assert organization.created_at is not None
+        with unit_of_work(db):
+            repo.create(Organization(id="org_2", name="Two"))
+        assert commits == []
+    assert len(commits) == 1
+    assert _count(db) == 2
+
+
+def test_error_rolls_back_whole_unit(db):
+    repo = OrganizationRepository(db)
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            repo.create(Organization(id="org_1", name="One"))
+            raise RuntimeError("boom")
+    assert _count(db) == 0
@@ -0,0 +1,168 @@
+import codecs
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import date
+from typing import Any, AsyncIterable, AsyncIterator, Mapping, NamedTuple, Optional, Sequence, Union
+
+from app.config.settings import get_settings
+from app.exceptions.import_exceptions import ImportFileError
+
+
+class MalformedRecord(NamedTuple):
+    """A record that could not be parsed; reported against its row instead of failing the whole stream"""
+    message: str
+
+
+Record = Union[dict[str, Any], MalformedRecord]
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[Optional[str]]:
+    """
+    Decode a byte stream into lines, holding one chunk and at most max_line_bytes of a partial line. A longer line is
+    skipped to its end and yielded as None.
+    """
+    # utf-8-sig drops the byte order mark spreadsheet exports start with
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    # The start of the current line, in pieces: joining only once it ends keeps a long line linear
+    partial, partial_bytes, overlong = [], 0, False
+
+    def end_line(last_piece: str) -> Optional[str]:
+        nonlocal partial, partial_bytes, overlong
+        line = None if overlong else "".join(partial) + last_piece
+        partial, partial_bytes, overlong = [], 0, False
+        if line is None or len(line.encode()) > max_line_bytes:
+            return None
+        return line.removesuffix("\r")
+
+    async for chunk in chunks:
+        *lines, rest = decoder.decode(chunk).split("\n")
+        for line in lines:
+            yield end_line(line)
+        if rest and not overlong:
+            partial.append(rest)
+            partial_bytes += len(rest.encode())
+            if partial_bytes > max_line_bytes:
+                partial, partial_bytes, overlong = [], 0, True
+    rest = decoder.decode(b"", final=True)
+    if partial or rest or overlong:
+        yield end_line(rest)
+
+
+async def iter_ndjson_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, Record]]:
+    """
+    (row number, record) for each non-blank line of newline-delimited JSON; a line longer than IMPORT_ROW_MAX_BYTES
+    is reported without being read
+    """
+    max_line_bytes = get_settings().IMPORT_ROW_MAX_BYTES
+    row_number = 0
+    async for line in iter_lines(chunks, max_line_bytes):
+        if line is None:
+            row_number += 1
+            yield row_number, MalformedRecord(f"Line longer than {max_line_bytes} bytes")
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, MalformedRecord(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, MalformedRecord("Expected a JSON object")
+            continue
+        yield row_number, record
+
+
+async def iter_csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, Record]]:
+    """
+    (row number, record) for each data row of a CSV file with a header row. Empty cells become None so optional
+    fields validate as missing. A line longer than IMPORT_ROW_MAX_BYTES, or a quoted field still open after that
+    many bytes, is reported and parsing resumes at the next line, so a stray quote or a missing line break costs one
+    row rather than buffering the rest of the file.
+    """
+    max_row_bytes = get_settings().IMPORT_ROW_MAX_BYTES
+    header = None
+    row_number = 0
+    pending, pending_bytes, quotes = [], 0, 0
+    async for line in iter_lines(chunks, max_row_bytes):
+        if line is None:
+            if header is None:
+                raise ImportFileError(f"CSV header line longer than {max_row_bytes} bytes")
+            row_number += 1
+            yield row_number, MalformedRecord(f"Line longer than {max_row_bytes} bytes")
+            pending, pending_bytes, quotes = [], 0, 0
+            continue
+        pending.append(line)
+        # Quotes are escaped by doubling, so an odd count means a quoted field continues on the next line
+        quotes += line.count('"')
+        if quotes % 2:
+            pending_bytes += len(line.encode()) + 1
+            if pending_bytes > max_row_bytes:
+                if header is None:
+                    raise ImportFileError("Unterminated quoted field in the CSV header")
+                row_number += 1
+                yield row_number, MalformedRecord("Unterminated quoted field")
+                pending, pending_bytes, quotes = [], 0, 0
+            continue
+        text = "\n".join(pending)
+        pending, pending_bytes, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        try:
+            (values,) = csv.reader(io.StringIO(text))
+        except (csv.Error, ValueError) as e:
+            values = e
+        if header is None:
+            if isinstance(values, Exception):
+                raise ImportFileError(f"Invalid CSV header: {values}")
+            header = values
+            continue
+        row_number += 1
+        if isinstance(values, Exception):
+            yield row_number, MalformedRecord(f"Invalid CSV row: {values}")
+        elif len(values) != len(header):
+            yield row_number, MalformedRecord(f"Expected {len(header)} columns, got {len(values)}")
+        else:
+            yield row_number, {name: value if value != "" else None for name, value in zip(header, values)}
+    if pending:
+        if header is None:
+            raise ImportFileError("Unterminated quoted field in the CSV header")
+        yield row_number + 1, MalformedRecord("Unterminated quoted field")
+
+
+def to_json_value(value: Any) -> Any:
+    """JSON-compatible form of a column value: enums by value, UUIDs as strings, dates in ISO 8601"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+async def to_csv_chunks(batches: AsyncIterable[Sequence[Mapping[str, Any]]],
+                        fieldnames: Sequence[str]) -> AsyncIterator[str]:
+    """CSV text with a header row, one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    async for rows in batches:
+        writer.writerows([[to_json_value(row[name]) for name in fieldnames] for row in rows])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def to_ndjson_chunks(batches: AsyncIterable[Sequence[Mapping[str, Any]]]) -> AsyncIterator[str]:
+    """Newline-delimited JSON, one chunk per batch of rows"""
+    async for rows in batches:
+        yield "".join(json.dumps({name: to_json_value(value) for name, value in row.items()}) + "\n"
+                      for row in rows)
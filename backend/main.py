@@ -1,17 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.router import api_router
-from app.api.auth.webhook import router as webhooks_router
-from app.config.settings import settings
-from app.config.logging import setup_logging, get_auth_logger
+from fastapi.responses import JSONResponse
+from app.core.bootstrap import lifespan, startup_phase
+
+with startup_phase("imports"):
+    from app.api.v1.router import api_router
+    from app.api.auth.webhook import router as webhooks_router
+    from app.api.middleware.query_stats import QueryStatsMiddleware
+    from app.api.middleware.read_your_writes import ReadYourWritesMiddleware
+    from app.config.settings import get_settings
+    from app.config.logging import setup_logging, get_auth_logger
+    from app.exceptions.pagination_exceptions import PaginationError
 
 # Configure structured logging
-setup_logging()
+with startup_phase("logging"):
+    setup_logging()
 logger = get_auth_logger("main")
 
+with startup_phase("settings"):
+    settings = get_settings()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -24,6 +36,20 @@ if settings.CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Keep clients that just wrote on the primary while replicas catch up
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.READ_YOUR_WRITES_WINDOW_SECONDS)
+
+# Per-request SQL statement counts, DB time and N+1 warnings
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD)
+
+
+@app.exception_handler(PaginationError)
+async def pagination_error_handler(request: Request, exc: PaginationError):
+    # Bad cursor, offset, sort or filter in a list request
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(webhooks_router, prefix=f"{settings.API_V1_STR}/webhooks")
@@ -0,0 +1,64 @@
+"""
+Ranking a job listing's applications by fit (GET /job_listing_applications/ranked, app.search.application_ranking).
+
+Embeds synthetic resume summaries (see bench_recommendations.py) for each applicant count, then reports p50/p95
+latency of ranking them against a listing: scoring one application at a time in Python and selecting the top k with
+a heap, against one matrix-vector product over the stacked resume vectors with array signals and a top-k selection,
+and selecting from a cached ranking, which is what a request costs until the listing gets a new application:
+
+    python scripts/bench_application_ranking.py [--applications 100 1000 10000 100000]
+
+Reading the rows and decoding the stored vectors come on top of computing a ranking, in one query and one batch.
+"""
+import argparse
+import heapq
+import random
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.enums import ApplicationStage
+from app.search.application_ranking import RATING_MAX, RATING_WEIGHT, SIMILARITY_WEIGHT, STAGE_SCORES, UNRATED, \
+    rank_applications
+from app.search.embeddings import job_listing_text, load_embedder
+from bench_recommendations import resume_summary, timed
+
+
+def run(args: argparse.Namespace) -> None:
+    embedder = load_embedder(args.embedder, args.dimensions)
+    random.seed(7)
+    listing_vectors = embedder.embed([job_listing_text(resume_summary(), resume_summary())
+                                      for _ in range(args.queries)])
+    print(f"{'p50 / p95 ms':<22}{'applications':>14}{'loop':>20}{'vectorized':>20}{'cached':>20}")
+    for count in args.applications:
+        user_ids = [f"user_{number}" for number in range(count)]
+        vectors = embedder.embed([resume_summary() for _ in range(count)])
+        ratings = [random.choice([None, 1, 2, 3, 4, 5]) for _ in range(count)]
+        stages = random.choices(list(ApplicationStage), weights=[1, 6, 2, 1, 0.2], k=count)
+
+        def loop(listing_vector):
+            scores = (SIMILARITY_WEIGHT * float(vector @ listing_vector)
+                      + RATING_WEIGHT * (UNRATED if rating is None else rating / RATING_MAX) + STAGE_SCORES[stage]
+                      for vector, rating, stage in zip(vectors, ratings, stages))
+            return heapq.nlargest(args.k, zip(scores, user_ids))
+
+        def vectorized(listing_vector):
+            return rank_applications(listing_vector, user_ids, vectors, ratings, stages).top(args.k)
+
+        ranking = rank_applications(listing_vectors[0], user_ids, vectors, ratings, stages)
+        _, loop_timing = timed(loop, listing_vectors)
+        _, vectorized_timing = timed(vectorized, listing_vectors)
+        _, cached_timing = timed(lambda _: ranking.top(args.k), listing_vectors)
+        print(f"{'':<22}{count:>14}{loop_timing}{vectorized_timing}{cached_timing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, nargs="+", default=[100, 1000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=20, help="applications per request (PAGE_SIZE_DEFAULT)")
+    parser.add_argument("--embedder", default="hashed_terms", help="EMBEDDER")
+    parser.add_argument("--dimensions", type=int, default=256, help="EMBEDDING_DIMENSIONS")
+    run(parser.parse_args())
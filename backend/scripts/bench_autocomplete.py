@@ -0,0 +1,147 @@
+"""
+Search box typeahead from the in-memory autocomplete tries against LIKE prefix queries.
+
+Seeds synthetic listings (see bench_job_search.py), builds the autocomplete from the published ones and the
+organizations as the worker does at startup, reporting build time and memory, then reports p50/p95 latency of
+suggestions for prefixes typed one character at a time three ways: the tries (GET /job_listings/search/autocomplete),
+a listing moving between titles and cities in the tries (what each write costs), and LIKE 'prefix%' counts grouped
+by title, city and organization in the database. The database only matches the start of a value, where the tries
+match the start of any word:
+
+    python scripts/bench_autocomplete.py [--listings 200000] [--database-url ...]
+
+The script exits with status 1 when the tries' p95 latency exceeds --budget-ms.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import and_, bindparam, create_engine, func, select
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+from app.db.models import JobListing, Organization
+from app.db.models.job_listing import PUBLISHED
+from app.repositories.job_listing_repository import ORGANIZATION_NAMES, SEARCH_DOCUMENTS
+from app.search.autocomplete import Autocomplete
+from bench_job_search import CITIES, TITLE_JOBS, TITLE_ROLES, seed
+
+# What someone starts typing, drawn at random per run and cut to 1-4 characters
+WORDS = {
+    "title": lambda: random.choice(TITLE_ROLES + TITLE_JOBS),
+    "city": lambda: random.choice(CITIES)[0],
+    "organization": lambda: f"Organization {random.randrange(2000)}",
+}
+
+PREFIX = bindparam("prefix")
+
+
+def build(db_engine: Engine, top_k: int) -> Autocomplete:
+    autocomplete = Autocomplete(top_k)
+    with db_engine.connect() as conn:
+        for row in conn.execute(ORGANIZATION_NAMES):
+            autocomplete.put_organization(row.id, row.name)
+        for row in conn.execute(SEARCH_DOCUMENTS.where(PUBLISHED).execution_options(yield_per=10_000)):
+            autocomplete.put_listing(row.id, row.title, row.city, row.state_abbreviation, row.organization_id)
+    autocomplete.finish_loading()
+    return autocomplete
+
+
+def like_statements(limit: int) -> list:
+    """Published listings counted per title, city and organization starting with the prefix: the baseline"""
+    listings = func.count(JobListing.id).label("listings")
+    return [
+        select(JobListing.title, listings).where(PUBLISHED, JobListing.title.ilike(PREFIX + "%"))
+        .group_by(JobListing.title).order_by(listings.desc()).limit(limit),
+        select(JobListing.city, JobListing.state_abbreviation, listings)
+        .where(PUBLISHED, JobListing.city.ilike(PREFIX + "%"))
+        .group_by(JobListing.city, JobListing.state_abbreviation).order_by(listings.desc()).limit(limit),
+        select(Organization.id, Organization.name, listings)
+        .outerjoin(JobListing, and_(JobListing.organization_id == Organization.id, PUBLISHED))
+        .where(Organization.name.ilike(PREFIX + "%")).group_by(Organization.id, Organization.name)
+        .order_by(listings.desc()).limit(limit),
+    ]
+
+
+def timed(run, prefixes: list) -> dict:
+    run(prefixes[0])  # warm up caches
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        run(prefix)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50_ms": round(statistics.median(timings), 4), "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4)}
+
+
+def run(args: argparse.Namespace) -> int:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    autocomplete = build(db_engine, args.top_k)
+    duration = time.perf_counter() - start
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"Built suggestions for {len(autocomplete)} published listings in {duration:.1f}s "
+          f"(with tracing): {len(autocomplete.titles)} titles, {len(autocomplete.locations)} locations, "
+          f"{len(autocomplete.organizations)} organizations, {memory_bytes / 2 ** 20:.1f} MiB\n")
+
+    listing_ids = random.sample(list(autocomplete._listings), min(1000, len(autocomplete)))
+
+    def move(prefix):
+        # A listing retitled and relocated, then put back
+        listing_id = random.choice(listing_ids)
+        title, location, organization_id = autocomplete._listings[listing_id]
+        city, state_abbreviation = random.choice(CITIES)
+        autocomplete.put_listing(listing_id, f"{prefix} {title}", city, state_abbreviation, organization_id)
+        autocomplete.put_listing(listing_id, title, *(location or (None, None)), organization_id)
+
+    statements = like_statements(args.limit)
+    over_budget = []
+    with db_engine.connect() as conn:
+        def database(prefix):
+            for statement in statements:
+                conn.execute(statement, {"prefix": prefix}).fetchall()
+
+        print(f"{'p50 / p95 ms':<22}{'tries':>20}{'write':>20}{'LIKE prefix':>20}")
+        for name, make_word in WORDS.items():
+            prefixes = [make_word()[:length] for length in range(1, 5) for _ in range(args.runs // 4)]
+            results = [timed(lambda prefix: autocomplete.suggest(prefix, args.limit), prefixes),
+                       timed(move, prefixes), timed(database, prefixes)]
+            print(f"{name:<22}" + "".join(f"{result['p50_ms']:>10.4f}{result['p95_ms']:>10.4f}"
+                                          for result in results))
+            if results[0]["p95_ms"] > args.budget_ms:
+                over_budget.append(name)
+    db_engine.dispose()
+
+    print()
+    if over_budget:
+        print(f"Suggestions p95 above {args.budget_ms}ms for: {', '.join(over_budget)}")
+        return 1
+    print(f"Suggestions p95 within {args.budget_ms}ms for every prefix")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=400)
+    parser.add_argument("--limit", type=int, default=5, help="suggestions of each kind, as the endpoint defaults to")
+    parser.add_argument("--top-k", type=int, default=10, help="suggestions kept per prefix (AUTOCOMPLETE_TOP_K)")
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    sys.exit(run(parser.parse_args()))
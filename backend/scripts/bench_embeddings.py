@@ -0,0 +1,82 @@
+"""
+Embedding pipeline throughput (app.services.embedding_service).
+
+Seeds synthetic listings (see bench_job_search.py), then reports how fast the embedder turns listing texts into
+vectors one text at a time and in batches of --batch-size, and how long the pipeline takes to embed every published
+listing from scratch (the first pass after deploying, or after changing EMBEDDER) and to pass over them again when
+nothing changed (hashes only), with the bytes stored per vector:
+
+    python scripts/bench_embeddings.py [--listings 50000] [--database-url ...]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.models import JobListing
+from app.db.models.job_listing import PUBLISHED
+from app.db.session import get_async_database_url
+from app.search.embeddings import STORED_DTYPE, job_listing_text, load_embedder
+from app.services.embedding_service import EmbeddingService
+from bench_job_search import seed
+
+
+def embed_rate(embedder, texts: list[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        embedder.embed(texts[offset:offset + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+async def measure(database_url: str, embedder, batch_size: int) -> None:
+    test_engine = create_async_engine(get_async_database_url(database_url))
+    async with AsyncSession(test_engine) as db:
+        service = EmbeddingService(db, embedder)
+        service.batch_size = batch_size
+        for name in ("from scratch", "unchanged"):
+            start = time.perf_counter()
+            embedded, _ = await service.sync_job_listings()
+            print(f"{'pass ' + name:<22}{embedded:>12} embedded{time.perf_counter() - start:>12.2f}s")
+    await test_engine.dispose()
+
+
+def run(args: argparse.Namespace) -> None:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+    with db_engine.connect() as conn:
+        texts = [job_listing_text(row.title, row.description) for row in conn.execute(
+            select(JobListing.title, JobListing.description).where(PUBLISHED).limit(args.sample))]
+    db_engine.dispose()
+
+    embedder = load_embedder(args.embedder, args.dimensions)
+    embed_rate(embedder, texts[:args.batch_size], args.batch_size)  # warm up the feature hash cache
+    print(f"{embedder.fingerprint}: {args.dimensions * STORED_DTYPE.itemsize} bytes stored per vector")
+    print(f"{'texts per second':<22}{'one at a time':>20}{'batched':>20}")
+    print(f"{'embed':<22}{embed_rate(embedder, texts, 1):>20.0f}"
+          f"{embed_rate(embedder, texts, args.batch_size):>20.0f}\n")
+    asyncio.run(measure(args.database_url, embedder, args.batch_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_embeddings.db",
+                        help="sync URL of a scratch database; the async driver is derived from it")
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--sample", type=int, default=5000, help="listing texts the embedder rates are measured on")
+    parser.add_argument("--embedder", default="hashed_terms", help="EMBEDDER")
+    parser.add_argument("--dimensions", type=int, default=256, help="EMBEDDING_DIMENSIONS")
+    parser.add_argument("--batch-size", type=int, default=256, help="EMBEDDING_BATCH_SIZE")
+    run(parser.parse_args())
@@ -0,0 +1,144 @@
+"""
+Keyword search latency as the job listing corpus grows.
+
+For each corpus size, seeds synthetic listings (see bench_job_search.py) and plants each of a few rare terms in a
+fixed number of descriptions, then measures p95 latency of the first page of GET /job_listings/search?keyword=...
+(most relevant first) next to the substring scan keyword search used to be:
+
+    python scripts/bench_full_text_search.py [--sizes 10000,100000,1000000] [--database-url ...]
+
+Full-text search reads the index entries of the matching listings only and ranks no more than
+SEARCH_CANDIDATES_MAX of them. A rare term matches the same listings at every size, so its latency has to stay flat:
+the script exits with status 1 when its p95 at the largest size exceeds --tolerance times the smallest size. Common
+terms match a share of the corpus; their index entries are cheap to read but grow with it, so they are held to
+--budget-ms at the largest size instead. A common term in a small city reads matches newest first until enough
+are in the city (or state), which grows with the corpus; those are reported for reference. PostgreSQL can intersect
+the GIN and location index bitmaps instead, so measure it there with --database-url.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import bindparam, create_engine, func, or_, select, text
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+from app.db.enums import JobListingType
+from app.db.models import JobListing
+from app.db.models.job_listing import PUBLISHED
+from bench_job_search import CITIES, TITLE_JOBS, TITLE_ROLES, search_statement, seed
+
+RARE_TERMS = ["kubernetes", "haskell", "bioinformatics", "robotics", "fintech"]
+
+# Each kind of keyword search draws its criteria
+SEARCHES = {
+    "rare_term": lambda: {"keyword": random.choice(RARE_TERMS)},
+    "rare_and_common_term": lambda: {"keyword": f'"{random.choice(RARE_TERMS)}" {random.choice(TITLE_JOBS)}'},
+    # Only the newest SEARCH_CANDIDATES_MAX matches are read and ranked
+    "common_term": lambda: {"keyword": random.choice(TITLE_ROLES + TITLE_JOBS)},
+    "common_term_or_excluded": lambda: {"keyword": f"{random.choice(TITLE_ROLES)} or {random.choice(TITLE_ROLES)} "
+                                                   f"-{random.choice(TITLE_JOBS)}"},
+    # Matches are read newest first until enough are in the city or state, so a small one reads all of them
+    "common_term_small_city": lambda: {"keyword": random.choice(TITLE_JOBS), "city": random.choice(CITIES[-5:])[0]},
+    "common_term_state_type": lambda: {"keyword": random.choice(TITLE_JOBS),
+                                       "state_abbreviation": random.choice(CITIES)[1],
+                                       "type": random.choice(list(JobListingType))},
+}
+FLAT_SEARCHES = ["rare_term"]
+BUDGETED_SEARCHES = ["rare_term", "rare_and_common_term", "common_term", "common_term_or_excluded"]
+
+
+def plant_rare_terms(db_engine: Engine, matches: int) -> None:
+    """Append each rare term to `matches` random descriptions; the full-text index follows on its own"""
+    job_listings = JobListing.__table__
+    append_term = job_listings.update().where(job_listings.c.id == bindparam("job_listing_id")).values(
+        description=job_listings.c.description + bindparam("suffix"))
+    with db_engine.begin() as conn:
+        for term in RARE_TERMS:
+            ids = conn.execute(select(job_listings.c.id).order_by(func.random()).limit(matches)).scalars().all()
+            conn.execute(append_term, [{"job_listing_id": job_listing_id, "suffix": f" {term}"}
+                                       for job_listing_id in ids])
+        conn.execute(text("ANALYZE"))
+
+
+def substring_statement(term: str, limit: int):
+    """Keyword search before full-text indexing: a substring match over both columns, newest first"""
+    return (select(JobListing).where(PUBLISHED, or_(JobListing.title.icontains(term, autoescape=True),
+                                                    JobListing.description.icontains(term, autoescape=True)))
+            .order_by(JobListing.id.desc()).limit(limit + 1))
+
+
+def p95(db_engine: Engine, statements: list) -> float:
+    timings = []
+    with db_engine.connect() as conn:
+        conn.execute(statements[0]).fetchall()  # warm up caches
+        for statement in statements:
+            start = time.perf_counter()
+            conn.execute(statement).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return round(timings[int(len(timings) * 0.95) - 1], 3)
+
+
+def measure_size(database_url: str, listings: int, args: argparse.Namespace) -> dict:
+    db_engine = create_engine(database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, listings)
+    plant_rare_terms(db_engine, args.rare_matches)
+    print(f"Seeded {listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})")
+
+    results = {}
+    for name, make_criteria in SEARCHES.items():
+        results[name] = p95(db_engine, [search_statement(db_engine.dialect.name, make_criteria(), args.limit)
+                                        for _ in range(args.runs)])
+    results["substring_rare_term"] = p95(db_engine, [substring_statement(random.choice(RARE_TERMS), args.limit)
+                                                     for _ in range(max(args.runs // 10, 5))])
+    db_engine.dispose()
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {size: measure_size(args.database_url, size, args) for size in sizes}
+
+    print(f"\np95 ms by corpus size\n{'':<24}" + "".join(f"{size:>12}" for size in sizes))
+    for name in results[sizes[0]]:
+        print(f"{name:<24}" + "".join(f"{results[size][name]:>12.3f}" for size in sizes))
+
+    failures = []
+    for name in FLAT_SEARCHES:
+        smallest, largest = results[sizes[0]][name], results[sizes[-1]][name]
+        if largest > smallest * args.tolerance:
+            failures.append(f"{name}: p95 grew from {smallest}ms to {largest}ms")
+    for name in BUDGETED_SEARCHES:
+        if results[sizes[-1]][name] > args.budget_ms:
+            failures.append(f"{name}: p95 {results[sizes[-1]][name]}ms over the {args.budget_ms}ms budget")
+    print()
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        return 1
+    print(f"Rare term p95 within {args.tolerance}x from {sizes[0]} to {sizes[-1]} listings, "
+          f"keyword searches within {args.budget_ms}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated corpus sizes")
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--rare-matches", type=int, default=200, help="listings each rare term is planted in")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="page size, as GET /job_listings/search defaults to")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="allowed rare term p95 growth from the smallest size to the largest")
+    parser.add_argument("--budget-ms", type=float, default=50, help="maximum allowed p95 at the largest size")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,141 @@
+"""
+Radius search latency (GET /job_listings/search/nearby).
+
+Seeds synthetic listings (see bench_job_search.py), locates them with the gazetteer as the migration adding their
+coordinates does, then reports p50/p95 latency for drawn centers and radii of: JobListingRepository.search_nearby
+(one location index seek per gazetteer place in range, first page and a page five cursors deep), and the same
+first page from a bounding box on the location index with exact distances computed and sorted in SQL, its
+listings then loaded by id:
+
+    python scripts/bench_geo_search.py [--listings 200000] [--database-url ...]
+
+The bounding box query needs SQL math functions (PostgreSQL, or SQLite 3.35+ built with them).
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel
+from app.db.models import JobListing
+from app.db.models.job_listing import PUBLISHED
+from app.db.session import get_async_database_url
+from app.repositories.job_listing_repository import JobListingRepository
+from app.repositories.pagination import PageParams
+from app.search.gazetteer import EARTH_RADIUS_MILES, MILES_PER_DEGREE_LATITUDE, get_gazetteer
+from bench_job_search import CITIES, seed
+
+# Searches drawn per run: a seeded city as the center (so its listings are in range) and a radius in miles
+SEARCHES = {
+    "city_25mi": lambda: (random.choice(CITIES), 25, {}),
+    "metro_100mi": lambda: (random.choice(CITIES), 100, {}),
+    "region_250mi": lambda: (random.choice(CITIES), 250, {}),
+    "region_250mi_facet": lambda: (random.choice(CITIES), 250,
+                                   {"experience_level": random.choice(list(ExperienceLevel))}),
+}
+
+
+def locate(db_engine: Engine) -> None:
+    gazetteer = get_gazetteer()
+    with db_engine.begin() as conn:
+        for city, state in CITIES:
+            latitude, longitude = gazetteer.locate(city, state)
+            conn.execute(update(JobListing).where(JobListing.city == city, JobListing.state_abbreviation == state)
+                         .values(latitude=latitude, longitude=longitude))
+
+
+def bounding_box_statement(latitude: float, longitude: float, radius_miles: float, criteria: dict, limit: int):
+    """Every published listing in the radius's bounding box, measured exactly and sorted: the baseline"""
+    band = radius_miles / MILES_PER_DEGREE_LATITUDE
+    spread = band / max(math.cos(math.radians(latitude)), 0.01)
+    lat, lon = func.radians(JobListing.latitude), func.radians(JobListing.longitude)
+    center_lat, center_lon = math.radians(latitude), math.radians(longitude)
+    distance = EARTH_RADIUS_MILES * func.acos(func.min(1.0, math.sin(center_lat) * func.sin(lat) + math.cos(
+        center_lat) * func.cos(lat) * func.cos(lon - center_lon)))
+    stmt = select(JobListing.id, distance.label("distance")).where(
+        PUBLISHED, JobListing.latitude.between(latitude - band, latitude + band),
+        JobListing.longitude.between(longitude - spread, longitude + spread),
+        *(getattr(JobListing, name) == value for name, value in criteria.items()))
+    return stmt.where(distance <= radius_miles).order_by("distance", JobListing.id.desc()).limit(limit)
+
+
+async def timed(run, searches: list) -> str:
+    await run(searches[0])  # warm up caches
+    timings = []
+    for search in searches:
+        start = time.perf_counter()
+        await run(search)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return f"{statistics.median(timings):>9.3f}{timings[int(len(timings) * 0.95) - 1]:>9.3f}"
+
+
+async def measure(database_url: str, runs: int, limit: int) -> None:
+    gazetteer = get_gazetteer()
+    test_engine = create_async_engine(get_async_database_url(database_url))
+    async with AsyncSession(test_engine) as db:
+        repo = JobListingRepository(db)
+
+        async def first_page(search):
+            (city, state), radius_miles, criteria = search
+            places = gazetteer.within(*gazetteer.locate(city, state), radius_miles)
+            return await repo.search_nearby(PageParams(limit=limit), places, **criteria)
+
+        async def deep_page(search):
+            (city, state), radius_miles, criteria = search
+            places = gazetteer.within(*gazetteer.locate(city, state), radius_miles)
+            page = PageParams(limit=limit)
+            for _ in range(5):
+                page = PageParams(limit=limit, cursor=(await repo.search_nearby(page, places, **criteria)).next_cursor)
+            await repo.search_nearby(page, places, **criteria)
+
+        async def bounding_box(search):
+            (city, state), radius_miles, criteria = search
+            latitude, longitude = gazetteer.locate(city, state)
+            rows = await db.execute(bounding_box_statement(latitude, longitude, radius_miles, criteria, limit + 1))
+            await repo.get_published_by_ids([row.id for row in rows])
+
+        print(f"{'p50 / p95 ms':<22}{'places':>8}{'first page':>18}{'6th page':>18}{'bounding box':>18}")
+        for name, make_search in SEARCHES.items():
+            searches = [make_search() for _ in range(runs)]
+            places = statistics.mean(len(gazetteer.within(*gazetteer.locate(*search[0]), search[1]))
+                                     for search in searches)
+            print(f"{name:<22}{places:>8.1f}" + "".join([await timed(first_page, searches),
+                                                         await timed(deep_page, searches),
+                                                         await timed(bounding_box, searches)]))
+    await test_engine.dispose()
+
+
+def run(args: argparse.Namespace) -> None:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    locate(db_engine)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+    db_engine.dispose()
+    asyncio.run(measure(args.database_url, args.runs, args.limit))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_geo_search.db",
+                        help="sync URL of a scratch database; the async driver is derived from it")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20, help="page size, as the search endpoints default to")
+    run(parser.parse_args())
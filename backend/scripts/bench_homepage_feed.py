@@ -0,0 +1,91 @@
+"""
+Homepage feed latency (GET /job_listings/homepage).
+
+Seeds synthetic listings (see bench_job_search.py; 2% are featured), then reports p50/p95 latency of the homepage's
+featured and newest published listings three ways: two board pages read and serialized as GET /job_listings serves
+them (?status=published&is_featured=true and ?status=published), the precomputed feed loaded from the database
+(what a stale feed costs, once per HOMEPAGE_FEED_TTL_SECONDS), and the feed served from memory:
+
+    python scripts/bench_homepage_feed.py [--listings 200000] [--database-url ...]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import JobListingStatus
+from app.db.session import get_async_database_url
+from app.repositories.pagination import PageParams
+from app.schemas.job_listing import JobListingResponse
+from app.schemas.pagination import Page
+from app.search.facet_cache import FacetCache
+from app.search.homepage_feed import HomepageFeed
+from app.search.job_listing_index import JobListingIndex
+from app.services.job_listing_service import JobListingService
+from bench_job_search import seed
+
+
+async def timed(run, runs: int) -> str:
+    await run()  # warm up caches
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return f"{statistics.median(timings):>10.3f}{timings[int(len(timings) * 0.95) - 1]:>10.3f}"
+
+
+async def measure(database_url: str, runs: int, featured_limit: int, recent_limit: int) -> None:
+    test_engine = create_async_engine(get_async_database_url(database_url))
+    async with AsyncSession(test_engine) as db:
+        homepage_feed = HomepageFeed(featured_limit, recent_limit, ttl_seconds=3600)
+        service = JobListingService(db, JobListingIndex(), FacetCache(1, 1), homepage_feed)
+        page_type = Page[JobListingResponse]
+
+        async def board_pages():
+            for limit, filters in [(featured_limit, {"status": JobListingStatus.PUBLISHED, "is_featured": True}),
+                                   (recent_limit, {"status": JobListingStatus.PUBLISHED})]:
+                page = await service.get_job_listings_page(PageParams(limit=limit), filters)
+                page_type.model_validate(page).model_dump_json()
+
+        async def feed_load():
+            homepage_feed.invalidate()
+            await service.get_homepage_feed()
+
+        print(f"{'p50 / p95 ms':<22}{'board pages':>20}{'feed load':>20}{'feed served':>20}")
+        print(f"{'homepage':<22}" + "".join([await timed(board_pages, runs), await timed(feed_load, runs),
+                                             await timed(service.get_homepage_feed, runs)]))
+    await test_engine.dispose()
+
+
+def run(args: argparse.Namespace) -> None:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+    db_engine.dispose()
+    asyncio.run(measure(args.database_url, args.runs, args.featured_limit, args.recent_limit))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_homepage_feed.db",
+                        help="sync URL of a scratch database; the async driver is derived from it")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--featured-limit", type=int, default=6, help="HOMEPAGE_FEATURED_LIMIT")
+    parser.add_argument("--recent-limit", type=int, default=20, help="HOMEPAGE_RECENT_LIMIT")
+    run(parser.parse_args())
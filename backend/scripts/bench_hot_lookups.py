@@ -0,0 +1,78 @@
+"""
+Microbenchmark for the hot primary-key lookups on the auth path.
+
+Compares the legacy `db.query(...).filter(...).first()` form with the pre-built statements used by
+UserRepository. Runs against an in-memory SQLite database so it needs no configuration:
+
+    python scripts/bench_hot_lookups.py [--users 5000] [--calls 20000]
+"""
+import argparse
+import itertools
+import random
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.models import User
+from app.repositories.user_repository import GET_USER_BY_CLERK_ID, GET_USER_BY_ID
+
+
+def seed_users(db: Session, count: int) -> list[User]:
+    users = [
+        User(id=str(uuid.uuid4()), clerk_id=f"user_{uuid.uuid4().hex}", email=f"user{index}@example.com",
+             image_url="http://example.com/avatar.jpg")
+        for index in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def run(users: int, calls: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        seeded = seed_users(db, users)
+        samples = [random.choice(seeded) for _ in range(calls)]
+        user_ids = [user.id for user in samples]
+        clerk_ids = [user.clerk_id for user in samples]
+        db.expunge_all()
+
+        cases = {
+            "get_by_id (ORM query)": lambda i: db.query(User).filter(User.id == user_ids[i]).first(),
+            "get_by_id (pre-built)": lambda i: db.execute(GET_USER_BY_ID, {"user_id": user_ids[i]}).scalars().first(),
+            "get_by_clerk_id (ORM query)": lambda i: db.query(User).filter(User.clerk_id == clerk_ids[i]).first(),
+            "get_by_clerk_id (pre-built)": lambda i: db.execute(
+                GET_USER_BY_CLERK_ID, {"clerk_id": clerk_ids[i]}).scalars().first(),
+        }
+
+        print(f"{users} users, {calls} lookups per case\n")
+        results = {}
+        for name, lookup in cases.items():
+            lookup(0)  # warm up the compiled cache
+            indexes = itertools.cycle(range(calls))
+            elapsed = min(timeit.repeat(lambda: lookup(next(indexes)), number=calls, repeat=3))
+            results[name] = elapsed / calls * 1_000_000
+            print(f"{name:<32} {results[name]:8.1f} us/call")
+
+        print()
+        for lookup_name in ("get_by_id", "get_by_clerk_id"):
+            legacy = results[f"{lookup_name} (ORM query)"]
+            prebuilt = results[f"{lookup_name} (pre-built)"]
+            print(f"{lookup_name}: saves {legacy - prebuilt:.1f} us/call ({legacy / prebuilt:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.users, args.calls)
@@ -0,0 +1,115 @@
+"""
+Keyword search in the in-memory inverted index against the database full-text search.
+
+Seeds synthetic listings (see bench_job_search.py) with a few rare terms planted in their descriptions (see
+bench_full_text_search.py), builds the index from the published ones, then reports p50/p95 latency of the same
+keyword searches run three ways: ranked in the index alone, ranked in the index plus loading the page of listings
+by id (what GET /job_listings/search/instant does), and the first page of GET /job_listings/search:
+
+    python scripts/bench_inverted_index.py [--listings 200000] [--database-url ...]
+
+The script exits with status 1 when ranking in the index has a higher p95 than the database for any search.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+from app.db.models import JobListing
+from app.db.models.job_listing import PUBLISHED
+from app.repositories.job_listing_repository import SEARCH_DOCUMENTS
+from app.search.inverted_index import InvertedIndex
+from app.search.job_listing_index import FIELD_WEIGHTS
+from bench_full_text_search import RARE_TERMS, plant_rare_terms
+from bench_job_search import TITLE_JOBS, TITLE_ROLES, search_statement, seed
+
+# Keyword searches, drawn at random per run
+SEARCHES = {
+    "rare_term": lambda: random.choice(RARE_TERMS),
+    "rare_and_common_term": lambda: f"{random.choice(RARE_TERMS)} {random.choice(TITLE_JOBS)}",
+    "common_term": lambda: random.choice(TITLE_ROLES + TITLE_JOBS),
+    "two_common_terms": lambda: f"{random.choice(TITLE_ROLES)} {random.choice(TITLE_JOBS)}",
+    "common_term_or_excluded": lambda: f"{random.choice(TITLE_ROLES)} or {random.choice(TITLE_ROLES)} "
+                                       f"-{random.choice(TITLE_JOBS)}",
+}
+
+
+def build_index(db_engine: Engine) -> InvertedIndex:
+    index = InvertedIndex(FIELD_WEIGHTS)
+    with db_engine.connect() as conn:
+        for row in conn.execute(SEARCH_DOCUMENTS.where(PUBLISHED).execution_options(yield_per=10_000)).mappings():
+            index.add(row["id"], {"title": row["title"], "description": row["description"]})
+    return index
+
+
+def timed(run, queries: list[str]) -> dict:
+    run(queries[0])  # warm up caches
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        run(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50_ms": round(statistics.median(timings), 3), "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3)}
+
+
+def run(args: argparse.Namespace) -> int:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    plant_rare_terms(db_engine, args.rare_matches)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})")
+
+    start = time.perf_counter()
+    index = build_index(db_engine)
+    print(f"Indexed {len(index)} published listings in {time.perf_counter() - start:.1f}s, "
+          f"{index.memory_bytes() / 2 ** 20:.1f} MiB of arrays\n")
+
+    dialect_name = db_engine.dialect.name
+    slower = []
+    with db_engine.connect() as conn:
+        def load_page(query):
+            ids = [job_listing_id for job_listing_id, _ in index.search(query, args.limit)]
+            conn.execute(JobListing.__table__.select().where(JobListing.id.in_(ids), PUBLISHED)).fetchall()
+
+        def database(query):
+            conn.execute(search_statement(dialect_name, {"keyword": query}, args.limit)).fetchall()
+
+        print(f"{'p50 / p95 ms':<26}{'index':>20}{'index + load':>20}{'database':>20}")
+        for name, make_query in SEARCHES.items():
+            queries = [make_query() for _ in range(args.runs)]
+            results = [timed(lambda query: index.search(query, args.limit), queries), timed(load_page, queries),
+                       timed(database, queries)]
+            print(f"{name:<26}" + "".join(f"{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}" for result in results))
+            if results[0]["p95_ms"] > results[2]["p95_ms"]:
+                slower.append(name)
+    db_engine.dispose()
+
+    print()
+    if slower:
+        print(f"Index p95 above the database for: {', '.join(slower)}")
+        return 1
+    print("Index p95 below the database for every search")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--rare-matches", type=int, default=200, help="listings each rare term is planted in")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="page size, as the search endpoints default to")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+Facet count latency for the job board sidebar (GET /job_listings/facets).
+
+Seeds synthetic listings (see bench_job_search.py) and reports p50/p95 latency for drawn filter sets of: one
+COUNT(*) GROUP BY per facet, the single grouped pass JobListingRepository.facet_counts runs plus its roll-up, and
+a hit in the facet cache:
+
+    python scripts/bench_job_facets.py [--listings 200000] [--database-url ...]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingType
+from app.db.session import get_async_database_url
+from app.repositories.job_listing_repository import FACET_COLUMNS, JobListingRepository
+from app.search.facet_cache import FacetCache
+from app.search.job_listing_index import JobListingIndex
+from app.services.job_listing_service import JobListingService
+from bench_job_search import CITIES, seed
+
+# Filter sets a sidebar is shown for, drawn at random per run
+FILTER_SETS = {
+    "no_filters": lambda: {},
+    "state": lambda: {"state_abbreviation": random.choice(CITIES)[1]},
+    "facets": lambda: {"experience_level": random.choice(list(ExperienceLevel)),
+                       "type": random.choice(list(JobListingType))},
+}
+
+
+async def p95(run, criteria_list: list[dict]) -> str:
+    await run(criteria_list[0])  # warm up caches
+    timings = []
+    for criteria in criteria_list:
+        start = time.perf_counter()
+        await run(criteria)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return f"{statistics.median(timings):>9.3f}{timings[int(len(timings) * 0.95) - 1]:>9.3f}"
+
+
+async def measure(database_url: str, runs: int) -> None:
+    test_engine = create_async_engine(get_async_database_url(database_url))
+    async with AsyncSession(test_engine, expire_on_commit=False) as db:
+        repo = JobListingRepository(db)
+        cache = FacetCache(max_entries=1024, ttl_seconds=3600)
+        service = JobListingService(db, JobListingIndex(), cache)
+
+        async def group_by_each_facet(criteria):
+            filters, conditions, _ = repo.search_clauses(db.bind.dialect.name, **criteria)
+            for facet in FACET_COLUMNS:
+                grouped = repo._filtered(select(facet, func.count()), filters).where(*conditions)
+                await db.execute(grouped.group_by(literal_column(facet.name) if facet.key == "wage_band" else facet))
+
+        async def uncached(criteria):
+            cache.invalidate()
+            await service.get_job_listing_facets(**criteria)
+
+        async def cached(criteria):
+            await service.get_job_listing_facets(**criteria)
+
+        print(f"{'p50 / p95 ms':<14}{'per facet':>18}{'one pass':>18}{'cached':>18}")
+        for name, make_criteria in FILTER_SETS.items():
+            criteria_list = [make_criteria() for _ in range(runs)]
+            uncached_timings = await p95(uncached, criteria_list)
+            for criteria in criteria_list:
+                await cached(criteria)  # every filter set cached before cache hits are timed
+            print(f"{name:<14}" + "".join([await p95(group_by_each_facet, criteria_list), uncached_timings,
+                                            await p95(cached, criteria_list)]))
+    await test_engine.dispose()
+
+
+def run(args: argparse.Namespace) -> None:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+    db_engine.dispose()
+    asyncio.run(measure(args.database_url, args.runs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_job_facets.db",
+                        help="sync URL of a scratch database; the async driver is derived from it")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,198 @@
+"""
+Latency benchmark for structured job listing search (GET /job_listings/search).
+
+Seeds a million synthetic listings with realistic city, state and wage distributions, then runs randomly drawn
+combinations of search criteria through the statement JobListingRepository.search executes and reports p50/p95
+latency for each kind of search along with its query plan. Runs against an in-memory SQLite database by default;
+pass --database-url to measure PostgreSQL (the schema is created in that database, so point it at a scratch
+database):
+
+    python scripts/bench_job_search.py [--listings 1000000] [--budget-ms 50]
+
+The script exits with status 1 when any search's p95 latency exceeds --budget-ms.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+from app.db.enums import ExperienceLevel, JobListingStatus, JobListingType, LocationRequirement, WageInterval
+from app.db.models import JobListing, Organization
+from app.db.types import uuid7
+from app.repositories.job_listing_repository import JobListingRepository
+from app.repositories.pagination import PageParams
+from bench_query_plans import explain, uses_full_scan
+
+# (city, state) pairs; listings are spread over them with Zipf-like weights, so a few metros dominate
+CITIES = [
+    ("New York", "NY"), ("San Francisco", "CA"), ("Los Angeles", "CA"), ("Seattle", "WA"), ("Austin", "TX"),
+    ("Chicago", "IL"), ("Boston", "MA"), ("Denver", "CO"), ("Atlanta", "GA"), ("Dallas", "TX"),
+    ("San Diego", "CA"), ("Portland", "OR"), ("Miami", "FL"), ("Phoenix", "AZ"), ("Minneapolis", "MN"),
+    ("Philadelphia", "PA"), ("Houston", "TX"), ("Raleigh", "NC"), ("Nashville", "TN"), ("Salt Lake City", "UT"),
+    ("Pittsburgh", "PA"), ("Columbus", "OH"), ("Detroit", "MI"), ("Kansas City", "MO"), ("Madison", "WI"),
+    ("Boise", "ID"), ("Albuquerque", "NM"), ("Omaha", "NE"), ("Burlington", "VT"), ("Cheyenne", "WY"),
+]
+CITY_WEIGHTS = [1 / rank for rank in range(1, len(CITIES) + 1)]
+TITLE_LEVELS = ["Junior", "Senior", "Staff", "Lead", "Principal", ""]
+TITLE_ROLES = ["Backend", "Frontend", "Data", "Platform", "Mobile", "Security", "Product", "Marketing", "Sales"]
+TITLE_JOBS = ["Engineer", "Developer", "Analyst", "Designer", "Manager", "Scientist", "Specialist"]
+WAGE_RANGES = {WageInterval.YEARLY: (30_000, 250_000), WageInterval.HOURLY: (15, 120)}
+# Description words follow a Zipf-like distribution over a vocabulary of common job ad words and rarer filler
+DESCRIPTION_WORDS = [
+    "team", "experience", "work", "build", "customers", "product", "years", "skills", "support", "design",
+    "develop", "systems", "data", "communication", "benefits", "remote", "growth", "cloud", "python", "javascript",
+    "sql", "leadership", "agile", "testing", "security", "analytics", "mentor", "roadmap", "stakeholders", "apis",
+    *(f"term{index}" for index in range(5000)),
+]
+DESCRIPTION_WEIGHTS = [1 / rank for rank in range(1, len(DESCRIPTION_WORDS) + 1)]
+
+# Each kind of search draws the criteria it sets; the rest stay unset. Keyword searches are measured by
+# bench_full_text_search.py.
+SEARCHES = {
+    "newest": lambda: {},
+    "city": lambda: {"city": random.choice(CITIES)[0].lower()},
+    "state": lambda: {"state_abbreviation": random.choice(CITIES)[1]},
+    "facets": lambda: {"experience_level": random.choice(list(ExperienceLevel)),
+                       "type": random.choice(list(JobListingType)),
+                       "location_requirement": random.choice(list(LocationRequirement))},
+    "wage_floor": lambda: _wage_bounds(upper=False),
+    "wage_range": lambda: _wage_bounds(upper=True),
+    "city_facets_wage": lambda: {"city": random.choice(CITIES)[0],
+                                 "experience_level": random.choice(list(ExperienceLevel)),
+                                 "location_requirement": random.choice(list(LocationRequirement)),
+                                 **_wage_bounds(upper=False)},
+    "state_facets": lambda: {"state_abbreviation": random.choice(CITIES)[1],
+                             "experience_level": random.choice(list(ExperienceLevel)),
+                             "type": random.choice(list(JobListingType))},
+    "everything": lambda: {"city": random.choice(CITIES)[0],
+                           "experience_level": random.choice(list(ExperienceLevel)),
+                           "type": random.choice(list(JobListingType)),
+                           "location_requirement": random.choice(list(LocationRequirement)),
+                           **_wage_bounds(upper=True)},
+}
+
+
+def _wage_bounds(upper: bool) -> dict:
+    wage_interval = random.choices(list(WAGE_RANGES), weights=[85, 15])[0]
+    low, high = WAGE_RANGES[wage_interval]
+    min_wage = random.randint(low, high)
+    bounds = {"wage_interval": wage_interval, "min_wage": min_wage}
+    if upper:
+        bounds["max_wage"] = min_wage + (high - low) // 5
+    return bounds
+
+
+def _listing(job_listing_id: uuid.UUID, organization_ids: list[str], now: datetime) -> dict:
+    remote = random.random() < 0.2
+    city, state = (None, None) if remote else random.choices(CITIES, weights=CITY_WEIGHTS)[0]
+    wage_interval = random.choices(list(WAGE_RANGES), weights=[85, 15])[0]
+    has_wage = random.random() < 0.7
+    return {
+        "id": job_listing_id, "organization_id": random.choice(organization_ids),
+        "title": " ".join(filter(None, [random.choice(TITLE_LEVELS), random.choice(TITLE_ROLES),
+                                        random.choice(TITLE_JOBS)])),
+        "description": " ".join(random.choices(DESCRIPTION_WORDS, weights=DESCRIPTION_WEIGHTS, k=30)),
+        "city": city, "state_abbreviation": state,
+        "wage": random.randint(*WAGE_RANGES[wage_interval]) if has_wage else None,
+        "wage_interval": wage_interval if has_wage else None, "is_featured": random.random() < 0.02,
+        "location_requirement": LocationRequirement.REMOTE if remote else random.choice(list(LocationRequirement)),
+        "experience_level": random.choice(list(ExperienceLevel)),
+        "status": random.choices(list(JobListingStatus), weights=[10, 80, 10])[0],
+        "type": random.choice(list(JobListingType)),
+        "posted_at": now - timedelta(minutes=random.randint(0, 525_600)), "created_at": now, "updated_at": now,
+    }
+
+
+def seed(db_engine: Engine, organizations: int, listings: int, batch_size: int = 10_000) -> None:
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    organization_ids = [str(uuid.uuid4()) for _ in range(organizations)]
+    with db_engine.begin() as conn:
+        conn.execute(insert(Organization.__table__), [
+            {"id": organization_id, "name": f"Organization {index}", "created_at": now, "updated_at": now}
+            for index, organization_id in enumerate(organization_ids)
+        ])
+        # Rows are generated a batch at a time so a million listings never sit in memory together
+        for start in range(0, listings, batch_size):
+            conn.execute(insert(JobListing.__table__), [
+                _listing(uuid7(), organization_ids, now) for _ in range(min(batch_size, listings - start))])
+        # Fresh statistics so the planner sees the real row counts
+        conn.execute(text("ANALYZE"))
+
+
+def search_statement(dialect_name: str, criteria: dict, limit: int):
+    """The first page query JobListingRepository.search runs for these criteria"""
+    repo = JobListingRepository(None)
+    params = PageParams(limit=limit, sort="-relevance" if criteria.get("keyword") else None)
+    return repo._page_statement(params, *repo.search_clauses(dialect_name, **criteria))[0]
+
+
+def measure(db_engine: Engine, runs: int, limit: int) -> dict:
+    results = {}
+    with db_engine.connect() as conn:
+        for name, make_criteria in SEARCHES.items():
+            statements = [search_statement(db_engine.dialect.name, make_criteria(), limit) for _ in range(runs)]
+            plan = explain(conn, statements[0], {})
+            conn.execute(statements[0]).fetchall()  # warm up caches
+            timings = []
+            for statement in statements:
+                start = time.perf_counter()
+                conn.execute(statement).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                "plan": plan,
+                "full_scan": uses_full_scan(plan),
+                "p50_ms": round(statistics.median(timings), 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            }
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+
+    results = measure(db_engine, args.runs, args.limit)
+    over_budget = []
+    for name, result in results.items():
+        flag = "  OVER BUDGET" if result["p95_ms"] > args.budget_ms else ""
+        print(f"{name:<22} p50 {result['p50_ms']:8.3f}ms  p95 {result['p95_ms']:8.3f}ms{flag}")
+        for line in result["plan"]:
+            print(f"    {line}")
+        if flag:
+            over_budget.append(name)
+
+    print()
+    if over_budget:
+        print(f"p95 over the {args.budget_ms}ms budget: {', '.join(over_budget)}")
+        return 1
+    print(f"Every search stays within the {args.budget_ms}ms p95 budget")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="page size, as GET /job_listings/search defaults to")
+    parser.add_argument("--budget-ms", type=float, default=50, help="maximum allowed p95 latency per search")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,237 @@
+"""
+Query-plan and latency benchmark for the job listing and application access paths.
+
+Seeds a large synthetic dataset, then records the EXPLAIN plan and p50/p95 latency of each access path.
+Runs against an in-memory SQLite database by default; pass --database-url to measure PostgreSQL
+(the schema is created in that database, so point it at a scratch database):
+
+    python scripts/bench_query_plans.py [--listings 50000] [--applications 200000] [--output plans.json]
+
+Compare a run against a saved one to make regressions visible. The script exits with status 1 when a plan
+changes to a full scan or a p95 latency grows beyond --tolerance times the baseline:
+
+    python scripts/bench_query_plans.py --baseline plans.json
+
+--drop-indexes measures the same queries without the access path indexes.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import bindparam, create_engine, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import Base
+from app.db.enums import (ApplicationStage, ExperienceLevel, JobListingStatus, JobListingType,
+                          LocationRequirement)
+from app.db.models import JobListing, JobListingApplication, Organization, User
+from app.config.settings import get_settings
+from app.db.types import uuid7
+from app.repositories.job_listing_repository import NEWEST_FEATURED, NEWEST_PUBLISHED
+from app.search.homepage_feed import CAPACITY_FACTOR
+
+ACCESS_PATH_INDEXES = [
+    "ix_job_listings_published_posted_at",
+    "ix_job_listings_organization_id_status",
+    "ix_job_listings_featured_posted_at",
+    "ix_job_listing_applications_user_id_created_at",
+    "ix_job_listing_applications_job_listing_id_stage",
+]
+
+# Each access path with a function drawing its parameters from the seeded ids
+ACCESS_PATHS = {
+    # The homepage feed's reads, as JobListingRepository.get_newest_published makes them
+    "published_recent": (
+        NEWEST_PUBLISHED.limit(get_settings().HOMEPAGE_RECENT_LIMIT * CAPACITY_FACTOR),
+        lambda ids: {},
+    ),
+    # GET /job_listings past a random cursor: a primary key seek however deep the page
+    "listings_keyset_page": (
+        select(JobListing.id, JobListing.title, JobListing.posted_at)
+        .where(JobListing.id < bindparam("last_id")).order_by(JobListing.id.desc()).limit(21),
+        lambda ids: {"last_id": random.choice(ids["job_listings"])},
+    ),
+    "organization_by_status": (
+        select(JobListing.id, JobListing.title, JobListing.posted_at)
+        .where(JobListing.organization_id == bindparam("organization_id"),
+               JobListing.status == bindparam("status"))
+        .order_by(JobListing.posted_at.desc()).limit(50),
+        lambda ids: {"organization_id": random.choice(ids["organizations"]),
+                     "status": random.choice(list(JobListingStatus))},
+    ),
+    "featured": (
+        NEWEST_FEATURED.limit(get_settings().HOMEPAGE_FEATURED_LIMIT * CAPACITY_FACTOR),
+        lambda ids: {},
+    ),
+    "applications_by_user": (
+        select(JobListingApplication.job_listing_id, JobListingApplication.stage, JobListingApplication.created_at)
+        .where(JobListingApplication.user_id == bindparam("user_id"))
+        .order_by(JobListingApplication.created_at.desc()).limit(50),
+        lambda ids: {"user_id": random.choice(ids["users"])},
+    ),
+    "applications_by_stage": (
+        select(JobListingApplication.user_id, JobListingApplication.rating)
+        .where(JobListingApplication.job_listing_id == bindparam("job_listing_id"),
+               JobListingApplication.stage == bindparam("stage")),
+        lambda ids: {"job_listing_id": random.choice(ids["job_listings"]),
+                     "stage": random.choice(list(ApplicationStage))},
+    ),
+}
+
+
+def _insert_batches(conn: Connection, table, rows: list[dict], batch_size: int = 5000) -> None:
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(table), rows[start:start + batch_size])
+
+
+def seed(db_engine: Engine, organizations: int, users: int, listings: int, applications: int) -> dict:
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    ids = {
+        "organizations": [str(uuid.uuid4()) for _ in range(organizations)],
+        "users": [str(uuid.uuid4()) for _ in range(users)],
+        "job_listings": [uuid7() for _ in range(listings)],
+    }
+    with db_engine.begin() as conn:
+        _insert_batches(conn, Organization.__table__, [
+            {"id": organization_id, "name": f"Organization {index}", "created_at": now, "updated_at": now}
+            for index, organization_id in enumerate(ids["organizations"])
+        ])
+        _insert_batches(conn, User.__table__, [
+            {"id": user_id, "clerk_id": f"user_{user_id}", "email": f"user{index}@example.com",
+             "image_url": "http://example.com/avatar.jpg", "created_at": now, "updated_at": now}
+            for index, user_id in enumerate(ids["users"])
+        ])
+        _insert_batches(conn, JobListing.__table__, [
+            {"id": job_listing_id, "organization_id": random.choice(ids["organizations"]),
+             "title": f"Job {index}", "description": "Synthetic listing", "wage": random.randint(20, 200) * 1000,
+             "is_featured": random.random() < 0.02,
+             "location_requirement": random.choice(list(LocationRequirement)),
+             "experience_level": random.choice(list(ExperienceLevel)),
+             "status": random.choices(list(JobListingStatus), weights=[10, 80, 10])[0],
+             "type": random.choice(list(JobListingType)),
+             "posted_at": now - timedelta(minutes=random.randint(0, 525_600)), "created_at": now, "updated_at": now}
+            for index, job_listing_id in enumerate(ids["job_listings"])
+        ])
+        pairs = set()
+        while len(pairs) < min(applications, listings * users):
+            pairs.add((random.choice(ids["job_listings"]), random.choice(ids["users"])))
+        _insert_batches(conn, JobListingApplication.__table__, [
+            {"job_listing_id": job_listing_id, "user_id": user_id, "stage": random.choice(list(ApplicationStage)),
+             "created_at": now - timedelta(minutes=random.randint(0, 525_600)), "updated_at": now}
+            for job_listing_id, user_id in pairs
+        ])
+        # Fresh statistics so the planner sees the real row counts
+        conn.execute(text("ANALYZE"))
+    return ids
+
+
+def explain(conn: Connection, statement, params: dict) -> list[str]:
+    # Plans are taken with literal values so PostgreSQL plans for the actual parameters
+    sql = str(statement.params(**params).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+
+
+def uses_full_scan(plan: list[str]) -> bool:
+    """A table read without any index: SQLite 'SCAN <table>' or PostgreSQL 'Seq Scan'"""
+    for line in plan:
+        if "Seq Scan" in line:
+            return True
+        if line.startswith("SCAN ") and "USING" not in line:
+            return True
+    return False
+
+
+def measure(db_engine: Engine, ids: dict, runs: int) -> dict:
+    results = {}
+    with db_engine.connect() as conn:
+        for name, (statement, make_params) in ACCESS_PATHS.items():
+            plan = explain(conn, statement, make_params(ids))
+            conn.execute(statement, make_params(ids)).fetchall()  # warm up caches
+            timings = []
+            for _ in range(runs):
+                params = make_params(ids)
+                start = time.perf_counter()
+                conn.execute(statement, params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                "plan": plan,
+                "full_scan": uses_full_scan(plan),
+                "p50_ms": round(statistics.median(timings), 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            }
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["full_scan"] and not previous["full_scan"]:
+            regressions.append(f"{name}: plan changed to a full scan")
+        if result["p95_ms"] > previous["p95_ms"] * tolerance:
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+    return regressions
+
+
+def run(args: argparse.Namespace) -> int:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    if args.drop_indexes:
+        with db_engine.begin() as conn:
+            for index_name in ACCESS_PATH_INDEXES:
+                conn.execute(text(f"DROP INDEX {index_name}"))
+
+    start = time.perf_counter()
+    ids = seed(db_engine, args.organizations, args.users, args.listings, args.applications)
+    print(f"Seeded {args.listings} listings and {args.applications} applications "
+          f"in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})\n")
+
+    results = measure(db_engine, ids, args.runs)
+    for name, result in results.items():
+        flag = "  FULL SCAN" if result["full_scan"] else ""
+        print(f"{name:<24} p50 {result['p50_ms']:8.3f}ms  p95 {result['p95_ms']:8.3f}ms{flag}")
+        for line in result["plan"]:
+            print(f"    {line}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        print()
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--organizations", type=int, default=500)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--listings", type=int, default=50000)
+    parser.add_argument("--applications", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--output", help="write plans and latencies to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from a previous --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed p95 growth factor over the baseline")
+    parser.add_argument("--drop-indexes", action="store_true", help="measure without the access path indexes")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,140 @@
+"""
+Job recommendations (GET /users/me/recommendations) from the IVF-flat recommendation index against exact search.
+
+Seeds synthetic listings (see bench_job_search.py), embeds the published ones through the embedding pipeline and
+builds the recommendation index from them as a worker does at startup, reporting build time, lists and memory, and
+how long the index takes to save and to load. Then, for synthetic resume summaries, it reports recall@k and p50/p95
+latency of the index at several probe counts against exact search, a matrix-vector product over every listing
+vector followed by a top-k selection, and the latency of applying a listing written by the worker (embedding it
+and moving it between lists). An approximate hit counts when it scores at least the exact k-th score, as scores
+tie often on synthetic text:
+
+    python scripts/bench_recommendations.py [--listings 200000] [--database-url ...]
+
+Seeded descriptions are independent draws from one word distribution, without topics, so every listing is about
+equally far from a summary and the closest ones are spread over many lists: a worst case for an inverted file index.
+Text that clusters by role, as real listings and resumes do, reaches the same recall with fewer probes.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Sequence
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.enums import JobListingStatus
+from app.db.models import JobListing
+from app.db.session import get_async_database_url
+from app.search.embeddings import load_embedder
+from app.search.recommendation_index import JobRecommendationIndex
+from app.services.embedding_service import EmbeddingService
+from bench_job_search import DESCRIPTION_WEIGHTS, DESCRIPTION_WORDS, TITLE_JOBS, TITLE_LEVELS, TITLE_ROLES, seed
+
+PROBES = [1, 4, 16, 32, 64, 128]
+
+
+def resume_summary() -> str:
+    title = " ".join(filter(None, [random.choice(TITLE_LEVELS), random.choice(TITLE_ROLES),
+                                   random.choice(TITLE_JOBS)]))
+    return f"{title} with " + " ".join(random.choices(DESCRIPTION_WORDS, weights=DESCRIPTION_WEIGHTS, k=20))
+
+
+def timed(run, queries: Sequence) -> tuple[list, str]:
+    run(queries[0])  # warm up caches
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(run(query))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return results, f"{statistics.median(timings):>10.3f}{timings[int(len(timings) * 0.95) - 1]:>10.3f}"
+
+
+async def build(database_url: str, embedder, probes: int) -> JobRecommendationIndex:
+    test_engine = create_async_engine(get_async_database_url(database_url))
+    async with AsyncSession(test_engine) as db:
+        start = time.perf_counter()
+        embedded, _ = await EmbeddingService(db, embedder).sync_job_listings()
+        print(f"Embedded {embedded} published listings in {time.perf_counter() - start:.1f}s")
+        recommendation_index = JobRecommendationIndex(None, probes, embedder)
+        start = time.perf_counter()
+        await recommendation_index.build(db)
+        index = recommendation_index.index
+        print(f"Built the index in {time.perf_counter() - start:.1f}s: {len(index)} listings in "
+              f"{len(index.list_sizes())} lists, {index.memory_bytes() / 2 ** 20:.1f} MiB of vectors")
+    await test_engine.dispose()
+    return recommendation_index
+
+
+def run(args: argparse.Namespace) -> None:
+    db_engine = create_engine(args.database_url)
+    Base.metadata.drop_all(db_engine)
+    Base.metadata.create_all(db_engine)
+    start = time.perf_counter()
+    seed(db_engine, args.organizations, args.listings)
+    print(f"Seeded {args.listings} listings in {time.perf_counter() - start:.1f}s ({db_engine.dialect.name})")
+    db_engine.dispose()
+
+    embedder = load_embedder(args.embedder, args.dimensions)
+    recommendation_index = asyncio.run(build(args.database_url, embedder, args.probes))
+    with tempfile.TemporaryDirectory() as directory:
+        recommendation_index.path = Path(directory) / "recommendation_index.npz"
+        start = time.perf_counter()
+        recommendation_index.save(recommendation_index.snapshot())
+        saved = time.perf_counter() - start
+        loaded = JobRecommendationIndex(str(recommendation_index.path), args.probes, embedder)
+        start = time.perf_counter()
+        loaded.load()
+        print(f"Saved in {saved:.2f}s ({recommendation_index.path.stat().st_size / 2 ** 20:.1f} MiB), "
+              f"loaded in {time.perf_counter() - start:.2f}s\n")
+
+    index = recommendation_index.index
+    keys, vectors = index.items()
+    random.seed(7)
+    queries = embedder.embed([resume_summary() for _ in range(args.queries)])
+
+    def exact(query):
+        scores = vectors @ query
+        top = np.argpartition(scores, -args.k)[-args.k:]
+        return scores[top[np.argsort(-scores[top])]]
+
+    exact_scores, exact_timing = timed(exact, queries)
+    print(f"{'p50 / p95 ms':<22}{'latency':>20}{'recall@' + str(args.k):>12}")
+    print(f"{'exact':<22}{exact_timing}{1:>12.3f}")
+    for probes in sorted(set(PROBES + [args.probes])):
+        found, timing = timed(lambda query: index.search(query, args.k, probes), queries)
+        hits = sum(sum(score >= expected[-1] - 1e-6 for _, score in result)
+                   for result, expected in zip(found, exact_scores))
+        print(f"{f'probes={probes}':<22}{timing}{hits / (len(queries) * args.k):>12.3f}")
+
+    # A worker's own write: a published listing embedded and re-filed
+    listing_ids = random.sample(keys, min(1000, len(keys)))
+    job_listings = [JobListing(id=listing_id, title=resume_summary(), description=resume_summary(),
+                               status=JobListingStatus.PUBLISHED) for listing_id in listing_ids]
+    _, write_timing = timed(lambda job_listing: recommendation_index.put([job_listing]), job_listings)
+    print(f"{'write':<22}{write_timing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_recommendations.db",
+                        help="sync URL of a scratch database; the async driver is derived from it")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--organizations", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=20, help="recommendations per request (PAGE_SIZE_DEFAULT)")
+    parser.add_argument("--embedder", default="hashed_terms", help="EMBEDDER")
+    parser.add_argument("--dimensions", type=int, default=256, help="EMBEDDING_DIMENSIONS")
+    parser.add_argument("--probes", type=int, default=32, help="RECOMMENDATION_INDEX_PROBES")
+    run(parser.parse_args())
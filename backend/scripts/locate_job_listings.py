@@ -0,0 +1,49 @@
+"""
+Locate job listings with the bundled gazetteer (app.search.gazetteer) for radius search.
+
+Listings are located when they are written; this sets the coordinates of listings written before the columns
+existed, and with --all re-locates every listing, e.g. after the gazetteer changed a place's coordinates. There is one
+update per distinct city and state, of which there are a few hundred at most:
+
+    python scripts/locate_job_listings.py [--all] [--database-url ...]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select, update
+
+from app.config.settings import get_settings
+from app.db.models import JobListing
+from app.search.gazetteer import get_gazetteer
+
+
+def run(args: argparse.Namespace) -> None:
+    gazetteer = get_gazetteer()
+    db_engine = create_engine(args.database_url or get_settings().DATABASE_URL)
+    located = unknown = 0
+    with db_engine.begin() as conn:
+        listed = [JobListing.city.is_not(None), JobListing.state_abbreviation.is_not(None)]
+        if not args.all:
+            listed.append(JobListing.latitude.is_(None))
+        places = conn.execute(select(JobListing.city, JobListing.state_abbreviation).distinct().where(*listed)).all()
+        for city, state_abbreviation in places:
+            coordinates = gazetteer.locate(city, state_abbreviation)
+            if coordinates is None:
+                unknown += 1
+                continue
+            located += conn.execute(update(JobListing).where(
+                JobListing.city == city, JobListing.state_abbreviation == state_abbreviation, *listed[2:]).values(
+                latitude=coordinates[0], longitude=coordinates[1])).rowcount
+    db_engine.dispose()
+    print(f"Located {located} listings in {len(places) - unknown} places; {unknown} places are not in the gazetteer")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="re-locate listings that already have coordinates")
+    parser.add_argument("--database-url", help="sync database URL; DATABASE_URL by default")
+    run(parser.parse_args())
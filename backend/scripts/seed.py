@@ -87,7 +87,6 @@ def seed_data(db: Session):
 
     # Seed Job Listings
     job1 = JobListing(
-        id=str(uuid.uuid4()),
         title="Senior Software Engineer",
         description="Develop and maintain web applications using modern frameworks. Work with cross-functional teams to deliver high-quality software solutions.",
         organization_id=org1.id,
@@ -104,7 +103,6 @@ def seed_data(db: Session):
     )
 
     job2 = JobListing(
-        id=str(uuid.uuid4()),
         title="UX Designer",
         description="Design user interfaces for mobile and web applications. Collaborate with product managers and developers to create intuitive user experiences.",
         organization_id=org2.id,
@@ -121,7 +119,6 @@ def seed_data(db: Session):
     )
 
     job3 = JobListing(
-        id=str(uuid.uuid4()),
         title="Data Analyst Intern",
         description="Analyze large datasets and create visualizations to support business decisions. Perfect opportunity for students or recent graduates.",
         organization_id=org3.id,
@@ -138,7 +135,6 @@ def seed_data(db: Session):
     )
 
     job4 = JobListing(
-        id=str(uuid.uuid4()),
         title="Frontend Developer",
         description="Build responsive web applications using React and TypeScript. Work in a collaborative environment with designers and backend developers.",
         organization_id=org1.id,